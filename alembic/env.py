@@ -1,6 +1,9 @@
 from logging.config import fileConfig
 import asyncio
-from sqlalchemy import engine_from_config, pool
+import logging
+import time
+from sqlalchemy import engine_from_config, inspect, pool
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine
 from alembic import context
 
@@ -11,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from app.core.config import get_settings
 from app.database import Base
+from app.utils.migrations import reset_schema_cache, set_fresh_install
 
 # Import all models for autogenerate to detect them
 from app.models.flight import Flight
@@ -27,8 +31,9 @@ settings = get_settings()
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Skipped when migrations are run from
+# the application, which has already configured logging.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -59,12 +64,54 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
+logger = logging.getLogger("alembic.env")
+
+# A revision that hits lock_timeout (see set_guards) is rolled back and retried
+LOCK_RETRY_ATTEMPTS = 5
+
+
+def _run_with_lock_retry() -> None:
+    """
+    Run pending revisions, retrying with exponential backoff when one fails
+    on lock_timeout. Revisions committed before the failure are kept, so
+    each retry resumes from the failed one.
+    
+    The failed revision is re-run from the start: work it committed in a
+    concurrent_block() stays applied, so such revisions must be idempotent
+    (IF NOT EXISTS DDL, swap_column_types).
+    """
+    for attempt in range(LOCK_RETRY_ATTEMPTS):
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+            return
+        except DBAPIError as e:
+            if "lock timeout" not in str(e) or attempt == LOCK_RETRY_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Migration hit lock timeout, retrying in {delay}s ({attempt + 1}/{LOCK_RETRY_ATTEMPTS})")
+            # Columns/tables recorded by the rolled back revision are gone
+            reset_schema_cache()
+            time.sleep(delay)
+
+
+def _is_fresh_database(connection) -> bool:
+    """True when neither alembic_version nor any application table exists."""
+    inspector = inspect(connection)
+    fresh = not inspector.has_table("alembic_version") and not inspector.has_table("flights")
+    # End the implicit transaction opened by the inspection so Alembic
+    # manages transactions itself
+    connection.commit()
+    return fresh
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode (sync version)."""
     connectable = engine_from_config(
@@ -74,12 +121,19 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        reset_schema_cache()
+        fresh = _is_fresh_database(connection)
+        set_fresh_install(fresh)
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # One transaction per revision so autocommit_block() can run
+            # CREATE INDEX CONCURRENTLY between revisions; an empty database
+            # gets the whole chain in a single transaction instead
+            transaction_per_migration=not fresh,
         )
 
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with_lock_retry()
 
 
 def run_async_migrations() -> None:
@@ -97,13 +151,19 @@ def run_async_migrations() -> None:
         await connectable.dispose()
 
     def do_run_migrations(connection):
+        # One catalog snapshot per run, shared by every revision
+        reset_schema_cache()
+        fresh = _is_fresh_database(connection)
+        set_fresh_install(fresh)
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            # Empty database: apply the whole chain in one transaction
+            # (concurrent_block() then runs index builds inline)
+            transaction_per_migration=not fresh,
         )
 
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with_lock_retry()
 
     asyncio.run(run())
 
@@ -11,6 +11,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.utils.migrations import concurrent_block, set_guards
+
 # revision identifiers, used by Alembic.
 revision: str = '001_initial'
 down_revision: Union[str, None] = None
@@ -19,6 +21,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    set_guards()
+    
     # Create users table
     op.create_table('users',
     sa.Column('user_id', sa.Integer(), autoincrement=True, nullable=False),
@@ -34,8 +38,6 @@ def upgrade() -> None:
     sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
     sa.PrimaryKeyConstraint('user_id')
     )
-    op.create_index('idx_users_username', 'users', ['username'], unique=True)
-    op.create_index('idx_users_email', 'users', ['email'], unique=True)
     
     # Create flights table
     op.create_table('flights',
@@ -50,15 +52,12 @@ def upgrade() -> None:
     sa.Column('last_seen', sa.Integer(), nullable=False),
     sa.Column('predicted_eta', sa.DateTime(timezone=True), nullable=True),
     sa.Column('predicted_etd', sa.DateTime(timezone=True), nullable=True),
-    sa.Column('predicted_delay_minutes', sa.Integer(), nullable=True),
-    sa.Column('predicted_occupation_minutes', sa.Integer(), nullable=True),
+    sa.Column('predicted_delay_minutes', sa.SmallInteger(), nullable=True),
+    sa.Column('predicted_occupation_minutes', sa.SmallInteger(), nullable=True),
     sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
     sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
     sa.PrimaryKeyConstraint('icao24')
     )
-    op.create_index('idx_flight_status_type', 'flights', ['status', 'flight_type'])
-    op.create_index('idx_flight_airports', 'flights', ['departure_airport', 'arrival_airport'])
-    op.create_index('idx_flight_timestamps', 'flights', ['first_seen', 'last_seen'])
     
     # Create parking_spots table
     op.create_table('parking_spots',
@@ -75,7 +74,6 @@ def upgrade() -> None:
     sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
     sa.PrimaryKeyConstraint('spot_id')
     )
-    op.create_index('idx_spot_type_status', 'parking_spots', ['spot_type', 'status'])
     
     # Create parking_allocations table
     op.create_table('parking_allocations',
@@ -96,9 +94,6 @@ def upgrade() -> None:
     sa.ForeignKeyConstraint(['spot_id'], ['parking_spots.spot_id'], ),
     sa.PrimaryKeyConstraint('allocation_id')
     )
-    op.create_index('idx_allocation_flight', 'parking_allocations', ['flight_icao24'])
-    op.create_index('idx_allocation_spot', 'parking_allocations', ['spot_id'])
-    op.create_index('idx_allocation_active', 'parking_allocations', ['is_active', 'spot_id'])
     
     # Create ai_predictions table
     op.create_table('ai_predictions',
@@ -114,8 +109,20 @@ def upgrade() -> None:
     sa.ForeignKeyConstraint(['flight_icao24'], ['flights.icao24'], ),
     sa.PrimaryKeyConstraint('prediction_id')
     )
-    op.create_index('idx_prediction_flight', 'ai_predictions', ['flight_icao24'])
-    op.create_index('idx_prediction_model', 'ai_predictions', ['model_type', 'flight_icao24'])
+    
+    # Create indexes without blocking writes (CONCURRENTLY cannot run in a transaction)
+    with concurrent_block() as execute:
+        execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username ON users (username)")
+        execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email ON users (email)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_status_type ON flights (status, flight_type)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_airports ON flights (departure_airport, arrival_airport)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_timestamps ON flights (first_seen, last_seen)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_spot_type_status ON parking_spots (spot_type, status)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_flight ON parking_allocations (flight_icao24)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_spot ON parking_allocations (spot_id)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_active ON parking_allocations (is_active, spot_id)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prediction_flight ON ai_predictions (flight_icao24)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prediction_model ON ai_predictions (model_type, flight_icao24)")
 
 
 def downgrade() -> None:
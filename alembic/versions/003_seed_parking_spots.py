@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.utils.migrations import bulk_upsert, set_guards
+
 
 # revision identifiers, used by Alembic.
 revision: str = '003_seed_parking_spots'
@@ -20,31 +22,48 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Seed 16 civil parking spots (P1-P5, S1-S10B)"""
-    # First ensure enum values match (cast to text to avoid enum issues)
-    op.execute("""
-        INSERT INTO parking_spots (spot_id, spot_number, spot_type, status, aircraft_size_capacity, has_jetway, distance_to_terminal, admin_configurable, notes)
-        VALUES
-            -- P spots (5 civil spots with jetways)
-            ('P1', 1, 'civil'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, true, 50, true, 'Zone P - Contact 1'),
-            ('P2', 2, 'civil'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, true, 60, true, 'Zone P - Contact 2'),
-            ('P3', 3, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, true, 70, true, 'Zone P - Contact 3'),
-            ('P4', 4, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, true, 80, true, 'Zone P - Contact 4'),
-            ('P5', 5, 'civil'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, true, 90, true, 'Zone P - Contact 5'),
-            
-            -- S spots (11 civil spots remote parking)
-            ('S1', 6, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 200, true, 'Zone S - Remote 1'),
-            ('S2', 7, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 210, true, 'Zone S - Remote 2'),
-            ('S3', 8, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 220, true, 'Zone S - Remote 3'),
-            ('S4', 9, 'civil'::spottype, 'available'::spotstatus, 'small'::aircraftsizecategory, false, 230, true, 'Zone S - Remote 4'),
-            ('S5', 10, 'civil'::spottype, 'available'::spotstatus, 'small'::aircraftsizecategory, false, 240, true, 'Zone S - Remote 5'),
-            ('S6', 11, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 250, true, 'Zone S - Remote 6'),
-            ('S7', 12, 'civil'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 260, true, 'Zone S - Remote 7'),
-            ('S8', 13, 'civil'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, false, 270, true, 'Zone S - Remote 8'),
-            ('S9', 14, 'civil'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, false, 280, true, 'Zone S - Remote 9'),
-            ('S10A', 15, 'civil'::spottype, 'available'::spotstatus, 'small'::aircraftsizecategory, false, 290, true, 'Zone S - Remote 10A'),
-            ('S10B', 16, 'civil'::spottype, 'available'::spotstatus, 'small'::aircraftsizecategory, false, 295, true, 'Zone S - Remote 10B')
-        ON CONFLICT (spot_id) DO NOTHING;
-    """)
+    set_guards()
+    
+    # Enum columns accept the plain string values (type inferred from the target column)
+    spots = [
+        # P spots (5 civil spots with jetways)
+        ('P1', 1, 'civil', 'large', True, 50, True, 'Zone P - Contact 1'),
+        ('P2', 2, 'civil', 'large', True, 60, True, 'Zone P - Contact 2'),
+        ('P3', 3, 'civil', 'medium', True, 70, True, 'Zone P - Contact 3'),
+        ('P4', 4, 'civil', 'medium', True, 80, True, 'Zone P - Contact 4'),
+        ('P5', 5, 'civil', 'large', True, 90, True, 'Zone P - Contact 5'),
+        
+        # S spots (11 civil spots remote parking)
+        ('S1', 6, 'civil', 'medium', False, 200, True, 'Zone S - Remote 1'),
+        ('S2', 7, 'civil', 'medium', False, 210, True, 'Zone S - Remote 2'),
+        ('S3', 8, 'civil', 'medium', False, 220, True, 'Zone S - Remote 3'),
+        ('S4', 9, 'civil', 'small', False, 230, True, 'Zone S - Remote 4'),
+        ('S5', 10, 'civil', 'small', False, 240, True, 'Zone S - Remote 5'),
+        ('S6', 11, 'civil', 'medium', False, 250, True, 'Zone S - Remote 6'),
+        ('S7', 12, 'civil', 'medium', False, 260, True, 'Zone S - Remote 7'),
+        ('S8', 13, 'civil', 'large', False, 270, True, 'Zone S - Remote 8'),
+        ('S9', 14, 'civil', 'large', False, 280, True, 'Zone S - Remote 9'),
+        ('S10A', 15, 'civil', 'small', False, 290, True, 'Zone S - Remote 10A'),
+        ('S10B', 16, 'civil', 'small', False, 295, True, 'Zone S - Remote 10B'),
+    ]
+    bulk_upsert(
+        'parking_spots',
+        [
+            {
+                'spot_id': spot_id,
+                'spot_number': spot_number,
+                'spot_type': spot_type,
+                'status': 'available',
+                'aircraft_size_capacity': size,
+                'has_jetway': has_jetway,
+                'distance_to_terminal': distance,
+                'admin_configurable': admin_configurable,
+                'notes': notes,
+            }
+            for spot_id, spot_number, spot_type, size, has_jetway, distance, admin_configurable, notes in spots
+        ],
+        conflict_column='spot_id'
+    )
 
 
 def downgrade() -> None:
@@ -17,6 +17,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.utils.migrations import concurrent_block, set_guards
+
 # revision identifiers, used by Alembic.
 revision: str = '004_add_realtime_tracking'
 down_revision: Union[str, Sequence[str], None] = ('2f8594308d71', '5cee32faada4')
@@ -24,35 +26,45 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# (column, type, comment) added to flights by this revision
+TRACKING_COLUMNS = [
+    ('longitude', 'double precision', 'Current longitude (decimal degrees)'),
+    ('latitude', 'double precision', 'Current latitude (decimal degrees)'),
+    ('baro_altitude', 'real', 'Barometric altitude (meters)'),
+    ('geo_altitude', 'real', 'Geometric altitude (meters)'),
+    ('velocity', 'real', 'Ground speed (m/s)'),
+    ('heading', 'real', 'True track heading (degrees)'),
+    ('vertical_rate', 'real', 'Vertical rate (m/s)'),
+    ('on_ground', 'boolean', 'Aircraft on ground'),
+    ('last_position_update', 'timestamptz', 'Last state vector update'),
+]
+
+
 def upgrade() -> None:
-    # Add real-time tracking columns to flights table
-    op.add_column('flights', sa.Column('longitude', sa.Float(), nullable=True, comment='Current longitude (decimal degrees)'))
-    op.add_column('flights', sa.Column('latitude', sa.Float(), nullable=True, comment='Current latitude (decimal degrees)'))
-    op.add_column('flights', sa.Column('baro_altitude', sa.Float(), nullable=True, comment='Barometric altitude (meters)'))
-    op.add_column('flights', sa.Column('geo_altitude', sa.Float(), nullable=True, comment='Geometric altitude (meters)'))
-    op.add_column('flights', sa.Column('velocity', sa.Float(), nullable=True, comment='Ground speed (m/s)'))
-    op.add_column('flights', sa.Column('heading', sa.Float(), nullable=True, comment='True track heading (degrees)'))
-    op.add_column('flights', sa.Column('vertical_rate', sa.Float(), nullable=True, comment='Vertical rate (m/s)'))
-    op.add_column('flights', sa.Column('on_ground', sa.Boolean(), nullable=True, comment='Aircraft on ground'))
-    op.add_column('flights', sa.Column('last_position_update', sa.DateTime(timezone=True), nullable=True, comment='Last state vector update'))
+    set_guards()
+    
+    # Fail fast instead of queueing behind long-running queries on flights
+    op.execute("SET LOCAL lock_timeout = '3s'")
+    
+    # Add real-time tracking columns with one ALTER TABLE (single lock/catalog update)
+    op.execute(
+        "ALTER TABLE flights "
+        + ", ".join(f"ADD COLUMN {name} {type_}" for name, type_, _ in TRACKING_COLUMNS)
+    )
+    for name, _, comment in TRACKING_COLUMNS:
+        op.execute(f"COMMENT ON COLUMN flights.{name} IS '{comment}'")
     
-    # Create index for position queries
-    op.create_index('idx_flight_position', 'flights', ['latitude', 'longitude'], unique=False)
-    op.create_index('idx_flight_last_position_update', 'flights', ['last_position_update'], unique=False)
+    # Create index for position queries (CONCURRENTLY to avoid blocking the flights table)
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_position ON flights (latitude, longitude)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_last_position_update ON flights (last_position_update)")
 
 
 def downgrade() -> None:
-    # Remove indexes
-    op.drop_index('idx_flight_last_position_update', table_name='flights')
-    op.drop_index('idx_flight_position', table_name='flights')
+    op.execute("SET LOCAL lock_timeout = '3s'")
     
-    # Remove columns
-    op.drop_column('flights', 'last_position_update')
-    op.drop_column('flights', 'on_ground')
-    op.drop_column('flights', 'vertical_rate')
-    op.drop_column('flights', 'heading')
-    op.drop_column('flights', 'velocity')
-    op.drop_column('flights', 'geo_altitude')
-    op.drop_column('flights', 'baro_altitude')
-    op.drop_column('flights', 'latitude')
-    op.drop_column('flights', 'longitude')
+    # Remove columns (their indexes are dropped with them)
+    op.execute(
+        "ALTER TABLE flights "
+        + ", ".join(f"DROP COLUMN IF EXISTS {name}" for name, _, _ in reversed(TRACKING_COLUMNS))
+    )
@@ -0,0 +1,61 @@
+"""narrow_flight_numeric_columns
+
+Revision ID: 0a9c4e27b513
+Revises: f6b1d3a98c47
+Create Date: 2025-12-16 16:18:50.377102
+
+Narrows flights columns on existing databases:
+- velocity, heading, vertical_rate, baro_altitude, geo_altitude:
+  double precision -> real (sensor values fit in 4 bytes)
+- predicted_delay_minutes, predicted_occupation_minutes:
+  integer -> smallint
+Latitude/longitude stay double precision (real keeps ~7 significant
+digits, not enough for coordinates). Fresh installs already get the
+narrow types from 001/004, so this revision is a no-op there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import set_guards, swap_column_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9c4e27b513'
+down_revision: Union[str, Sequence[str], None] = 'f6b1d3a98c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NARROW_TYPES = {
+    'velocity': 'real',
+    'heading': 'real',
+    'vertical_rate': 'real',
+    'baro_altitude': 'real',
+    'geo_altitude': 'real',
+    'predicted_delay_minutes': 'smallint',
+    'predicted_occupation_minutes': 'smallint',
+}
+
+WIDE_TYPES = {
+    'velocity': 'double precision',
+    'heading': 'double precision',
+    'vertical_rate': 'double precision',
+    'baro_altitude': 'double precision',
+    'geo_altitude': 'double precision',
+    'predicted_delay_minutes': 'integer',
+    'predicted_occupation_minutes': 'integer',
+}
+
+
+def upgrade() -> None:
+    """Narrow tracking and prediction columns via add-backfill-swap."""
+    set_guards()
+    
+    swap_column_types('flights', 'icao24', NARROW_TYPES)
+
+
+def downgrade() -> None:
+    """Restore double precision / integer columns."""
+    swap_column_types('flights', 'icao24', WIDE_TYPES)
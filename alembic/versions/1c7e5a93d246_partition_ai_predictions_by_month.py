@@ -0,0 +1,171 @@
+"""partition_ai_predictions_by_month
+
+Revision ID: 1c7e5a93d246
+Revises: 0a9c4e27b513
+Create Date: 2025-12-16 17:05:33.812649
+
+Turns ai_predictions into a table partitioned by RANGE (created_at) with
+monthly partitions, so recent-prediction queries prune old months, VACUUM
+works per partition and old months can be detached in O(1). Indexes
+(including the GIN payload indexes) become partition-local.
+
+ensure_monthly_partitions(parent, start_at, months_ahead) precreates
+partitions; the scheduler calls it daily. A DEFAULT partition catches
+rows outside the precreated range.
+
+The existing table is renamed to ai_predictions_legacy and its rows are
+moved into the partitioned table in committed batches. New predictions
+go to the partitioned table from the start, and both tables share the
+prediction_id sequence.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c7e5a93d246'
+down_revision: Union[str, Sequence[str], None] = '0a9c4e27b513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = 'ai_predictions'
+LEGACY_TABLE = 'ai_predictions_legacy'
+MOVE_BATCH_SIZE = 5000
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _table_ddl(table: str):
+    """Capture secondary index and foreign key definitions of a table."""
+    connection = op.get_bind()
+    indexes = connection.execute(sa.text("""
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = CAST(:table AS regclass) AND NOT x.indisprimary
+    """), {"table": table}).all()
+    foreign_keys = connection.execute(sa.text("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+    """), {"table": table}).all()
+    return indexes, foreign_keys
+
+
+def _insertable_columns(table: str) -> str:
+    """Comma-separated list of the table's non-generated columns."""
+    rows = op.get_bind().execute(sa.text("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = CAST(:table AS regclass) AND attnum > 0
+          AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """), {"table": table})
+    return ", ".join(row[0] for row in rows)
+
+
+def _rebuild(partitioned: bool) -> None:
+    """Recreate ai_predictions (partitioned or plain) and move its rows."""
+    indexes, foreign_keys = _table_ddl(TABLE)
+    
+    # 1. Free the names used by the current table, then rename it
+    for name, _ in indexes:
+        op.execute(f"DROP INDEX {name}")
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+    op.execute(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY_TABLE}_pkey")
+    
+    # 2. New table with the same columns, defaults (shared sequence) and generated input_hash
+    op.execute(f"""
+        CREATE TABLE {TABLE} (
+            LIKE {LEGACY_TABLE}
+            INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS
+        ){' PARTITION BY RANGE (created_at)' if partitioned else ''}
+    """)
+    primary_key = "prediction_id, created_at" if partitioned else "prediction_id"
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({primary_key})")
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+    op.execute(f"ALTER SEQUENCE {TABLE}_prediction_id_seq OWNED BY {TABLE}.prediction_id")
+    
+    if partitioned:
+        op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+        op.execute(sa.text(f"""
+            SELECT ensure_monthly_partitions(
+                '{TABLE}',
+                COALESCE((SELECT min(created_at) FROM {LEGACY_TABLE}), now()),
+                :months_ahead
+            )
+        """).bindparams(months_ahead=PARTITION_MONTHS_AHEAD))
+    
+    # Recreated while the table is still empty (cheap, no CONCURRENTLY needed)
+    for _, definition in indexes:
+        op.execute(definition)
+    
+    # 3. Move rows in committed batches; writers already use the new table
+    columns = _insertable_columns(TABLE)
+    connection = op.get_bind()
+    with concurrent_block():
+        while True:
+            result = connection.execute(sa.text(f"""
+                WITH moved AS (
+                    DELETE FROM {LEGACY_TABLE}
+                    WHERE prediction_id IN (
+                        SELECT prediction_id FROM {LEGACY_TABLE}
+                        ORDER BY prediction_id
+                        LIMIT {MOVE_BATCH_SIZE}
+                    )
+                    RETURNING {columns}
+                )
+                INSERT INTO {TABLE} ({columns})
+                SELECT {columns} FROM moved
+            """))
+            if result.rowcount < MOVE_BATCH_SIZE:
+                break
+    
+    op.execute(f"DROP TABLE {LEGACY_TABLE}")
+
+
+def upgrade() -> None:
+    """Partition ai_predictions by month on created_at."""
+    set_guards()
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+            parent text,
+            start_at timestamptz,
+            months_ahead integer DEFAULT 3
+        ) RETURNS integer AS $$
+        DECLARE
+            partition_start timestamp := date_trunc('month', start_at AT TIME ZONE 'UTC');
+            last_start timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                                    + make_interval(months => months_ahead);
+            partition_name text;
+            created integer := 0;
+        BEGIN
+            WHILE partition_start <= last_start LOOP
+                partition_name := parent || '_' || to_char(partition_start, 'YYYYMM');
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent,
+                        partition_start AT TIME ZONE 'UTC',
+                        (partition_start + interval '1 month') AT TIME ZONE 'UTC'
+                    );
+                    created := created + 1;
+                END IF;
+                partition_start := partition_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    """Convert ai_predictions back to a plain table."""
+    _rebuild(partitioned=False)
+    op.execute("DROP FUNCTION IF EXISTS ensure_monthly_partitions(text, timestamptz, integer)")
@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.utils.migrations import add_column_if_missing, concurrent_block, set_guards
+
 
 # revision identifiers, used by Alembic.
 revision: str = '224fabeff6de'
@@ -20,40 +22,31 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Add conflict tracking columns to parking_allocations table."""
-    # Check if columns already exist
-    connection = op.get_bind()
-    inspector = sa.inspect(connection)
-    allocations_columns = [col['name'] for col in inspector.get_columns('parking_allocations')]
+    set_guards()
     
     # Add conflict_detected column
-    if 'conflict_detected' not in allocations_columns:
-        op.add_column('parking_allocations',
-            sa.Column('conflict_detected', sa.Boolean(), server_default=sa.text('false'), nullable=False)
-        )
+    add_column_if_missing('parking_allocations',
+        sa.Column('conflict_detected', sa.Boolean(), server_default=sa.text('false'), nullable=False)
+    )
     
     # Add conflict_probability column
-    if 'conflict_probability' not in allocations_columns:
-        op.add_column('parking_allocations',
-            sa.Column('conflict_probability', sa.Float(), nullable=True)
-        )
+    add_column_if_missing('parking_allocations',
+        sa.Column('conflict_probability', sa.Float(), nullable=True)
+    )
     
     # Add conflict_resolution column
-    if 'conflict_resolution' not in allocations_columns:
-        op.add_column('parking_allocations',
-            sa.Column('conflict_resolution', sa.String(length=200), nullable=True)
-        )
+    add_column_if_missing('parking_allocations',
+        sa.Column('conflict_resolution', sa.String(length=200), nullable=True)
+    )
     
     # Add updated_at column (required by model)
-    if 'updated_at' not in allocations_columns:
-        op.add_column('parking_allocations',
-            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False)
-        )
+    add_column_if_missing('parking_allocations',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False)
+    )
     
-    # Create index on conflict_detected for fast queries
-    try:
-        op.create_index('idx_allocation_conflict', 'parking_allocations', ['conflict_detected'])
-    except Exception:
-        pass  # Index may already exist
+    # Create index on conflict_detected for fast queries (IF NOT EXISTS: index may already exist)
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_conflict ON parking_allocations (conflict_detected)")
 
 
 def downgrade() -> None:
@@ -0,0 +1,61 @@
+"""add_covering_columns_to_hot_indexes
+
+Revision ID: 2d4f8b61e937
+Revises: 1c7e5a93d246
+Create Date: 2025-12-17 09:12:08.441730
+
+Rebuilds two hot indexes as covering indexes (INCLUDE) so dashboard and
+availability queries can be answered with index-only scans:
+- idx_flight_status_type (status, flight_type)
+  INCLUDE (callsign, departure_airport, arrival_airport, predicted_eta)
+- idx_allocation_active_partial (spot_id, predicted_end_time)
+  INCLUDE (flight_icao24) WHERE actual_end_time IS NULL
+Each index is built under a temporary name, then swapped in, so the old
+one keeps serving queries during the build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d4f8b61e937'
+down_revision: Union[str, Sequence[str], None] = '1c7e5a93d246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_index(name: str, definition: str) -> None:
+    """Build `definition` as <name>_new, then drop <name> and take its name."""
+    with concurrent_block() as execute:
+        execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}_new {definition}")
+        execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade() -> None:
+    """Rebuild hot indexes with INCLUDE columns."""
+    set_guards()
+    
+    _replace_index(
+        'idx_flight_status_type',
+        "ON flights (status, flight_type) "
+        "INCLUDE (callsign, departure_airport, arrival_airport, predicted_eta)"
+    )
+    _replace_index(
+        'idx_allocation_active_partial',
+        "ON parking_allocations (spot_id, predicted_end_time) "
+        "INCLUDE (flight_icao24) WHERE actual_end_time IS NULL"
+    )
+
+
+def downgrade() -> None:
+    """Rebuild hot indexes without INCLUDE columns."""
+    _replace_index(
+        'idx_allocation_active_partial',
+        "ON parking_allocations (spot_id, predicted_end_time) WHERE actual_end_time IS NULL"
+    )
+    _replace_index('idx_flight_status_type', "ON flights (status, flight_type)")
@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.utils.migrations import add_column_if_missing, set_guards
+
 
 # revision identifiers, used by Alembic.
 revision: str = '2f8594308d71'
@@ -20,16 +22,12 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Add updated_at column to parking_allocations table."""
-    # Check if column already exists
-    connection = op.get_bind()
-    inspector = sa.inspect(connection)
-    allocations_columns = [col['name'] for col in inspector.get_columns('parking_allocations')]
+    set_guards()
     
-    # Add updated_at column
-    if 'updated_at' not in allocations_columns:
-        op.add_column('parking_allocations',
-            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False)
-        )
+    # Add updated_at column (skipped if 224fabeff6de already added it)
+    add_column_if_missing('parking_allocations',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False)
+    )
 
 
 def downgrade() -> None:
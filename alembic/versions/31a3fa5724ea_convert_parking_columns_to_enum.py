@@ -8,7 +8,8 @@ Create Date: 2025-12-11 16:14:16.435046
 from typing import Sequence, Union
 
 from alembic import op
-import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards, swap_column_types
 
 
 # revision identifiers, used by Alembic.
@@ -18,8 +19,25 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# (column, enum type) pairs converted by this migration
+ENUM_COLUMNS = [
+    ('spot_type', 'spottype'),
+    ('status', 'spotstatus'),
+    ('aircraft_size_capacity', 'aircraftsizecategory'),
+]
+
+
 def upgrade() -> None:
-    """Convert string columns to PostgreSQL ENUM types."""
+    """
+    Convert string columns to PostgreSQL ENUM types.
+    
+    Uses add -> backfill -> swap (swap_column_types) instead of
+    ALTER COLUMN ... TYPE ... USING, so the table is never rewritten under
+    an ACCESS EXCLUSIVE lock; its trigger keeps rows written during the
+    backfill in sync. Legacy upper-case values (CIVIL -> civil) are
+    lowercased by the conversion itself.
+    """
+    set_guards()
     
     # Drop existing enum types if they exist
     op.execute("DROP TYPE IF EXISTS spottype CASCADE")
@@ -31,32 +49,16 @@ def upgrade() -> None:
     op.execute("CREATE TYPE spotstatus AS ENUM ('available', 'occupied', 'reserved', 'maintenance')")
     op.execute("CREATE TYPE aircraftsizecategory AS ENUM ('small', 'medium', 'large')")
     
-    # Drop default values first
-    op.execute("ALTER TABLE parking_spots ALTER COLUMN status DROP DEFAULT")
-    
-    # Convert parking_spots.spot_type (convert CIVIL -> civil, MILITARY -> military)
-    op.execute("""
-        ALTER TABLE parking_spots 
-        ALTER COLUMN spot_type TYPE spottype 
-        USING LOWER(spot_type)::spottype
-    """)
-    
-    # Convert parking_spots.status (convert to lowercase)
-    op.execute("""
-        ALTER TABLE parking_spots 
-        ALTER COLUMN status TYPE spotstatus 
-        USING LOWER(status)::spotstatus
-    """)
-    
-    # Convert parking_spots.aircraft_size_capacity (convert to lowercase)
-    op.execute("""
-        ALTER TABLE parking_spots 
-        ALTER COLUMN aircraft_size_capacity TYPE aircraftsizecategory 
-        USING LOWER(aircraft_size_capacity)::aircraftsizecategory
-    """)
+    swap_column_types(
+        'parking_spots', 'spot_id',
+        dict(ENUM_COLUMNS),
+        defaults={'status': "'available'::spotstatus"},
+        using={column: f"LOWER({{value}})::{enum_type}" for column, enum_type in ENUM_COLUMNS}
+    )
     
-    # Re-add default value with enum cast
-    op.execute("ALTER TABLE parking_spots ALTER COLUMN status SET DEFAULT 'available'::spotstatus")
+    # Re-add the index dropped with the old columns
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_spot_type_status ON parking_spots (spot_type, status)")
 
 
 def downgrade() -> None:
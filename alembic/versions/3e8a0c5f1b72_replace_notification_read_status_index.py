@@ -0,0 +1,48 @@
+"""replace_notification_read_status_index
+
+Revision ID: 3e8a0c5f1b72
+Revises: 2d4f8b61e937
+Create Date: 2025-12-17 10:26:44.093518
+
+Replaces the full idx_notifications_read_status (read_status) B-tree with
+a partial idx_notifications_unread (created_at) WHERE read_status = false.
+Only unread notifications are ever filtered on (unread count, critical
+unread list, newest first), and read rows, the vast majority, no longer
+cost index maintenance.
+
+idx_allocation_spot is kept: since idx_allocation_active became partial
+(a41c6f0e8d53) no full index leads with spot_id, and it still serves
+history lookups by spot and the parking_spots foreign key checks.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a0c5f1b72'
+down_revision: Union[str, Sequence[str], None] = '2d4f8b61e937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create partial unread index and drop the full read_status one."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_unread
+            ON notifications (created_at) WHERE read_status = false
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_read_status")
+
+
+def downgrade() -> None:
+    """Restore full read_status index."""
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_read_status ON notifications (read_status)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_unread")
@@ -0,0 +1,107 @@
+"""convert_flight_and_user_columns_to_enums
+
+Revision ID: 4f2b9d7a6c18
+Revises: 3e8a0c5f1b72
+Create Date: 2025-12-17 11:48:19.265031
+
+Finishes what 31a3fa5724ea started for parking_spots:
+- flights.status      varchar(20) -> flightstatus enum
+- flights.flight_type varchar(20) -> flighttype enum
+- users.role          varchar(20) -> smallint CHECK (role IN (0, 1)),
+                      0 = user, 1 = admin (mapped by the User model)
+Columns are converted with add -> backfill -> swap (swap_column_types),
+after lowercasing legacy values in batches so the backfill is a plain
+cast. idx_flight_status_type is dropped with the old columns and rebuilt
+concurrently on the enum columns.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards, swap_column_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2b9d7a6c18'
+down_revision: Union[str, Sequence[str], None] = '3e8a0c5f1b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+STATUS_TYPE_INDEX = (
+    "ON flights (status, flight_type) "
+    "INCLUDE (callsign, departure_airport, arrival_airport, predicted_eta)"
+)
+
+
+def _normalize_case(table: str, column: str) -> None:
+    """Lowercase legacy values (ACTIVE -> active) in committed batches."""
+    connection = op.get_bind()
+    with concurrent_block():
+        while True:
+            result = connection.execute(sa.text(f"""
+                UPDATE {table}
+                SET {column} = LOWER({column})
+                WHERE ctid IN (
+                    SELECT ctid FROM {table}
+                    WHERE {column} <> LOWER({column})
+                    LIMIT {BATCH_SIZE}
+                )
+            """))
+            if result.rowcount < BATCH_SIZE:
+                break
+
+
+def upgrade() -> None:
+    """Convert flight status/type to enums and user role to smallint."""
+    set_guards()
+    
+    op.execute("CREATE TYPE flightstatus AS ENUM ('scheduled', 'active', 'completed', 'cancelled')")
+    op.execute("CREATE TYPE flighttype AS ENUM ('arrival', 'departure')")
+    
+    _normalize_case('flights', 'status')
+    _normalize_case('flights', 'flight_type')
+    _normalize_case('users', 'role')
+    
+    swap_column_types(
+        'flights', 'icao24',
+        {'status': 'flightstatus', 'flight_type': 'flighttype'},
+        defaults={'status': "'scheduled'::flightstatus"}
+    )
+    swap_column_types(
+        'users', 'user_id',
+        {'role': 'smallint'},
+        defaults={'role': '0'},
+        # Unknown roles fall back to the least privileged one
+        using={'role': "CASE {value} WHEN 'admin' THEN 1 ELSE 0 END"}
+    )
+    op.execute("ALTER TABLE users ADD CONSTRAINT ck_users_role CHECK (role IN (0, 1))")
+    
+    with concurrent_block() as execute:
+        execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_status_type {STATUS_TYPE_INDEX}")
+
+
+def downgrade() -> None:
+    """Convert columns back to varchar(20)."""
+    set_guards()
+    
+    op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS ck_users_role")
+    swap_column_types(
+        'users', 'user_id',
+        {'role': 'character varying(20)'},
+        defaults={'role': "'user'"},
+        using={'role': "CASE {value} WHEN 1 THEN 'admin' ELSE 'user' END"}
+    )
+    swap_column_types(
+        'flights', 'icao24',
+        {'status': 'character varying(20)', 'flight_type': 'character varying(20)'},
+        defaults={'status': "'scheduled'"}
+    )
+    op.execute("DROP TYPE IF EXISTS flighttype")
+    op.execute("DROP TYPE IF EXISTS flightstatus")
+    
+    with concurrent_block() as execute:
+        execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_status_type {STATUS_TYPE_INDEX}")
@@ -0,0 +1,60 @@
+"""add_dashboard_count_indexes
+
+Revision ID: 5a1c3e9d7f20
+Revises: 4f2b9d7a6c18
+Create Date: 2025-12-17 14:03:52.671204
+
+Indexes backing the counters of GET /dashboard/stats:
+- flights approaching/departing in the next 30 minutes:
+  (predicted_eta) / (predicted_etd) WHERE status <> 'completed'
+- flights created today: (created_at)
+- open and recently resolved conflicts:
+  (actual_end_time) WHERE conflict_detected = true, which serves both
+  actual_end_time IS NULL and actual_end_time >= :today_start
+Each count becomes an index-only range scan instead of a sequential scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1c3e9d7f20'
+down_revision: Union[str, Sequence[str], None] = '4f2b9d7a6c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create partial/plain indexes for the dashboard counters."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_eta_open
+            ON flights (predicted_eta) WHERE status <> 'completed'
+        """)
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_etd_open
+            ON flights (predicted_etd) WHERE status <> 'completed'
+        """)
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_created_at
+            ON flights (created_at)
+        """)
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_conflict_end
+            ON parking_allocations (actual_end_time) WHERE conflict_detected = true
+        """)
+
+
+def downgrade() -> None:
+    """Drop dashboard counter indexes."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_conflict_end")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_created_at")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_etd_open")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_eta_open")
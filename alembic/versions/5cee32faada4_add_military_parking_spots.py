@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.utils.migrations import bulk_upsert, set_guards
+
 
 # revision identifiers, used by Alembic.
 revision: str = '5cee32faada4'
@@ -20,16 +22,34 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Add military overflow parking spots."""
-    op.execute("""
-        INSERT INTO parking_spots (spot_id, spot_number, spot_type, status, aircraft_size_capacity, has_jetway, distance_to_terminal, admin_configurable, notes) VALUES
-            -- M spots (Military overflow spots for saturation management)
-            ('M1', 17, 'military'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, false, 400, false, 'Military Zone - Overflow 1'),
-            ('M2', 18, 'military'::spottype, 'available'::spotstatus, 'large'::aircraftsizecategory, false, 420, false, 'Military Zone - Overflow 2'),
-            ('M3', 19, 'military'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 440, false, 'Military Zone - Overflow 3'),
-            ('M4', 20, 'military'::spottype, 'available'::spotstatus, 'medium'::aircraftsizecategory, false, 460, false, 'Military Zone - Overflow 4'),
-            ('M5', 21, 'military'::spottype, 'available'::spotstatus, 'small'::aircraftsizecategory, false, 480, false, 'Military Zone - Overflow 5')
-        ON CONFLICT (spot_id) DO NOTHING;
-    """)
+    set_guards()
+    
+    # M spots (Military overflow spots for saturation management)
+    spots = [
+        ('M1', 17, 'military', 'large', False, 400, False, 'Military Zone - Overflow 1'),
+        ('M2', 18, 'military', 'large', False, 420, False, 'Military Zone - Overflow 2'),
+        ('M3', 19, 'military', 'medium', False, 440, False, 'Military Zone - Overflow 3'),
+        ('M4', 20, 'military', 'medium', False, 460, False, 'Military Zone - Overflow 4'),
+        ('M5', 21, 'military', 'small', False, 480, False, 'Military Zone - Overflow 5'),
+    ]
+    bulk_upsert(
+        'parking_spots',
+        [
+            {
+                'spot_id': spot_id,
+                'spot_number': spot_number,
+                'spot_type': spot_type,
+                'status': 'available',
+                'aircraft_size_capacity': size,
+                'has_jetway': has_jetway,
+                'distance_to_terminal': distance,
+                'admin_configurable': admin_configurable,
+                'notes': notes,
+            }
+            for spot_id, spot_number, spot_type, size, has_jetway, distance, admin_configurable, notes in spots
+        ],
+        conflict_column='spot_id'
+    )
 
 
 def downgrade() -> None:
@@ -0,0 +1,42 @@
+"""add_active_allocation_flight_index
+
+Revision ID: 6b3d0f4a8e12
+Revises: 5a1c3e9d7f20
+Create Date: 2025-12-17 15:21:06.318450
+
+Partial index for the active allocation of a flight:
+- idx_allocation_active_flight (flight_icao24) WHERE actual_end_time IS NULL
+ParkingAllocationRepository.get_by_flight() (assign, military transfer,
+civil recall) becomes a single index probe. The per-spot counterpart,
+used by the delete-spot precheck, is idx_allocation_active_partial.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b3d0f4a8e12'
+down_revision: Union[str, Sequence[str], None] = '5a1c3e9d7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create partial index on active allocations by flight."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_active_flight
+            ON parking_allocations (flight_icao24) WHERE actual_end_time IS NULL
+        """)
+
+
+def downgrade() -> None:
+    """Drop partial index on active allocations by flight."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_active_flight")
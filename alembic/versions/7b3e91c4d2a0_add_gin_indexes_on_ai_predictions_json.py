@@ -0,0 +1,45 @@
+"""add_gin_indexes_on_ai_predictions_json
+
+Revision ID: 7b3e91c4d2a0
+Revises: 004_add_realtime_tracking
+Create Date: 2025-12-16 10:12:41.208315
+
+Adds GIN indexes (jsonb_path_ops) on ai_predictions.input_data and
+ai_predictions.output_data so containment lookups (input_data @> :features)
+use an index scan instead of a sequential scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e91c4d2a0'
+down_revision: Union[str, Sequence[str], None] = '004_add_realtime_tracking'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create GIN jsonb_path_ops indexes on prediction payloads."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ai_predictions_input_gin
+            ON ai_predictions USING GIN (input_data jsonb_path_ops)
+        """)
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ai_predictions_output_gin
+            ON ai_predictions USING GIN (output_data jsonb_path_ops)
+        """)
+
+
+def downgrade() -> None:
+    """Drop GIN indexes on prediction payloads."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_ai_predictions_output_gin")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_ai_predictions_input_gin")
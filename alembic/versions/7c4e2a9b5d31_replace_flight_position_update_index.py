@@ -0,0 +1,49 @@
+"""replace_flight_position_update_index
+
+Revision ID: 7c4e2a9b5d31
+Revises: 6b3d0f4a8e12
+Create Date: 2025-12-17 16:08:41.527903
+
+Replaces idx_flight_last_position_update (last_position_update) with a
+composite idx_flight_status_position_update (status, last_position_update).
+FlightRepository.get_flights_needing_position_update() filters on both
+(status IN ('scheduled', 'active') AND last_position_update stale or NULL),
+so each status value becomes an index range instead of a scan over every
+stale position followed by a status recheck on the heap. No query filters
+on last_position_update alone.
+
+flight_type is not part of the key: no position query filters on it, and
+as a middle column it would prevent the range on last_position_update.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2a9b5d31'
+down_revision: Union[str, Sequence[str], None] = '6b3d0f4a8e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create composite status/position update index and drop the single-column one."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_status_position_update
+            ON flights (status, last_position_update)
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_last_position_update")
+
+
+def downgrade() -> None:
+    """Restore single-column last_position_update index."""
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_last_position_update ON flights (last_position_update)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_status_position_update")
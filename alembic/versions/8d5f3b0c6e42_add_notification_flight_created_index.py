@@ -0,0 +1,48 @@
+"""add_notification_flight_created_index
+
+Revision ID: 8d5f3b0c6e42
+Revises: 7c4e2a9b5d31
+Create Date: 2025-12-17 16:41:17.204683
+
+Replaces idx_notifications_flight (flight_icao24) with a composite
+idx_notifications_flight_created (flight_icao24, created_at).
+NotificationRepository.get_by_flight() filters on the flight and orders
+by created_at DESC; the composite returns rows already ordered (backward
+scan) instead of sorting them. It still leads with flight_icao24, so it
+keeps serving the ON DELETE CASCADE lookups from flights.
+
+Notification ids are already generated client-side as UUIDv7 (see
+e2a7c94b0f18), so inserts need no id round-trip.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5f3b0c6e42'
+down_revision: Union[str, Sequence[str], None] = '7c4e2a9b5d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create composite flight/created_at index and drop the flight-only one."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_flight_created
+            ON notifications (flight_icao24, created_at)
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_flight")
+
+
+def downgrade() -> None:
+    """Restore flight-only notifications index."""
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_flight ON notifications (flight_icao24)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_flight_created")
@@ -0,0 +1,41 @@
+"""add_parking_spot_updated_at_index
+
+Revision ID: 9e6a4c1d7f53
+Revises: 8d5f3b0c6e42
+Create Date: 2025-12-17 17:22:45.918306
+
+idx_spot_updated_at (updated_at) on parking_spots. The /spots ETag is
+built from count(*) and max(updated_at) (ParkingSpotRepository.get_version);
+the index turns max(updated_at) into a single backward index probe
+instead of an aggregate over every spot.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e6a4c1d7f53'
+down_revision: Union[str, Sequence[str], None] = '8d5f3b0c6e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create parking spot updated_at index."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_spot_updated_at
+            ON parking_spots (updated_at)
+        """)
+
+
+def downgrade() -> None:
+    """Drop parking spot updated_at index."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_spot_updated_at")
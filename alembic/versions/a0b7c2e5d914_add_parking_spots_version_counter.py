@@ -0,0 +1,74 @@
+"""add_parking_spots_version_counter
+
+Revision ID: a0b7c2e5d914
+Revises: 9e6a4c1d7f53
+Create Date: 2025-12-17 18:05:12.306481
+
+Single-row parking_spots_version counter for the /spots ETag
+(ParkingSpotRepository.get_version). count(*) and max(updated_at) missed
+updates committed by a transaction that started before the latest one
+(updated_at is its start time). The counter is bumped by a deferred
+constraint trigger, i.e. at commit, so a new version becomes visible in
+the same snapshot as the spot change, and the counter row is locked only
+while the writing transaction commits. idx_spot_updated_at, which only
+served max(updated_at), is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, create_table_if_missing, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0b7c2e5d914'
+down_revision: Union[str, Sequence[str], None] = '9e6a4c1d7f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the version counter, its trigger, and drop idx_spot_updated_at."""
+    set_guards()
+    
+    create_table_if_missing(
+        'parking_spots_version',
+        sa.Column('id', sa.SmallInteger(), nullable=False, server_default=sa.text('1')),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('id = 1', name='ck_parking_spots_version_single_row'),
+    )
+    op.execute("INSERT INTO parking_spots_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING")
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_parking_spots_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE parking_spots_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS parking_spots_version_bump ON parking_spots")
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER parking_spots_version_bump
+        AFTER INSERT OR UPDATE OR DELETE ON parking_spots
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION bump_parking_spots_version()
+    """)
+    
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_spot_updated_at")
+
+
+def downgrade() -> None:
+    """Restore idx_spot_updated_at and drop the version counter."""
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_spot_updated_at
+            ON parking_spots (updated_at)
+        """)
+    
+    op.execute("DROP TRIGGER IF EXISTS parking_spots_version_bump ON parking_spots")
+    op.execute("DROP FUNCTION IF EXISTS bump_parking_spots_version()")
+    op.drop_table('parking_spots_version')
@@ -0,0 +1,55 @@
+"""add_partial_indexes_on_parking_allocations
+
+Revision ID: a41c6f0e8d53
+Revises: 7b3e91c4d2a0
+Create Date: 2025-12-16 11:03:27.552914
+
+Replaces the full B-tree indexes idx_allocation_active and
+idx_allocation_conflict with partial indexes covering only the rows the
+application queries:
+- active allocations (actual_end_time IS NULL)
+- allocations with a detected conflict
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c6f0e8d53'
+down_revision: Union[str, Sequence[str], None] = '7b3e91c4d2a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create partial indexes and drop the full ones they replace."""
+    set_guards()
+    
+    # The is_active column is never maintained by the application:
+    # an allocation is active while actual_end_time IS NULL.
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_active_partial
+            ON parking_allocations (spot_id, predicted_end_time)
+            WHERE actual_end_time IS NULL
+        """)
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_conflict_partial
+            ON parking_allocations (allocated_at)
+            WHERE conflict_detected = true
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_active")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_conflict")
+
+
+def downgrade() -> None:
+    """Restore full indexes."""
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_conflict ON parking_allocations (conflict_detected)")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocation_active ON parking_allocations (is_active, spot_id)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_conflict_partial")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_allocation_active_partial")
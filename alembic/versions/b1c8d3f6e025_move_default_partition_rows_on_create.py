@@ -0,0 +1,138 @@
+"""move_default_partition_rows_on_create
+
+Revision ID: b1c8d3f6e025
+Revises: a0b7c2e5d914
+Create Date: 2025-12-17 18:41:27.590114
+
+ensure_monthly_partitions() failed once the DEFAULT partition of the
+parent held rows for the month being created: CREATE TABLE ... PARTITION
+OF rejects a range the default partition already has rows for, so the
+daily maintenance job stopped creating every later month too.
+
+The function now detects that case and, for that month only, detaches
+the default partition, creates the month, moves the default partition's
+rows for it through the parent (generated columns are recomputed) and
+re-attaches the default partition. DETACH/ATTACH lock the parent briefly
+(ACCESS EXCLUSIVE); months without such rows are created as before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c8d3f6e025'
+down_revision: Union[str, Sequence[str], None] = 'a0b7c2e5d914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Move default-partition rows into newly created monthly partitions."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+            parent text,
+            start_at timestamptz,
+            months_ahead integer DEFAULT 3
+        ) RETURNS integer AS $$
+        DECLARE
+            partition_start timestamp := date_trunc('month', start_at AT TIME ZONE 'UTC');
+            last_start timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                                    + make_interval(months => months_ahead);
+            partition_name text;
+            range_from timestamptz;
+            range_to timestamptz;
+            key_column text;
+            default_partition text;
+            insertable text;
+            misplaced boolean;
+            moved bigint;
+            created integer := 0;
+        BEGIN
+            SELECT a.attname, NULLIF(p.partdefid, 0)::regclass::text
+            INTO key_column, default_partition
+            FROM pg_partitioned_table p
+            JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+            WHERE p.partrelid = parent::regclass;
+            
+            SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+            INTO insertable
+            FROM pg_attribute
+            WHERE attrelid = parent::regclass AND attnum > 0
+              AND NOT attisdropped AND attgenerated = '';
+            
+            WHILE partition_start <= last_start LOOP
+                partition_name := parent || '_' || to_char(partition_start, 'YYYYMM');
+                IF to_regclass(partition_name) IS NULL THEN
+                    range_from := partition_start AT TIME ZONE 'UTC';
+                    range_to := (partition_start + interval '1 month') AT TIME ZONE 'UTC';
+                    
+                    misplaced := false;
+                    IF default_partition IS NOT NULL THEN
+                        EXECUTE format(
+                            'SELECT EXISTS (SELECT 1 FROM %s WHERE %I >= %L AND %I < %L)',
+                            default_partition, key_column, range_from, key_column, range_to
+                        ) INTO misplaced;
+                    END IF;
+                    
+                    IF misplaced THEN
+                        EXECUTE format('ALTER TABLE %I DETACH PARTITION %s', parent, default_partition);
+                    END IF;
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent, range_from, range_to
+                    );
+                    IF misplaced THEN
+                        EXECUTE format(
+                            'WITH moved AS ('
+                            '    DELETE FROM %s WHERE %I >= %L AND %I < %L RETURNING %s'
+                            ') INSERT INTO %I (%s) SELECT %s FROM moved',
+                            default_partition, key_column, range_from, key_column, range_to,
+                            insertable, parent, insertable, insertable
+                        );
+                        GET DIAGNOSTICS moved = ROW_COUNT;
+                        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %s DEFAULT', parent, default_partition);
+                        RAISE NOTICE 'Moved % rows from % into %', moved, default_partition, partition_name;
+                    END IF;
+                    created := created + 1;
+                END IF;
+                partition_start := partition_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    """Restore the version that fails on rows in the default partition."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+            parent text,
+            start_at timestamptz,
+            months_ahead integer DEFAULT 3
+        ) RETURNS integer AS $$
+        DECLARE
+            partition_start timestamp := date_trunc('month', start_at AT TIME ZONE 'UTC');
+            last_start timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                                    + make_interval(months => months_ahead);
+            partition_name text;
+            created integer := 0;
+        BEGIN
+            WHILE partition_start <= last_start LOOP
+                partition_name := parent || '_' || to_char(partition_start, 'YYYYMM');
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent,
+                        partition_start AT TIME ZONE 'UTC',
+                        (partition_start + interval '1 month') AT TIME ZONE 'UTC'
+                    );
+                    created := created + 1;
+                END IF;
+                partition_start := partition_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,48 @@
+"""use_brin_for_append_only_timestamps
+
+Revision ID: c5d2e8a17f64
+Revises: a41c6f0e8d53
+Create Date: 2025-12-16 11:48:09.730162
+
+Replaces the B-tree idx_flight_timestamps with a BRIN index and adds a
+BRIN index on ai_predictions.created_at. Both columns grow with insertion
+order, so one min/max summary per page range is enough for range scans
+at a fraction of the B-tree size.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2e8a17f64'
+down_revision: Union[str, Sequence[str], None] = 'a41c6f0e8d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create BRIN indexes (small tables: 32 pages per range)."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_timestamps_brin
+            ON flights USING BRIN (first_seen, last_seen) WITH (pages_per_range = 32)
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_timestamps")
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prediction_created_brin
+            ON ai_predictions USING BRIN (created_at) WITH (pages_per_range = 32)
+        """)
+
+
+def downgrade() -> None:
+    """Restore B-tree timestamp index."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_prediction_created_brin")
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_timestamps ON flights (first_seen, last_seen)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_timestamps_brin")
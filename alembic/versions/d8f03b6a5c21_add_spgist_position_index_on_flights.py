@@ -0,0 +1,44 @@
+"""add_spgist_position_index_on_flights
+
+Revision ID: d8f03b6a5c21
+Revises: c5d2e8a17f64
+Create Date: 2025-12-16 14:21:55.184027
+
+Replaces the composite B-tree idx_flight_position (latitude, longitude)
+with an SP-GiST index on point(longitude, latitude). Bounding-box
+lookups (point <@ box) become index scans on both dimensions.
+SP-GiST on the built-in point type needs no extension (PostGIS is not
+available in the postgres:15-alpine image).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f03b6a5c21'
+down_revision: Union[str, Sequence[str], None] = 'c5d2e8a17f64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create SP-GiST position index and drop the B-tree one."""
+    set_guards()
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_position_spgist
+            ON flights USING SPGIST (point(longitude, latitude))
+        """)
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_position")
+
+
+def downgrade() -> None:
+    """Restore B-tree position index."""
+    with concurrent_block() as execute:
+        execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_position ON flights (latitude, longitude)")
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_flight_position_spgist")
@@ -0,0 +1,68 @@
+"""use_uuidv7_for_notification_ids
+
+Revision ID: e2a7c94b0f18
+Revises: d8f03b6a5c21
+Create Date: 2025-12-16 15:03:12.540918
+
+Switches the notifications.notification_id default from gen_random_uuid()
+(v4, random) to gen_uuidv7() (time-ordered), so primary key inserts append
+to the rightmost B-tree leaf instead of splitting pages across the index.
+gen_uuidv7() is defined in PL/pgSQL (pg_uuidv7 is not in postgres:15-alpine).
+Existing v4 ids are kept; a BRIN index on created_at serves time-range
+scans without relying on id order.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c94b0f18'
+down_revision: Union[str, Sequence[str], None] = 'd8f03b6a5c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Define gen_uuidv7(), use it as default id and add BRIN on created_at."""
+    set_guards()
+    
+    # 48-bit millisecond timestamp + random bits from a v4 UUID,
+    # with the version nibble forced to 7 (variant bits are already 10xx)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION gen_uuidv7() RETURNS uuid AS $$
+        DECLARE
+            uuid_bytes bytea;
+        BEGIN
+            uuid_bytes := overlay(
+                uuid_send(gen_random_uuid())
+                placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                FROM 1 FOR 6
+            );
+            uuid_bytes := set_byte(
+                uuid_bytes, 6,
+                (b'0111' || get_byte(uuid_bytes, 6)::bit(4))::bit(8)::int
+            );
+            RETURN encode(uuid_bytes, 'hex')::uuid;
+        END
+        $$ LANGUAGE plpgsql VOLATILE
+    """)
+    op.execute("ALTER TABLE notifications ALTER COLUMN notification_id SET DEFAULT gen_uuidv7()")
+    
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_created_at_brin
+            ON notifications USING BRIN (created_at)
+        """)
+
+
+def downgrade() -> None:
+    """Restore gen_random_uuid() default and drop gen_uuidv7()."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_created_at_brin")
+    
+    op.execute("ALTER TABLE notifications ALTER COLUMN notification_id SET DEFAULT gen_random_uuid()")
+    op.execute("DROP FUNCTION IF EXISTS gen_uuidv7()")
@@ -0,0 +1,58 @@
+"""add_input_hash_to_ai_predictions
+
+Revision ID: f6b1d3a98c47
+Revises: e2a7c94b0f18
+Create Date: 2025-12-16 15:40:27.913604
+
+Adds a stored generated column input_hash = sha256(input_data::text)
+(pgcrypto) and a B-tree index on (model_type, input_hash), so
+prediction cache probes are a fixed-width equality lookup that never
+detoasts the JSONB payload. input_data storage is switched to EXTERNAL
+(out-of-line, uncompressed) to avoid decompression on cache hits.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import concurrent_block, set_guards
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b1d3a98c47'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c94b0f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add input_hash generated column, its index and EXTERNAL storage."""
+    set_guards()
+    
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    
+    # Stored generated column: rewrites ai_predictions once
+    op.execute("""
+        ALTER TABLE ai_predictions
+        ADD COLUMN IF NOT EXISTS input_hash bytea
+        GENERATED ALWAYS AS (digest(input_data::text, 'sha256')) STORED
+    """)
+    # Only affects newly written rows; existing ones keep their storage
+    op.execute("ALTER TABLE ai_predictions ALTER COLUMN input_data SET STORAGE EXTERNAL")
+    
+    # Not UNIQUE: the same input may legitimately be predicted again
+    # (force refresh), and ai_predictions keeps the full history
+    with concurrent_block() as execute:
+        execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ai_predictions_model_inputhash
+            ON ai_predictions (model_type, input_hash)
+        """)
+
+
+def downgrade() -> None:
+    """Drop input_hash and restore default storage."""
+    with concurrent_block() as execute:
+        execute("DROP INDEX CONCURRENTLY IF EXISTS idx_ai_predictions_model_inputhash")
+    
+    op.execute("ALTER TABLE ai_predictions ALTER COLUMN input_data SET STORAGE EXTENDED")
+    op.execute("ALTER TABLE ai_predictions DROP COLUMN IF EXISTS input_hash")
@@ -2,17 +2,27 @@
 Authentication endpoints.
 Handles user login, registration, and JWT token management.
 """
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
+import jwt
+from jwt.exceptions import InvalidTokenError as JWTError
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 import bcrypt
 
+from app.core.cache import token_cache, get_auth_version
 from app.core.config import get_settings
 from app.database import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.auth import Token, UserCreate, UserResponse
 from app.repositories.user_repository import UserRepository
 
@@ -22,28 +32,102 @@ settings = get_settings()
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# JWT settings resolved once instead of on every token encode/decode
+_JWT_SECRET = settings.JWT_SECRET.encode('utf-8')
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+_JWT_EXPIRATION = timedelta(minutes=settings.JWT_EXPIRATION_MINUTES)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash using bcrypt directly"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+BCRYPT_PREFIX = "$2"
+MAX_CALIBRATED_TIME_COST = 10
 
 
-def get_password_hash(password: str) -> str:
-    """Hash password using bcrypt directly"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def _calibrate_time_cost(target_ms: int) -> int:
+    """
+    Find the largest Argon2 time cost hashing within target_ms on this host.
+    
+    Args:
+        target_ms: Time budget for one hash in milliseconds
+    
+    Returns:
+        Time cost (at least the configured PASSWORD_HASH_TIME_COST)
+    """
+    time_cost = settings.PASSWORD_HASH_TIME_COST
+    while time_cost < MAX_CALIBRATED_TIME_COST:
+        candidate = PasswordHasher(
+            time_cost=time_cost + 1,
+            memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+            parallelism=1
+        )
+        start = time.perf_counter()
+        candidate.hash("calibration")
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        time_cost += 1
+    return time_cost
+
+
+# Argon2id hasher, built once (default OWASP profile: 19 MiB, 2 passes).
+# Legacy bcrypt hashes ($2a$/$2b$/$2y$) are still accepted and rehashed
+# on the next login.
+_PASSWORD_TIME_COST = (
+    _calibrate_time_cost(settings.PASSWORD_HASH_TARGET_MS)
+    if settings.PASSWORD_HASH_TARGET_MS > 0
+    else settings.PASSWORD_HASH_TIME_COST
+)
+password_hasher = PasswordHasher(
+    time_cost=_PASSWORD_TIME_COST,
+    memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+    parallelism=1
+)
+
+# Hashing is CPU-bound (and releases the GIL), so it runs on a small
+# dedicated pool instead of blocking the event loop
+_hash_pool = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="password-hash"
+)
+
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against an Argon2id or legacy bcrypt hash"""
+    if hashed_password.startswith(BCRYPT_PREFIX):
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, _verify_password_sync, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    """Hash password using Argon2id off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, password_hasher.hash, password
+    )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash is bcrypt or uses outdated Argon2 parameters"""
+    if hashed_password.startswith(BCRYPT_PREFIX):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRATION_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    # exp is epoch seconds; no datetime round trip needed
+    lifetime = expires_delta or _JWT_EXPIRATION
+    to_encode.update({"exp": int(time.time() + lifetime.total_seconds())})
+    encoded_jwt = jwt.encode(to_encode, _JWT_SECRET, algorithm=_JWT_ALGORITHMS[0])
     
     return encoded_jwt
 
@@ -55,7 +139,18 @@ async def get_current_user(
     """
     Get current authenticated user from JWT token.
     Used as dependency in protected endpoints.
+    
+    Validated tokens are cached for up to a minute (keyed by token hash),
+    skipping both the JWT decode and the user lookup on repeat requests.
     """
+    cache_key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+    cached = await token_cache.get(cache_key)
+    if cached is not None:
+        version, expires_at, cached_user = cached
+        if version == get_auth_version() and expires_at > time.time():
+            return cached_user
+        await token_cache.pop(cache_key)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -63,7 +158,7 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -76,6 +171,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
+    await token_cache.set(cache_key, (get_auth_version(), payload["exp"], user))
+    
     return user
 
 
@@ -88,6 +185,74 @@ async def get_current_active_user(
     return current_user
 
 
+@dataclass(frozen=True, slots=True)
+class TokenClaims:
+    """Identity carried by the access token (no database lookup)"""
+    user_id: int
+    username: str
+    role: str
+    is_active: bool
+
+
+async def get_current_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    """
+    Get the caller's identity from the JWT claims alone.
+    Used by endpoints that only need username/role; role and active flag
+    are as of login and refresh when the token is reissued.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    try:
+        payload = jwt.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
+        return TokenClaims(
+            user_id=int(payload["uid"]),
+            username=payload["sub"],
+            role=payload["role"],
+            is_active=payload["act"]
+        )
+    except (JWTError, KeyError, TypeError, ValueError):
+        # Tokens issued before claims were added must log in again
+        raise credentials_exception
+
+
+async def get_current_active_claims(
+    claims: TokenClaims = Depends(get_current_claims)
+) -> TokenClaims:
+    """Ensure token belongs to an active user"""
+    if not claims.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return claims
+
+
+def require_role(role: str):
+    """
+    Build a dependency rejecting callers without the given role.
+    
+    Args:
+        role: Required role value (e.g. "admin")
+    
+    Returns:
+        Dependency returning the caller's TokenClaims
+    """
+    # Kept async although it never awaits: FastAPI runs sync (def)
+    # dependencies in the threadpool, async ones directly on the loop
+    async def dependency(
+        claims: TokenClaims = Depends(get_current_active_claims)
+    ) -> TokenClaims:
+        if claims.role != role:
+            raise HTTPException(status_code=403, detail=f"{role.capitalize()} access required")
+        return claims
+    
+    return dependency
+
+
+require_admin = require_role(UserRole.ADMIN.value)
+
+
 # Registration disabled - admin creates users only
 # @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 # async def register(
@@ -113,7 +278,7 @@ async def login(
     user_repo = UserRepository(db)
     user = await user_repo.get_by_username(form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -126,9 +291,18 @@ async def login(
             detail="Inactive user"
         )
     
+    # Transparently migrate bcrypt / outdated hashes now that we know the password
+    if password_needs_rehash(user.hashed_password):
+        await user_repo.update_password(user.user_id, await get_password_hash(form_data.password))
+    
     # Create access token
     access_token = create_access_token(
-        data={"sub": user.username}
+        data={
+            "sub": user.username,
+            "uid": str(user.user_id),
+            "role": UserRole(user.role).value,
+            "act": user.is_active
+        }
     )
     
     return {
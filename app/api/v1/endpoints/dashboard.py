@@ -2,103 +2,95 @@
 Dashboard endpoints.
 Provide real-time statistics and metrics.
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+import asyncio
+import hashlib
+import json
+from typing import Tuple
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.core.cache import AsyncTTLCache
+from app.database import AsyncSessionLocal
 from app.repositories.parking_repository import ParkingAllocationRepository
-from app.repositories.flight_repository import FlightRepository
-from app.repositories.notification_repository import NotificationRepository
-from app.api.v1.endpoints.auth import get_current_active_user
-from app.models.user import User
-from app.models.flight import Flight, FlightStatus
-from app.models.notification import NotificationSeverity
+from app.api.v1.endpoints.auth import TokenClaims, get_current_active_claims
 
 router = APIRouter()
 
+# Rendered /stats body shared by every poller for a few seconds.
+# Holds the in-flight task so concurrent misses share one computation.
+_stats_cache = AsyncTTLCache(maxsize=1, ttl=3)
+STATS_MAX_AGE = 2
 
-@router.get("/stats")
-async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """
-    Get comprehensive dashboard statistics.
-    Requires authentication.
+
+# Every flight/conflict/notification counter in a single round trip.
+# Plain SQL compiled once at import: the result is one row of integers,
+# so the ORM adds nothing but per-call compilation.
+# Counters sharing a partial index are computed in one scan with FILTER;
+# the flight counters each stay an index-only scan of their own partial
+# index (OR-ing them into one scan would have to visit the heap).
+_DASHBOARD_COUNTS = text("""
+    SELECT
+        (SELECT count(*) FROM flights
+         WHERE predicted_eta BETWEEN :now AND :horizon
+           AND status <> 'completed') AS approaching,
+        (SELECT count(*) FROM flights
+         WHERE predicted_etd BETWEEN :now AND :horizon
+           AND status <> 'completed') AS departing,
+        (SELECT count(*) FROM flights
+         WHERE created_at >= :today_start) AS today,
+        conflicts.active_conflicts,
+        conflicts.resolved_today,
+        unread.unread,
+        unread.critical
+    FROM (
+        SELECT
+            count(*) FILTER (WHERE actual_end_time IS NULL) AS active_conflicts,
+            count(*) FILTER (WHERE actual_end_time >= :today_start) AS resolved_today
+        FROM parking_allocations
+        WHERE conflict_detected = true
+          AND (actual_end_time IS NULL OR actual_end_time >= :today_start)
+    ) AS conflicts, (
+        SELECT
+            count(*) AS unread,
+            count(*) FILTER (WHERE severity = 'CRITICAL') AS critical
+        FROM notifications
+        WHERE read_status = false
+    ) AS unread
+""")
+
+
+async def _get_parking_stats() -> dict:
+    """Parking availability on its own session so it runs alongside the counts"""
+    async with AsyncSessionLocal() as session:
+        return await ParkingAllocationRepository(session).get_availability_stats()
+
+
+async def _compute_dashboard_stats() -> Tuple[bytes, str]:
     """
-    parking_repo = ParkingAllocationRepository(db)
-    flight_repo = FlightRepository(db)
-    notification_repo = NotificationRepository(db)
+    Compute dashboard statistics.
     
-    # Parking statistics
-    parking_stats = await parking_repo.get_availability_stats()
-    
-    # Flight statistics
-    # Flights approaching in next 30 minutes
+    Returns:
+        JSON body and its ETag
+    """
     now = datetime.utcnow()
     thirty_min_ahead = now + timedelta(minutes=30)
-    
-    approaching_result = await db.execute(
-        select(func.count()).select_from(Flight).where(
-            and_(
-                Flight.predicted_eta.between(now, thirty_min_ahead),
-                Flight.status != "completed"
-            )
-        )
-    )
-    approaching_count = approaching_result.scalar() or 0
-    
-    # Flights departing in next 30 minutes
-    departing_result = await db.execute(
-        select(func.count()).select_from(Flight).where(
-            and_(
-                Flight.predicted_etd.between(now, thirty_min_ahead),
-                Flight.status != "completed"
-            )
-        )
-    )
-    departing_count = departing_result.scalar() or 0
-    
-    # Total flights today
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_result = await db.execute(
-        select(func.count()).select_from(Flight).where(
-            Flight.created_at >= today_start
-        )
-    )
-    today_count = today_result.scalar() or 0
     
-    # Notification statistics
-    unread_notifications = await notification_repo.get_unread_count()
-    critical_notifications = len(await notification_repo.get_critical_unread())
-    
-    # Conflict statistics
-    from app.models.parking import ParkingAllocation
-    
-    active_conflicts_result = await db.execute(
-        select(func.count()).select_from(ParkingAllocation).where(
-            and_(
-                ParkingAllocation.conflict_detected == True,
-                ParkingAllocation.actual_end_time.is_(None)
-            )
-        )
-    )
-    active_conflicts = active_conflicts_result.scalar() or 0
-    
-    resolved_conflicts_result = await db.execute(
-        select(func.count()).select_from(ParkingAllocation).where(
-            and_(
-                ParkingAllocation.conflict_detected == True,
-                ParkingAllocation.actual_end_time.isnot(None),
-                ParkingAllocation.actual_end_time >= today_start
-            )
+    # Parking statistics use their own session, so both run concurrently
+    async with AsyncSessionLocal() as db:
+        parking_stats, counts_result = await asyncio.gather(
+            _get_parking_stats(),
+            db.execute(_DASHBOARD_COUNTS, {
+                "now": now,
+                "horizon": thirty_min_ahead,
+                "today_start": today_start
+            })
         )
-    )
-    resolved_today = resolved_conflicts_result.scalar() or 0
+        counts = counts_result.one()
     
-    return {
+    stats = {
         "parking": {
             "civil_occupied": parking_stats["civil_occupied"],
             "civil_total": parking_stats["civil_total"],
@@ -110,17 +102,52 @@ async def get_dashboard_stats(
             "occupation_rate": parking_stats["occupation_rate"]
         },
         "flights": {
-            "approaching_30min": approaching_count,
-            "departing_30min": departing_count,
-            "total_today": today_count
+            "approaching_30min": counts.approaching,
+            "departing_30min": counts.departing,
+            "total_today": counts.today
         },
         "conflicts": {
-            "active_conflicts": active_conflicts,
-            "resolved_today": resolved_today
+            "active_conflicts": counts.active_conflicts,
+            "resolved_today": counts.resolved_today
         },
         "notifications": {
-            "unread_count": unread_notifications,
-            "critical_alerts": critical_notifications
-        },
-        "timestamp": now
+            "unread_count": counts.unread,
+            "critical_alerts": counts.critical
+        }
     }
+    
+    # ETag covers the figures only, so an unchanged dashboard stays 304
+    # across recomputations even though the timestamp moves
+    etag = '"' + hashlib.sha1(json.dumps(stats, sort_keys=True).encode('utf-8')).hexdigest() + '"'
+    stats["timestamp"] = now
+    body = json.dumps(jsonable_encoder(stats)).encode('utf-8')
+    return body, etag
+
+
+@router.get("/stats")
+async def get_dashboard_stats(
+    request: Request,
+    current_user: TokenClaims = Depends(get_current_active_claims)
+):
+    """
+    Get comprehensive dashboard statistics.
+    Requires authentication.
+    
+    Cached for a few seconds and shared by all callers; supports
+    If-None-Match so unchanged polls get an empty 304.
+    """
+    task = await _stats_cache.get_or_set(
+        "stats", lambda: asyncio.create_task(_compute_dashboard_stats())
+    )
+    try:
+        # Shielded: a disconnecting poller must not cancel the shared task
+        body, etag = await asyncio.shield(task)
+    except Exception:
+        await _stats_cache.pop("stats")
+        raise
+    
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={STATS_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -2,6 +2,8 @@
 Flight endpoints.
 Provides read access to flight data.
 """
+import asyncio
+from itertools import chain, islice
 from typing import List, Optional
 from datetime import date, timedelta, datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -9,24 +11,53 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.repositories.flight_repository import FlightRepository
+from app.models.flight import FlightType, FlightStatus
 from app.schemas.flight import FlightResponse, FlightListResponse
-from app.api.v1.endpoints.auth import get_current_active_user
-from app.services.external.aviationstack_client import AviationStackClient
+from app.api.v1.endpoints.auth import TokenClaims, get_current_active_claims
+from app.services.external.aviationstack_client import AviationStackClient, get_aviation_client
+from app.services.ml.prediction_service import MLPredictionService
+from app.core.cache import AsyncTTLCache
 from app.core.config import get_settings
 
 router = APIRouter()
 settings = get_settings()
 
+# Resolved once at import instead of per AviationStack call
+_AIRPORT_IATA = settings.AIRPORT_IATA
+
+# Future schedules (> 7 days ahead) rarely change:
+# {(airport_iata, date, timetable_type): flights}
+_future_flights_cache = AsyncTTLCache(maxsize=256, ttl=600)
+
+
+async def _get_future_flights(
+    client: AviationStackClient,
+    target_date: date,
+    timetable_type: str
+) -> list:
+    """Fetch future flights from AviationStack, memoized for 10 minutes"""
+    key = (_AIRPORT_IATA, target_date, timetable_type)
+    flights = await _future_flights_cache.get(key)
+    if flights is None:
+        flights = await client.get_future_flights(
+            airport_iata=_AIRPORT_IATA,
+            future_date=target_date,
+            timetable_type=timetable_type
+        )
+        await _future_flights_cache.set(key, flights)
+    return flights
+
 
 @router.get("/", response_model=FlightListResponse)
 async def list_flights(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of records to return"),
-    flight_type: Optional[str] = Query(None, description="Filter by flight type (arrival/departure)"),
-    status: Optional[str] = Query(None, description="Filter by status"),
+    flight_type: Optional[FlightType] = Query(None, description="Filter by flight type (arrival/departure)"),
+    status: Optional[FlightStatus] = Query(None, description="Filter by status"),
     future_date: Optional[str] = Query(None, description="Get future flights for date (YYYY-MM-DD, must be > 7 days ahead)"),
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    client: AviationStackClient = Depends(get_aviation_client),
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     List flights with pagination and filters.
@@ -51,66 +82,52 @@ async def list_flights(
                 detail=f"Future date must be more than 7 days ahead. Minimum: {min_date.isoformat()}"
             )
         
-        # Fetch from AviationStack
-        async with AviationStackClient() as client:
-            try:
-                if flight_type == "arrival":
-                    future_flights = await client.get_future_flights(
-                        airport_iata=settings.AIRPORT_IATA,
-                        future_date=target_date,
-                        timetable_type="arrival"
-                    )
-                elif flight_type == "departure":
-                    future_flights = await client.get_future_flights(
-                        airport_iata=settings.AIRPORT_IATA,
-                        future_date=target_date,
-                        timetable_type="departure"
-                    )
-                else:
-                    # Both arrivals and departures
-                    arrivals = await client.get_future_flights(
-                        airport_iata=settings.AIRPORT_IATA,
-                        future_date=target_date,
-                        timetable_type="arrival"
-                    )
-                    departures = await client.get_future_flights(
-                        airport_iata=settings.AIRPORT_IATA,
-                        future_date=target_date,
-                        timetable_type="departure"
-                    )
-                    future_flights = arrivals + departures
-                
-                # Convert AviationStack format to our FlightResponse format
-                flights = []
-                for av_flight in future_flights[skip:skip+limit]:
-                    # Map AviationStack fields to our schema
-                    flight_dict = {
-                        "icao24": av_flight.aircraft.icao24 if av_flight.aircraft and av_flight.aircraft.icao24 else f"future_{av_flight.flight.iata}",
-                        "callsign": av_flight.flight.iata or "",
-                        "origin_country": "",
-                        "first_seen": None,
-                        "last_seen": None,
-                        "est_departure_time": av_flight.departure.scheduled if av_flight.departure else None,
-                        "est_arrival_time": av_flight.arrival.scheduled if av_flight.arrival else None,
-                        "departure_airport": av_flight.departure.iata if av_flight.departure else None,
-                        "arrival_airport": av_flight.arrival.iata if av_flight.arrival else None,
-                        "flight_type": flight_type or "arrival",
-                        "status": av_flight.flight_status.value if av_flight.flight_status else "scheduled",
-                        "created_at": None,
-                        "updated_at": None
-                    }
-                    flights.append(flight_dict)
-                
-                return {
-                    "total": len(future_flights),
-                    "skip": skip,
-                    "limit": limit,
-                    "flights": flights,
-                    "source": "aviationstack_future"
+        # Fetch from AviationStack (shared client, pooled connections)
+        try:
+            if flight_type:
+                timetables = [await _get_future_flights(client, target_date, flight_type.value)]
+            else:
+                # Both arrivals and departures, fetched concurrently
+                timetables = await asyncio.gather(
+                    _get_future_flights(client, target_date, "arrival"),
+                    _get_future_flights(client, target_date, "departure")
+                )
+            
+            # Page over the cached timetables without concatenating them
+            total = sum(len(timetable) for timetable in timetables)
+            page = islice(chain.from_iterable(timetables), skip, skip + limit)
+            
+            # Convert AviationStack format to our FlightResponse format
+            flights = []
+            for av_flight in page:
+                # Map AviationStack fields to our schema
+                flight_dict = {
+                    "icao24": av_flight.aircraft.icao24 if av_flight.aircraft and av_flight.aircraft.icao24 else f"future_{av_flight.flight.iata}",
+                    "callsign": av_flight.flight.iata or "",
+                    "origin_country": "",
+                    "first_seen": None,
+                    "last_seen": None,
+                    "est_departure_time": av_flight.departure.scheduled if av_flight.departure else None,
+                    "est_arrival_time": av_flight.arrival.scheduled if av_flight.arrival else None,
+                    "departure_airport": av_flight.departure.iata if av_flight.departure else None,
+                    "arrival_airport": av_flight.arrival.iata if av_flight.arrival else None,
+                    "flight_type": flight_type.value if flight_type else "arrival",
+                    "status": av_flight.flight_status.value if av_flight.flight_status else "scheduled",
+                    "created_at": None,
+                    "updated_at": None
                 }
-                
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Failed to fetch future flights: {str(e)}")
+                flights.append(flight_dict)
+            
+            return {
+                "total": total,
+                "skip": skip,
+                "limit": limit,
+                "flights": flights,
+                "source": "aviationstack_future"
+            }
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch future flights: {str(e)}")
     
     # Default: return from database
     flight_repo = FlightRepository(db)
@@ -135,7 +152,7 @@ async def list_flights(
 async def get_flight(
     icao24: str,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Get flight details by ICAO24.
@@ -155,7 +172,7 @@ async def get_flight_predictions(
     icao24: str,
     refresh: bool = Query(False, description="Force new ML prediction"),
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Get AI predictions for a specific flight.
@@ -165,8 +182,6 @@ async def get_flight_predictions(
     
     Requires authentication.
     """
-    from app.services.ml.prediction_service import MLPredictionService
-    
     # Check flight exists
     flight_repo = FlightRepository(db)
     flight = await flight_repo.get_by_icao24(icao24)
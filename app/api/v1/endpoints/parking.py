@@ -2,27 +2,52 @@
 Parking endpoints.
 Manage parking spots and allocations.
 """
+import hashlib
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 from pydantic import BaseModel
 
 from app.database import get_db
-from app.repositories.parking_repository import ParkingSpotRepository, ParkingAllocationRepository
+from app.repositories.parking_repository import (
+    ParkingSpotRepository,
+    ParkingAllocationRepository,
+    invalidate_availability_stats
+)
 from app.repositories.flight_repository import FlightRepository
-from app.services.business.parking_service import ParkingService
+from app.services.business.parking_service import DEFAULT_AIRCRAFT_SIZE, ParkingService
 from app.schemas.parking import (
     ParkingSpotResponse,
     ParkingAllocationResponse,
     ParkingSpotUpdate,
     ParkingSpotCreate
 )
-from app.api.v1.endpoints.auth import get_current_active_user
-from app.models.user import User
-from app.models.parking import SpotType, SpotStatus, AircraftSizeCategory
+from app.api.v1.endpoints.auth import TokenClaims, get_current_active_claims, require_admin
+from app.models.flight import Flight
+from app.models.parking import SpotType, SpotStatus, AircraftSizeCategory, ParkingSpot, ParkingAllocation
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
+# Browser cache lifetime of polled parking reads (dashboard widgets)
+PARKING_MAX_AGE = 2
+
+
+def _etag(value) -> str:
+    """Strong ETag of a JSON-serializable value"""
+    return '"' + hashlib.sha1(orjson.dumps(value, option=orjson.OPT_SORT_KEYS)).hexdigest() + '"'
+
+
+def _cache_headers(etag: str) -> dict:
+    """ETag and Cache-Control headers for polled parking reads"""
+    return {"ETag": etag, "Cache-Control": f"private, max-age={PARKING_MAX_AGE}"}
+
 
 class AssignParkingRequest(BaseModel):
     icao24: str
@@ -40,26 +65,60 @@ class CivilRecallRequest(BaseModel):
 
 @router.get("/spots", response_model=List[ParkingSpotResponse])
 async def list_parking_spots(
-    skip: int = Query(0, ge=0),
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     spot_type: Optional[str] = Query(None, description="Filter by type (civil/military)"),
     status: Optional[str] = Query(None, description="Filter by status"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     List all parking spots with optional filters.
     Requires authentication.
+    
+    Pages are chained with the X-Next-Cursor response header (absent on
+    the last page). Offset paging through skip is kept for existing
+    clients and also reports X-Total-Count.
+    
+    Supports If-None-Match: the ETag is derived from the table version
+    (see ParkingSpotRepository.get_version) and the query, so unchanged
+    polls get an empty 304 without loading any spot.
     """
+    after = None
+    if cursor:
+        key = decode_cursor(cursor)
+        if (
+            not key or len(key) != 2
+            or not isinstance(key[0], int) or not isinstance(key[1], str)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (key[0], key[1])
+    
     parking_repo = ParkingSpotRepository(db)
     
+    version = await parking_repo.get_version()
+    etag = _etag([version, skip, limit, cursor, spot_type, status])
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=_cache_headers(etag))
+    response.headers.update(_cache_headers(etag))
+    
     spots, total = await parking_repo.list_spots(
         skip=skip,
         limit=limit,
         spot_type=spot_type,
-        status=status
+        status=status,
+        after=after
     )
     
+    if len(spots) == limit:
+        last = spots[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.spot_number, last.spot_id])
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    
     return spots
 
 
@@ -67,7 +126,7 @@ async def list_parking_spots(
 async def get_parking_spot(
     spot_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Get parking spot details.
@@ -86,48 +145,46 @@ async def get_parking_spot(
 async def update_parking_spot(
     spot_id: str,
     update_data: ParkingSpotUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update parking spot configuration.
     Admin only - requires authentication.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     parking_repo = ParkingSpotRepository(db)
     
-    # Update status if provided
-    if update_data.status:
-        spot = await parking_repo.update_status(spot_id, update_data.status)
+    fields = update_data.model_dump(exclude_unset=True)
+    if fields.get("status") is not None:
+        try:
+            fields["status"] = SpotStatus(fields["status"].lower())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {fields['status']}")
+    else:
+        fields.pop("status", None)
+    
+    # Single UPDATE ... RETURNING when there is something to change
+    if fields:
+        spot = await parking_repo.update_and_return(spot_id, **fields)
     else:
         spot = await parking_repo.get_by_id(spot_id)
     
     if not spot:
         raise HTTPException(status_code=404, detail="Parking spot not found")
     
-    # Update notes if provided (requires additional update method)
-    # For now, just return the spot
-    
     return spot
 
 
 @router.post("/spots", response_model=ParkingSpotResponse, status_code=201)
 async def create_parking_spot(
     spot_data: ParkingSpotCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new parking spot.
     Admin only - requires authentication.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     parking_repo = ParkingSpotRepository(db)
     
     # Check if spot_id already exists
@@ -136,7 +193,6 @@ async def create_parking_spot(
         raise HTTPException(status_code=400, detail=f"Spot {spot_data.spot_id} already exists")
     
     # Create new spot
-    from app.models.parking import ParkingSpot
     new_spot = ParkingSpot(
         spot_id=spot_data.spot_id,
         spot_number=spot_data.spot_number,
@@ -151,6 +207,7 @@ async def create_parking_spot(
     
     db.add(new_spot)
     await db.commit()
+    await invalidate_availability_stats()
     await db.refresh(new_spot)
     
     return new_spot
@@ -159,18 +216,14 @@ async def create_parking_spot(
 @router.delete("/spots/{spot_id}", status_code=204)
 async def delete_parking_spot(
     spot_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a parking spot.
     Admin only - requires authentication.
     Cannot delete if spot has active allocations.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     parking_repo = ParkingSpotRepository(db)
     allocation_repo = ParkingAllocationRepository(db)
     
@@ -179,26 +232,25 @@ async def delete_parking_spot(
     if not spot:
         raise HTTPException(status_code=404, detail="Parking spot not found")
     
-    # Check for active allocations
-    from sqlalchemy import select
-    from app.models.parking import ParkingAllocation
+    # Check for active allocations (index-only probe of idx_allocation_active_partial)
     result = await db.execute(
-        select(ParkingAllocation).where(
+        select(ParkingAllocation.flight_icao24).where(
             ParkingAllocation.spot_id == spot_id,
             ParkingAllocation.actual_end_time.is_(None)
         ).limit(1)
     )
-    active_allocation = result.scalar_one_or_none()
+    active_flight = result.scalar_one_or_none()
     
-    if active_allocation:
+    if active_flight:
         raise HTTPException(
             status_code=400,
-            detail=f"Cannot delete spot {spot_id} - has active allocation (flight {active_allocation.flight_icao24})"
+            detail=f"Cannot delete spot {spot_id} - has active allocation (flight {active_flight})"
         )
     
     # Delete spot
     await db.delete(spot)
     await db.commit()
+    await invalidate_availability_stats()
     
     return None
 
@@ -207,7 +259,7 @@ async def delete_parking_spot(
 async def list_allocations(
     active_only: bool = Query(True, description="Show only active allocations"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     List parking allocations.
@@ -215,7 +267,8 @@ async def list_allocations(
     """
     parking_repo = ParkingAllocationRepository(db)
     
-    allocations, total = await parking_repo.list_allocations(active_only=active_only)
+    # Response is a bare list, so skip the COUNT query
+    allocations, _ = await parking_repo.list_allocations(active_only=active_only, with_total=False)
     
     return allocations
 
@@ -224,7 +277,7 @@ async def list_allocations(
 async def get_allocation(
     allocation_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Get allocation details.
@@ -241,17 +294,26 @@ async def get_allocation(
 
 @router.get("/availability")
 async def get_parking_availability(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Get current parking availability statistics.
     Requires authentication.
+    
+    Supports If-None-Match so unchanged polls get an empty 304.
     """
     parking_repo = ParkingAllocationRepository(db)
     
     stats = await parking_repo.get_availability_stats()
     
+    etag = _etag(stats)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=_cache_headers(etag))
+    response.headers.update(_cache_headers(etag))
+    
     return stats
 
 
@@ -259,7 +321,7 @@ async def get_parking_availability(
 async def assign_parking(
     request: AssignParkingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Manually trigger parking allocation for a flight.
@@ -295,22 +357,21 @@ async def assign_parking(
 @router.post("/military-transfer")
 async def military_transfer(
     request: MilitaryTransferRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Manually transfer flight to military parking (ADMIN ONLY).
     This is used when civil saturation occurs and admin decides to override.
     Only transfers flights that are ALREADY allocated to civil spots.
     """
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     flight_repo = FlightRepository(db)
-    parking_service = ParkingService(db)
     spot_repo = ParkingSpotRepository(db)
     allocation_repo = ParkingAllocationRepository(db)
     
+    # Single timestamp for every time computation of this transfer
+    now = datetime.now(timezone.utc)
+    
     # Get flight
     flight = await flight_repo.get_by_icao24(request.icao24)
     if not flight:
@@ -324,89 +385,99 @@ async def military_transfer(
         if existing_allocation.overflow_to_military:
             raise HTTPException(status_code=400, detail="Flight already in military parking")
         
-        # Get current civil spot
         current_spot = await spot_repo.get_by_id(existing_allocation.spot_id)
         if not current_spot:
             raise HTTPException(status_code=404, detail="Current spot not found")
         
-        # Get available military spot
-        military_spots = await spot_repo.get_available_by_type(
-            spot_type=SpotType.MILITARY,
-            aircraft_size=parking_service._get_aircraft_size("A320")
-        )
-        
-        if not military_spots:
-            raise HTTPException(status_code=400, detail="No military spots available")
-        
         # Complete old allocation
-        from datetime import datetime, timedelta, timezone
-        now = datetime.now(timezone.utc)
         duration = int((now - existing_allocation.allocated_at).total_seconds() / 60)
-        
-        await allocation_repo.complete_allocation(
-            allocation_id=existing_allocation.allocation_id,
-            actual_start_time=existing_allocation.allocated_at,
-            actual_end_time=now,
-            actual_duration_minutes=duration
-        )
-        
-        # Free civil spot
-        await spot_repo.update_status(current_spot.spot_id, SpotStatus.AVAILABLE)
-        
-        # Create new military allocation
         remaining_minutes = int((existing_allocation.predicted_end_time - now).total_seconds() / 60)
-        new_allocation = await allocation_repo.create(
-            flight_icao24=flight.icao24,
-            spot_id=military_spots[0].spot_id,
-            predicted_duration_minutes=max(remaining_minutes, 10),
-            predicted_end_time=existing_allocation.predicted_end_time,
-            overflow_to_military=True,
-            overflow_reason=f"Admin manual transfer: {request.reason}"
-        )
-        
-        # Update military spot status
-        await spot_repo.update_status(military_spots[0].spot_id, SpotStatus.OCCUPIED)
         
-        # Update flight parking assignment
-        await flight_repo.update_parking_assignment(flight.icao24, military_spots[0].spot_id)
+        # All writes below commit together (or not at all)
+        try:
+            # Claim a military spot (marked OCCUPIED atomically)
+            military_spot = await spot_repo.claim_available(
+                spot_type=SpotType.MILITARY,
+                aircraft_size=DEFAULT_AIRCRAFT_SIZE,
+                commit=False
+            )
+            if not military_spot:
+                raise HTTPException(status_code=400, detail="No military spots available")
+            
+            await allocation_repo.complete_allocation(
+                allocation_id=existing_allocation.allocation_id,
+                actual_start_time=existing_allocation.allocated_at,
+                actual_end_time=now,
+                actual_duration_minutes=duration,
+                commit=False
+            )
+            
+            # Create new military allocation
+            new_allocation = await allocation_repo.create(
+                flight_icao24=flight.icao24,
+                spot_id=military_spot.spot_id,
+                predicted_duration_minutes=max(remaining_minutes, 10),
+                predicted_end_time=existing_allocation.predicted_end_time,
+                overflow_to_military=True,
+                overflow_reason=f"Admin manual transfer: {request.reason}",
+                commit=False
+            )
+            
+            # Free civil spot
+            await spot_repo.update_status(current_spot.spot_id, SpotStatus.AVAILABLE, commit=False)
+            
+            # Update flight parking assignment
+            await flight_repo.update_parking_assignment(flight.icao24, military_spot.spot_id, commit=False)
+            
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        await invalidate_availability_stats()
         
         return {
             "success": True,
             "allocation_id": new_allocation.allocation_id,
-            "spot_id": military_spots[0].spot_id,
+            "spot_id": military_spot.spot_id,
             "previous_spot": current_spot.spot_id,
             "reason": request.reason,
             "freed_civil_spot": True
         }
     else:
         # New flight without allocation - create military allocation directly
-        military_spots = await spot_repo.get_available_by_type(
-            spot_type=SpotType.MILITARY,
-            aircraft_size=parking_service._get_aircraft_size("A320")
-        )
-        
-        if not military_spots:
-            raise HTTPException(status_code=400, detail="No military spots available")
-        
-        from datetime import timezone
         predicted_minutes = flight.predicted_occupation_minutes or 60
         
-        allocation = await allocation_repo.create(
-            flight_icao24=flight.icao24,
-            spot_id=military_spots[0].spot_id,
-            predicted_duration_minutes=predicted_minutes,
-            predicted_end_time=datetime.now(timezone.utc) + timedelta(minutes=predicted_minutes),
-            overflow_to_military=True,
-            overflow_reason=f"Admin decision: {request.reason}"
-        )
-        
-        await spot_repo.update_status(military_spots[0].spot_id, SpotStatus.OCCUPIED)
-        await flight_repo.update_parking_assignment(flight.icao24, military_spots[0].spot_id)
+        try:
+            military_spot = await spot_repo.claim_available(
+                spot_type=SpotType.MILITARY,
+                aircraft_size=DEFAULT_AIRCRAFT_SIZE,
+                commit=False
+            )
+            if not military_spot:
+                raise HTTPException(status_code=400, detail="No military spots available")
+            
+            allocation = await allocation_repo.create(
+                flight_icao24=flight.icao24,
+                spot_id=military_spot.spot_id,
+                predicted_duration_minutes=predicted_minutes,
+                predicted_end_time=now + timedelta(minutes=predicted_minutes),
+                overflow_to_military=True,
+                overflow_reason=f"Admin decision: {request.reason}",
+                commit=False
+            )
+            
+            await flight_repo.update_parking_assignment(flight.icao24, military_spot.spot_id, commit=False)
+            
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        await invalidate_availability_stats()
         
         return {
             "success": True,
             "allocation_id": allocation.allocation_id,
-            "spot_id": military_spots[0].spot_id,
+            "spot_id": military_spot.spot_id,
             "reason": request.reason,
             "freed_civil_spot": False
         }
@@ -416,7 +487,7 @@ async def military_transfer(
 async def civil_recall(
     request: CivilRecallRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
     Recall flight from military to civil parking.
@@ -424,72 +495,75 @@ async def civil_recall(
     """
     flight_repo = FlightRepository(db)
     parking_service = ParkingService(db)
-    spot_repo = ParkingSpotRepository(db)
     
-    # Get flight
     flight = await flight_repo.get_by_icao24(request.icao24)
     if not flight:
         raise HTTPException(status_code=404, detail="Flight not found")
     
-    # Get available civil spot
-    civil_spots = await spot_repo.get_available_by_type(
-        spot_type=SpotType.CIVIL,
-        aircraft_size=parking_service._get_aircraft_size("A320")
-    )
-    
-    if not civil_spots:
-        raise HTTPException(status_code=400, detail="No civil spots available for recall")
+    # Execute recall (claims an available civil spot atomically)
+    result = await parking_service.recall_from_military(flight)
     
-    # Execute recall
-    success = await parking_service.recall_from_military(flight, civil_spots[0])
-    
-    if not success:
-        raise HTTPException(status_code=400, detail="Recall failed - flight not in military overflow")
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.reason)
     
     return {
         "success": True,
-        "new_spot_id": civil_spots[0].spot_id,
-        "message": f"Flight recalled to civil spot {civil_spots[0].spot_id}"
+        "new_spot_id": result.spot.spot_id,
+        "message": f"Flight recalled to civil spot {result.spot.spot_id}"
     }
 
 
-@router.get("/conflicts")
+@router.get("/conflicts", response_class=ORJSONResponse)
 async def list_conflicts(
+    limit: int = Query(100, ge=1, le=500, description="Most recent conflicts to return"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims)
 ):
     """
-    List all detected parking conflicts.
+    List the most recent detected parking conflicts.
     Requires authentication.
     """
-    from sqlalchemy.orm import joinedload
-    from sqlalchemy import select
-    from app.models.parking import ParkingAllocation
-    
-    allocation_repo = ParkingAllocationRepository(db)
-    
-    # Get allocations with conflicts
-    result = await db.execute(
+    # Get allocations with conflicts, newest first (backward scan of
+    # idx_allocation_conflict_partial), streamed in batches of 500 (flights
+    # loaded with one IN query per batch). Only the columns of the response
+    # are fetched and hydrated.
+    result = await db.stream_scalars(
         select(ParkingAllocation)
         .options(
-            joinedload(ParkingAllocation.spot)
+            load_only(
+                ParkingAllocation.allocation_id,
+                ParkingAllocation.flight_icao24,
+                ParkingAllocation.spot_id,
+                ParkingAllocation.conflict_probability,
+                ParkingAllocation.allocated_at,
+                ParkingAllocation.predicted_end_time,
+                ParkingAllocation.overflow_to_military
+            ),
+            selectinload(ParkingAllocation.flight).load_only(Flight.callsign)
         )
         .where(ParkingAllocation.conflict_detected == True)
         .order_by(ParkingAllocation.allocated_at.desc())
+        .limit(limit)
+        .execution_options(yield_per=500)
     )
-    allocations = list(result.scalars().all())
     
-    return [
+    conflicts = [
         {
             "allocation_id": alloc.allocation_id,
             "flight_icao24": alloc.flight_icao24,
-            "callsign": None,  # Flight relationship not available
+            "callsign": alloc.flight.callsign if alloc.flight else None,
             "spot_id": alloc.spot_id,
             "conflict_probability": alloc.conflict_probability,
             "allocated_at": alloc.allocated_at,
             "predicted_end_time": alloc.predicted_end_time,
             "overflow_to_military": alloc.overflow_to_military
         }
-        for alloc in allocations
+        async for alloc in result
     ]
+    
+    # Serialized by orjson directly, skipping jsonable_encoder
+    return Response(
+        content=orjson.dumps(conflicts, option=orjson.OPT_NAIVE_UTC),
+        media_type="application/json"
+    )
 
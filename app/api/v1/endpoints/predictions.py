@@ -2,9 +2,11 @@
 Predictions endpoint - ML integration with Hugging Face API
 Provides access to all 3 ML models for flight predictions
 """
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict
+import asyncio
+import logging
+
+from fastapi import APIRouter, Body, HTTPException, Depends, Response
+from typing import Annotated, Dict, List
 
 from app.schemas.prediction import (
     FlightPredictionRequest,
@@ -12,14 +14,69 @@ from app.schemas.prediction import (
     MLHealthResponse,
     MLModelsInfoResponse
 )
-from app.services.external.ml_client import MLAPIClient
-from app.api.v1.endpoints.auth import get_current_active_user
-from app.models.user import User
-from app.database import get_db
+from app.services.external.ml_client import MLAPIClient, get_ml_client
+from app.services.business.traffic_stats_service import (
+    get_traffic_snapshot,
+    get_weather_data,
+    get_historical_data_cached
+)
+from app.api.v1.endpoints.auth import TokenClaims, get_current_active_claims
+from app.core.config import settings
+from app.exceptions import AIModelUnavailableException
 from app.core.logging import logger
 
 router = APIRouter()
 
+# Maximum flights per /predict/batch call
+MAX_BATCH_PREDICTIONS = 50
+
+
+def _http_error(status_code: int, detail: str, event: str, exc: Exception) -> HTTPException:
+    """
+    Log the failure once (with traceback) and build an HTTP error whose
+    detail is static, so exception internals are not sent to clients.
+    
+    Args:
+        status_code: HTTP status to return
+        detail: Client-facing message
+        event: Log message
+        exc: Exception being handled
+    
+    Returns:
+        HTTPException to raise
+    """
+    logger.exception(event, extra={"error_type": type(exc).__name__})
+    return HTTPException(status_code=status_code, detail=detail)
+
+# Champs du modèle ML remplis depuis les statistiques de trafic : (champ, clé)
+_TRAFFIC_FIELDS = (
+    ("trafic_approche", "approaching"),
+    ("occupation_tarmac", "tarmac_occupation"),
+    ("disponibilite_emplacements", "available_spots"),
+    ("occupation_actuelle", "current_occupation"),
+    ("trafic_entrant", "incoming"),
+    ("trafic_sortant", "outgoing"),
+    ("emplacements_futurs_libres", "future_free_spots")
+)
+
+# Champs remplis depuis la météo : (champ, clé)
+_WEATHER_FIELDS = (
+    ("temperature", "temperature"),
+    ("vent_vitesse", "wind_speed"),
+    ("visibilite", "visibility"),
+    ("pluie", "rain"),
+    ("meteo_score", "score")
+)
+
+# Champs remplis depuis l'historique du vol : (champ, clé, valeur par défaut)
+_HISTORICAL_FIELDS = (
+    ("retard_historique_compagnie", "avg_delay", 5.0),
+    ("type_avion", "aircraft_type", "A320"),
+    ("historique_occupation_avion", "avg_occupation_time", 45.0),
+    ("passagers_estimes", "passengers", 180),
+    ("compagnie", "airline", "Unknown")
+)
+
 
 @router.post(
     "/predict",
@@ -37,16 +94,15 @@ router = APIRouter()
 )
 async def predict_flight(
     request: FlightPredictionRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
-) -> FlightPredictionResponse:
+    current_user: TokenClaims = Depends(get_current_active_claims),
+    ml_client: MLAPIClient = Depends(get_ml_client)
+) -> Response:
     """
     Predict flight metrics using ML models with real-time data enrichment
     
     Args:
         request: Flight data for prediction
         current_user: Authenticated user
-        db: Database session
     
     Returns:
         Complete prediction from all 3 models
@@ -56,110 +112,94 @@ async def predict_flight(
     """
     try:
         # Enrichir les données de requête avec des statistiques réelles de la DB
-        from app.services.business.traffic_stats_service import (
-            get_traffic_statistics,
-            get_weather_data,
-            get_historical_data
-        )
-        from app.repositories.flight_repository import FlightRepository
-        
-        # Récupérer les statistiques de trafic en temps réel (avec gestion d'erreur)
-        try:
-            traffic_stats = await get_traffic_statistics(db)
-        except Exception as e:
-            logger.warning(f"Error getting traffic stats, using defaults: {str(e)}")
-            await db.rollback()  # Reset transaction
-            traffic_stats = {
-                "approaching": 5, "tarmac_occupation": 0.65, "available_spots": 12,
-                "current_occupation": 0.70, "incoming": 8, "outgoing": 6, "future_free_spots": 3
-            }
-        
-        # Récupérer les données météo (pour l'instant simulées)
-        weather = await get_weather_data()
+        # Statistiques de trafic (instantané en mémoire, avec gestion d'erreur)
+        async def _safe_traffic() -> Dict:
+            try:
+                return await get_traffic_snapshot()
+            except Exception as e:
+                logger.warning(f"Error getting traffic stats, using defaults: {str(e)}")
+                return {
+                    "approaching": 5, "tarmac_occupation": 0.65, "available_spots": 12,
+                    "current_occupation": 0.70, "incoming": 8, "outgoing": 6, "future_free_spots": 3
+                }
         
-        # Si un icao24 est fourni, récupérer le vol de la DB pour données historiques
-        historical_data = {}
-        if request.icao24:
+        # Si un icao24 est fourni, données historiques du vol (cache Redis)
+        async def _safe_historical() -> Dict:
+            if not request.icao24:
+                return {}
             try:
-                flight_repo = FlightRepository(db)
-                flight = await flight_repo.get_by_icao24(request.icao24)
-                if flight:
-                    historical_data = await get_historical_data(db, flight)
+                return await get_historical_data_cached(request.icao24)
             except Exception as e:
                 logger.warning(f"Error getting historical data for {request.icao24}, using defaults: {str(e)}")
-                await db.rollback()  # Reset transaction
-                historical_data = {}
+                return {}
         
-        # FORCER le remplacement par les données réelles de la DB (pas de données fictives)
-        enriched_data = request.model_dump()
-        
-        # Remplacer TOUTES les statistiques de trafic par les vraies données temps réel
-        enriched_data["trafic_approche"] = traffic_stats["approaching"]
-        enriched_data["occupation_tarmac"] = traffic_stats["tarmac_occupation"]
-        enriched_data["disponibilite_emplacements"] = traffic_stats["available_spots"]
-        enriched_data["occupation_actuelle"] = traffic_stats["current_occupation"]
-        enriched_data["trafic_entrant"] = traffic_stats["incoming"]
-        enriched_data["trafic_sortant"] = traffic_stats["outgoing"]
-        enriched_data["emplacements_futurs_libres"] = traffic_stats["future_free_spots"]
-        
-        # Remplacer les données météo par les vraies données
-        enriched_data["temperature"] = weather["temperature"]
-        enriched_data["vent_vitesse"] = weather["wind_speed"]
-        enriched_data["visibilite"] = weather["visibility"]
-        enriched_data["pluie"] = weather["rain"]
-        enriched_data["meteo_score"] = weather["score"]
+        # Sources indépendantes, récupérées en parallèle ; aucune n'utilise la
+        # session de la requête (un cache miss ouvre sa propre session)
+        traffic_stats, weather, historical_data = await asyncio.gather(
+            _safe_traffic(), get_weather_data(), _safe_historical()
+        )
         
-        # Remplacer les données historiques si disponibles depuis la DB
+        # FORCER le remplacement par les données réelles de la DB (pas de données fictives) :
+        # trafic temps réel, météo, puis historique (ou valeurs par défaut)
+        base = request.model_dump()
         if historical_data:
-            enriched_data["retard_historique_compagnie"] = historical_data.get("avg_delay", 5.0)
-            enriched_data["type_avion"] = historical_data.get("aircraft_type", enriched_data.get("type_avion", "A320"))
-            enriched_data["historique_occupation_avion"] = historical_data.get("avg_occupation_time", 45.0)
-            enriched_data["passagers_estimes"] = historical_data.get("passengers", 180)
-            enriched_data["compagnie"] = historical_data.get("airline", enriched_data.get("compagnie", "Unknown"))
+            historical = {
+                field: historical_data.get(key, default)
+                for field, key, default in _HISTORICAL_FIELDS
+            }
         else:
-            # Valeurs par défaut si pas de données historiques
-            enriched_data["retard_historique_compagnie"] = enriched_data.get("retard_historique_compagnie") or 5.0
-            enriched_data["type_avion"] = enriched_data.get("type_avion") or "A320"
-            enriched_data["historique_occupation_avion"] = enriched_data.get("historique_occupation_avion") or 45.0
-            enriched_data["passagers_estimes"] = enriched_data.get("passagers_estimes") or 180
-            enriched_data["compagnie"] = enriched_data.get("compagnie") or "Unknown"
+            historical = {field: base[field] or default for field, _, default in _HISTORICAL_FIELDS}
+        
+        enriched_data = {
+            **base,
+            **{field: traffic_stats[key] for field, key in _TRAFFIC_FIELDS},
+            **{field: weather[key] for field, key in _WEATHER_FIELDS},
+            **historical
+        }
         
         # Assurer que priorite_vol est défini
-        enriched_data["priorite_vol"] = enriched_data.get("priorite_vol", 0)
+        if enriched_data["priorite_vol"] is None:
+            enriched_data["priorite_vol"] = 0
+        
+        # Log des données réelles utilisées pour la prédiction (debug uniquement)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "ML prediction inputs for flight %s",
+                request.callsign or "unknown",
+                extra={
+                    "traffic": traffic_stats,
+                    "weather": weather,
+                    "delay_avg": enriched_data["retard_historique_compagnie"],
+                    "occupation_avg": enriched_data["historique_occupation_avion"]
+                }
+            )
+        
+        # Call Hugging Face ML API avec données enrichies
+        prediction = await ml_client.predict(enriched_data)
+        
+        # Validée une seule fois puis sérialisée par pydantic-core : le retour
+        # d'une Response évite la seconde validation de response_model
+        response = FlightPredictionResponse.model_validate(prediction)
         
-        # Log des données réelles utilisées pour la prédiction
         logger.info(
-            f"🔄 Prédiction ML avec DONNÉES RÉELLES (pas de mock) - Flight: {request.callsign or 'unknown'}\n"
-            f"  📊 Trafic DB: approaching={traffic_stats['approaching']}, "
-            f"occupation={traffic_stats['current_occupation']*100:.0f}%, "
-            f"spots_dispos={traffic_stats['available_spots']}\n"
-            f"  🌤️  Météo: temp={weather['temperature']}°C, vent={weather['wind_speed']}km/h, "
-            f"visibilité={weather['visibility']}km\n"
-            f"  ✈️  Historique: delay_avg={enriched_data['retard_historique_compagnie']}min, "
-            f"occupation_avg={enriched_data['historique_occupation_avion']}min"
+            "ML prediction successful for flight %s",
+            request.callsign or "unknown",
+            extra={"callsign": request.callsign or "unknown"}
         )
         
-        async with MLAPIClient() as ml_client:
-            # Call Hugging Face ML API avec données enrichies
-            prediction = await ml_client.predict(enriched_data)
-            
-            # Créer la réponse avant tout logging pour éviter les problèmes greenlet
-            response = FlightPredictionResponse(**prediction)
-            
-            logger.info(
-                f"ML prediction successful for flight {request.callsign or 'unknown'}"
-            )
-            
-            return response
+        return Response(
+            content=response.model_dump_json(),
+            media_type="application/json"
+        )
     
     except HTTPException:
         raise
+    except AIModelUnavailableException as e:
+        # Panne attendue (circuit ouvert / 503) : pas de traceback
+        logger.warning("ML prediction unavailable: %s", e)
+        raise HTTPException(status_code=503, detail="ML API indisponible") from e
     except Exception as e:
-        logger.error(f"Unexpected error in ML prediction: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de la prédiction ML: {str(e)}"
-        )
+        raise _http_error(500, "Erreur lors de la prédiction ML", "Unexpected error in ML prediction", e) from e
 
 
 @router.get(
@@ -169,7 +209,8 @@ async def predict_flight(
     description="Verifies that the ML API and models are operational"
 )
 async def check_ml_health(
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims),
+    ml_client: MLAPIClient = Depends(get_ml_client)
 ) -> MLHealthResponse:
     """
     Check health status of ML API
@@ -184,24 +225,20 @@ async def check_ml_health(
         HTTPException: If ML API is unreachable
     """
     try:
-        async with MLAPIClient() as ml_client:
-            health = await ml_client.health_check()
-            
-            logger.info(
-                f"ML health check: {health['status']} "
-                f"(user: {current_user.username})"
-            )
-            
-            return MLHealthResponse(**health)
+        health = await ml_client.health_check()
+        
+        logger.info(
+            "ML health check: %s (user: %s)",
+            health["status"],
+            current_user.username
+        )
+        
+        return MLHealthResponse(**health)
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"ML health check failed: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail=f"ML API indisponible: {str(e)}"
-        )
+        raise _http_error(503, "ML API indisponible", "ML health check failed", e) from e
 
 
 @router.get(
@@ -211,7 +248,8 @@ async def check_ml_health(
     description="Returns detailed information about the 3 ML models"
 )
 async def get_models_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims),
+    ml_client: MLAPIClient = Depends(get_ml_client)
 ) -> MLModelsInfoResponse:
     """
     Get information about ML models
@@ -226,23 +264,16 @@ async def get_models_info(
         HTTPException: If ML API is unreachable
     """
     try:
-        async with MLAPIClient() as ml_client:
-            info = await ml_client.get_models_info()
-            
-            logger.info(
-                f"ML models info retrieved (user: {current_user.username})"
-            )
-            
-            return MLModelsInfoResponse(**info)
+        info = await ml_client.get_models_info()
+        
+        logger.info("ML models info retrieved (user: %s)", current_user.username)
+        
+        return MLModelsInfoResponse(**info)
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get models info: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail=f"Impossible de récupérer les infos ML: {str(e)}"
-        )
+        raise _http_error(503, "Impossible de récupérer les infos ML", "Failed to get models info", e) from e
 
 
 @router.post(
@@ -252,9 +283,9 @@ async def get_models_info(
     description="Performs predictions for multiple flights in parallel"
 )
 async def predict_batch(
-    requests: list[FlightPredictionRequest],
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    requests: Annotated[List[FlightPredictionRequest], Body(max_length=MAX_BATCH_PREDICTIONS)],
+    current_user: TokenClaims = Depends(get_current_active_claims),
+    ml_client: MLAPIClient = Depends(get_ml_client)
 ) -> Dict:
     """
     Batch prediction for multiple flights
@@ -262,44 +293,55 @@ async def predict_batch(
     Args:
         requests: List of flight data
         current_user: Authenticated user
-        db: Database session
     
     Returns:
         Dictionary with results and errors
     
     Note:
-        This endpoint processes predictions sequentially to avoid
-        overwhelming the ML API. For production, consider implementing
-        a queue system.
+        Predictions run concurrently, at most ML_BATCH_CONCURRENCY at a
+        time over the shared connection pool, so the ML API is not flooded.
+        Batches over MAX_BATCH_PREDICTIONS are rejected (422) on the list
+        length, before any item is validated.
     """
-    if len(requests) > 50:
-        raise HTTPException(
-            status_code=400,
-            detail="Maximum 50 flights per batch request"
-        )
+    semaphore = asyncio.Semaphore(settings.ML_BATCH_CONCURRENCY)
     
-    results = []
-    errors = []
-    
-    async with MLAPIClient() as ml_client:
-        for idx, request in enumerate(requests):
+    async def _predict_one(idx: int, request: FlightPredictionRequest):
+        async with semaphore:
             try:
                 prediction = await ml_client.predict(request.model_dump())
-                results.append({
+                return {
                     "index": idx,
                     "callsign": request.callsign,
                     "prediction": prediction
-                })
+                }, None
+            except AIModelUnavailableException as e:
+                logger.warning("Batch prediction %d unavailable: %s", idx, e)
+                error = "ML API indisponible"
             except Exception as e:
-                errors.append({
-                    "index": idx,
-                    "callsign": request.callsign,
-                    "error": str(e)
-                })
+                logger.exception(
+                    "Batch prediction %d failed",
+                    idx,
+                    extra={"error_type": type(e).__name__}
+                )
+                error = "Erreur lors de la prédiction ML"
+            # Message statique : le détail de l'exception reste dans les logs
+            return None, {
+                "index": idx,
+                "callsign": request.callsign,
+                "error": error
+            }
+    
+    outcomes = await asyncio.gather(
+        *(_predict_one(idx, request) for idx, request in enumerate(requests))
+    )
+    results = [result for result, _ in outcomes if result is not None]
+    errors = [error for _, error in outcomes if error is not None]
     
     logger.info(
-        f"Batch prediction: {len(results)} success, {len(errors)} errors "
-        f"(user: {current_user.username})"
+        "Batch prediction: %d success, %d errors (user: %s)",
+        len(results),
+        len(errors),
+        current_user.username
     )
     
     return {
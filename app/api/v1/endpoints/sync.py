@@ -2,85 +2,86 @@
 Synchronization endpoints.
 Manage flight synchronization with OpenSky Network.
 """
-from fastapi import APIRouter, Depends, HTTPException
-from app.api.v1.endpoints.auth import get_current_active_user
-from app.models.user import User
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.api.v1.endpoints.auth import TokenClaims, get_current_active_claims, require_admin
+from app.services.orchestration.scheduler import FlightSyncScheduler
 
 router = APIRouter()
 
 
-# Global scheduler instance will be injected during startup
-_scheduler = None
+async def get_scheduler(request: Request) -> Optional[FlightSyncScheduler]:
+    """Scheduler started by the application lifespan (None before startup)"""
+    return getattr(request.app.state, "scheduler", None)
+
 
-def set_scheduler(scheduler):
-    """Called by main.py during startup to inject scheduler instance"""
-    global _scheduler
-    _scheduler = scheduler
+async def require_scheduler(
+    scheduler: Optional[FlightSyncScheduler] = Depends(get_scheduler)
+) -> FlightSyncScheduler:
+    """
+    Dependency requiring a running scheduler.
+    
+    Raises:
+        HTTPException: 503 if the scheduler is not initialized
+    """
+    if not scheduler:
+        raise HTTPException(status_code=503, detail="Scheduler not initialized")
+    return scheduler
 
 
 @router.post("/trigger")
 async def trigger_manual_sync(
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    scheduler: FlightSyncScheduler = Depends(require_scheduler)
 ):
     """
     Manually trigger flight synchronization.
     Admin only - requires authentication.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    if not _scheduler:
-        raise HTTPException(status_code=503, detail="Scheduler not initialized")
-    
-    result = await _scheduler.trigger_manual_sync()
+    result = await scheduler.trigger_manual_sync()
     
     return result
 
 
 @router.get("/status")
 async def get_sync_status(
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(get_current_active_claims),
+    scheduler: Optional[FlightSyncScheduler] = Depends(get_scheduler)
 ):
     """
     Get synchronization scheduler status.
     Requires authentication.
     """
-    if not _scheduler:
+    if not scheduler:
         return {
             "scheduler_running": False,
             "next_run": None
         }
     
-    return _scheduler.get_status()
+    return scheduler.get_status()
 
 
 @router.patch("/interval/{minutes}")
 async def update_sync_interval(
     minutes: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenClaims = Depends(require_admin),
+    scheduler: FlightSyncScheduler = Depends(require_scheduler)
 ):
     """
     Update synchronization interval.
     Admin only - requires authentication.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     if minutes < 1 or minutes > 60:
         raise HTTPException(
             status_code=400,
             detail="Interval must be between 1 and 60 minutes"
         )
     
-    if not _scheduler:
-        raise HTTPException(status_code=503, detail="Scheduler not initialized")
-    
-    _scheduler.update_interval(minutes)
+    scheduler.update_interval(minutes)
     
     return {
         "message": "Sync interval updated",
         "new_interval_minutes": minutes,
-        "next_run": _scheduler.get_next_run_time()
+        "next_run": scheduler.get_next_run_time()
     }
@@ -0,0 +1,174 @@
+"""
+Caching helpers.
+Small in-process TTL caches shared by the request handlers of one worker,
+and a Redis cache shared by all workers.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import orjson
+import redis.asyncio as redis
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AsyncTTLCache:
+    """cachetools.TTLCache guarded by an asyncio.Lock"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+    
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value or None if missing/expired"""
+        async with self._lock:
+            return self._cache.get(key)
+    
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Store value until the TTL elapses"""
+        async with self._lock:
+            self._cache[key] = value
+    
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return cached value, storing factory() first if missing (atomically)"""
+        async with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                value = factory()
+                self._cache[key] = value
+            return value
+    
+    async def pop(self, key: Hashable) -> None:
+        """Remove a single entry"""
+        async with self._lock:
+            self._cache.pop(key, None)
+    
+    async def clear(self) -> None:
+        """Remove every entry"""
+        async with self._lock:
+            self._cache.clear()
+
+
+# Validated JWTs: {blake2b(token): (auth_version, exp, User)}
+token_cache = AsyncTTLCache(maxsize=10_000, ttl=60)
+
+# Bumped whenever a user's credentials, role or status change so cached
+# tokens are re-validated against the database
+_auth_version = 0
+
+
+def get_auth_version() -> int:
+    """Current authentication state version"""
+    return _auth_version
+
+
+def invalidate_auth_cache() -> None:
+    """Invalidate every cached token of this worker"""
+    global _auth_version
+    _auth_version += 1
+
+
+# Shared Redis connection pool, created on first use
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client"""
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def redis_get_json(key: str) -> Optional[Any]:
+    """
+    Read a JSON value from Redis.
+    
+    Returns:
+        Decoded value, or None if missing or Redis is unavailable
+    """
+    try:
+        raw = await get_redis().get(key)
+    except RedisError as e:
+        logger.warning(f"Redis get failed for {key}: {str(e)}")
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def redis_set_json(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON value in Redis for ttl seconds (best effort)"""
+    try:
+        await get_redis().set(key, orjson.dumps(value), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Redis set failed for {key}: {str(e)}")
+
+
+async def redis_delete(*keys: str) -> None:
+    """Delete keys from Redis (best effort)"""
+    try:
+        await get_redis().delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Redis delete failed for {keys}: {str(e)}")
+
+
+# Redis fills in progress in this worker, keyed by Redis key
+_inflight_fills: Dict[str, asyncio.Task] = {}
+
+
+async def redis_get_or_compute(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Awaitable[Any]],
+    empty_ttl: Optional[int] = None
+) -> Any:
+    """
+    Read a JSON value from Redis, computing and storing it on a miss.
+    Concurrent misses in this worker share a single computation.
+    
+    Args:
+        key: Redis key
+        ttl: Lifetime of the stored value in seconds
+        compute: Coroutine factory producing the value; it must not depend
+            on the caller's request state (it may outlive the caller)
+        empty_ttl: Lifetime of empty values ({}, [], ...) instead of ttl,
+            so a miss on data that is not there yet is retried sooner
+    
+    Returns:
+        Cached or freshly computed value
+    """
+    value = await redis_get_json(key)
+    if value is not None:
+        return value
+    
+    task = _inflight_fills.get(key)
+    if task is None:
+        async def _fill():
+            value = await compute()
+            await redis_set_json(
+                key, value, ttl if value or empty_ttl is None else empty_ttl
+            )
+            return value
+        
+        task = asyncio.create_task(_fill())
+        _inflight_fills[key] = task
+        task.add_done_callback(lambda _: _inflight_fills.pop(key, None))
+    # Shielded: a cancelled caller must not cancel the shared fill
+    return await asyncio.shield(task)
@@ -1,6 +1,6 @@
 import logging
 import sys
-from pythonjsonlogger.jsonlogger import JsonFormatter
+from pythonjsonlogger.orjson import OrjsonFormatter
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -20,8 +20,8 @@ def setup_logging():
     handler = logging.StreamHandler(sys.stdout)
     
     if settings.LOG_FORMAT == "json":
-        # JSON formatter for production
-        formatter = JsonFormatter(
+        # JSON formatter for production (serialized by orjson)
+        formatter = OrjsonFormatter(
             fmt='%(asctime)s %(name)s %(levelname)s %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
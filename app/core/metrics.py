@@ -5,8 +5,10 @@ Adds custom metrics for monitoring API and business logic.
 from prometheus_client import Counter, Histogram, Gauge, Info
 import time
 from functools import wraps
+from typing import Dict, Tuple
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
 
 # API Metrics
 http_requests_total = Counter(
@@ -95,6 +97,12 @@ parking_allocations_total = Counter(
     ['spot_type', 'overflow']
 )
 
+# Database Pool Metrics
+db_pool_connections_in_use = Gauge(
+    'db_pool_connections_in_use',
+    'Database connections currently checked out of the pool'
+)
+
 # Application Info
 app_info = Info('ubuntuairlab_backend', 'Application information')
 app_info.info({
@@ -103,6 +111,69 @@ app_info.info({
 })
 
 
+def _match_route(request: Request) -> str:
+    """
+    Route template matching the request (e.g. /api/v1/sync/interval/{minutes}).
+    
+    Metrics are labelled by template rather than raw URL so path parameters
+    and unknown paths do not create a new label set per distinct URL.
+    """
+    partial = None
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+# Route templates by (method, raw path); raw paths are unbounded, so the map is capped
+_route_paths: Dict[Tuple[str, str], str] = {}
+_ROUTE_PATHS_MAX = 1024
+
+
+def _route_path(request: Request) -> str:
+    """
+    Route template for a request that has not been routed yet (in-progress
+    gauge); cached so hot paths walk the route table only once.
+    """
+    key = (request.method, request.scope["path"])
+    endpoint = _route_paths.get(key)
+    if endpoint is None:
+        endpoint = _match_route(request)
+        if len(_route_paths) >= _ROUTE_PATHS_MAX:
+            _route_paths.clear()
+        _route_paths[key] = endpoint
+    return endpoint
+
+
+# Bound label children, keyed by label values (bounded: endpoints are route templates)
+_route_children: Dict[Tuple[str, str], Tuple[Gauge, Histogram]] = {}
+_status_children: Dict[Tuple[str, str, int], Counter] = {}
+
+
+def _route_metrics(method: str, endpoint: str) -> Tuple[Gauge, Histogram]:
+    """In-progress gauge and latency histogram children for a route"""
+    children = _route_children.get((method, endpoint))
+    if children is None:
+        children = (
+            http_requests_in_progress.labels(method=method, endpoint=endpoint),
+            http_request_duration_seconds.labels(method=method, endpoint=endpoint)
+        )
+        _route_children[(method, endpoint)] = children
+    return children
+
+
+def _status_counter(method: str, endpoint: str, status: int) -> Counter:
+    """Request counter child for a route and status code"""
+    counter = _status_children.get((method, endpoint, status))
+    if counter is None:
+        counter = http_requests_total.labels(method=method, endpoint=endpoint, status=status)
+        _status_children[(method, endpoint, status)] = counter
+    return counter
+
+
 class PrometheusMiddleware(BaseHTTPMiddleware):
     """
     Middleware to collect HTTP metrics.
@@ -110,35 +181,33 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next):
         method = request.method
-        endpoint = request.url.path
+        endpoint = _route_path(request)
+        in_progress, _ = _route_metrics(method, endpoint)
         
         # Track in-progress requests
-        http_requests_in_progress.labels(method=method, endpoint=endpoint).inc()
+        in_progress.inc()
         
         # Time request
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             response = await call_next(request)
-            status = response.status_code
             
-            # Record metrics
-            http_requests_total.labels(
-                method=method,
-                endpoint=endpoint,
-                status=status
-            ).inc()
+            # The router stores the matched route in the (shared) scope;
+            # mounts and 404s keep the template resolved above
+            route = request.scope.get("route")
+            if route is not None:
+                endpoint = route.path
+            _, duration = _route_metrics(method, endpoint)
             
-            duration = time.time() - start_time
-            http_request_duration_seconds.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
+            # Record metrics
+            _status_counter(method, endpoint, response.status_code).inc()
+            duration.observe(time.perf_counter() - start_time)
             
             return response
             
         finally:
-            http_requests_in_progress.labels(method=method, endpoint=endpoint).dec()
+            in_progress.dec()
 
 
 def track_ai_prediction(model_type: str):
@@ -150,25 +219,25 @@ def track_ai_prediction(model_type: str):
         async def predict_eta(...):
             ...
     """
+    # Label children bound once per decorated function
+    predictions = {
+        cached: ai_predictions_total.labels(model_type=model_type, cached=str(cached))
+        for cached in (True, False)
+    }
+    prediction_duration = ai_prediction_duration_seconds.labels(model_type=model_type)
+    
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             cached = kwargs.get('use_cache', False)
             
             try:
                 result = await func(*args, **kwargs)
                 
                 # Record success
-                ai_predictions_total.labels(
-                    model_type=model_type,
-                    cached=str(cached)
-                ).inc()
-                
-                duration = time.time() - start_time
-                ai_prediction_duration_seconds.labels(
-                    model_type=model_type
-                ).observe(duration)
+                predictions[bool(cached)].inc()
+                prediction_duration.observe(time.perf_counter() - start_time)
                 
                 return result
                 
@@ -188,19 +257,23 @@ def track_flight_sync():
     """
     Decorator to track flight sync metrics.
     """
+    # Label children bound once per decorated function
+    sync_success = flight_sync_total.labels(status="success")
+    sync_error = flight_sync_total.labels(status="error")
+    processed_success = flights_processed_total.labels(flight_type="all", status="success")
+    processed_failed = flights_processed_total.labels(flight_type="all", status="failed")
+    
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             try:
                 result = await func(*args, **kwargs)
                 
                 # Record success
-                flight_sync_total.labels(status="success").inc()
-                
-                duration = time.time() - start_time
-                flight_sync_duration_seconds.observe(duration)
+                sync_success.inc()
+                flight_sync_duration_seconds.observe(time.perf_counter() - start_time)
                 
                 # Track processed flights
                 if isinstance(result, dict):
@@ -208,21 +281,15 @@ def track_flight_sync():
                     failed = result.get('failed', 0)
                     
                     if successful > 0:
-                        flights_processed_total.labels(
-                            flight_type="all",
-                            status="success"
-                        ).inc(successful)
+                        processed_success.inc(successful)
                     
                     if failed > 0:
-                        flights_processed_total.labels(
-                            flight_type="all",
-                            status="failed"
-                        ).inc(failed)
+                        processed_failed.inc(failed)
                 
                 return result
                 
             except Exception as e:
-                flight_sync_total.labels(status="error").inc()
+                sync_error.inc()
                 raise
                 
         return wrapper
@@ -0,0 +1,42 @@
+"""
+ASGI middleware shared by the application entry points.
+"""
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject requests whose declared Content-Length exceeds a limit with 413,
+    before the body is read or validated.
+    
+    Plain ASGI (no BaseHTTPMiddleware) so accepted requests pass through
+    without an extra task per call.
+    """
+    
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_body_size:
+                        await self._reject(send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    async def _reject(send: Send):
+        body = orjson.dumps({"detail": "Request body too large"})
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
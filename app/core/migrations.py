@@ -0,0 +1,70 @@
+"""
+Alembic migrations executed from the application process.
+Lets the API come up (and answer health checks) while long migrations,
+such as concurrent index builds, run in the background.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from alembic import command
+from alembic.config import Config
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI_PATH = Path(__file__).resolve().parent.parent.parent / "alembic.ini"
+
+# Shared migration state, read by the /health/migrations endpoint
+migration_status: Dict[str, Any] = {
+    "status": "pending",  # pending | running | complete | failed
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
+
+def _run_upgrade() -> None:
+    """Run `alembic upgrade head` (blocking)."""
+    config = Config(str(ALEMBIC_INI_PATH))
+    # Keep the application's logging setup instead of alembic.ini's
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+async def run_migrations_async(raise_on_error: bool = False) -> None:
+    """
+    Upgrade the database to head in a worker thread so the event loop
+    keeps serving requests. Progress is tracked in `migration_status`.
+    
+    Args:
+        raise_on_error: Re-raise a migration failure (MIGRATION_MODE=sync,
+            so startup aborts instead of serving a half-migrated schema)
+    """
+    migration_status.update(
+        status="running",
+        started_at=datetime.utcnow().isoformat(),
+        finished_at=None,
+        error=None
+    )
+    logger.info("Running database migrations...")
+    
+    try:
+        await asyncio.to_thread(_run_upgrade)
+    except Exception as e:
+        migration_status.update(
+            status="failed",
+            finished_at=datetime.utcnow().isoformat(),
+            error=str(e)
+        )
+        logger.exception("Database migrations failed")
+        if raise_on_error:
+            raise
+        return
+    
+    migration_status.update(
+        status="complete",
+        finished_at=datetime.utcnow().isoformat()
+    )
+    logger.info("Database migrations complete")
@@ -1,19 +1,57 @@
+import asyncio
+import logging
 from typing import AsyncGenerator
+from uuid import uuid4
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import get_settings
+from app.core.metrics import db_pool_connections_in_use
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Prepared statements are cached per connection by asyncpg (server-side
+# parse/plan) and by the SQLAlchemy dialect, so hot queries skip re-parsing.
+# PgBouncer (transaction mode) may hand each transaction a different server
+# connection, so there prepared statements must not be cached or reuse names
+# (and startup parameters such as jit would be rejected)
+connect_args = {
+    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    # Short OLTP queries never amortize JIT compilation
+    "server_settings": {"jit": "off"},
+}
+if settings.DB_PGBOUNCER:
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
     pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args=connect_args
 )
 
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    db_pool_connections_in_use.inc()
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    db_pool_connections_in_use.dec()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -44,9 +82,27 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
+        # pgcrypto provides digest() for ai_predictions.input_hash
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pgcrypto"))
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_db_pool():
+    """Open DB_POOL_WARMUP pooled connections up front and return them to the pool"""
+    size = min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)
+    if size <= 0:
+        return
+    
+    async def _ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    try:
+        await asyncio.gather(*(_ping() for _ in range(size)))
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {str(e)}")
+
+
 async def close_db():
     """Close database connections"""
     await engine.dispose()
@@ -1,6 +1,7 @@
 from app.exceptions.custom_exceptions import (
     OpenSkyAPIException,
     AIModelException,
+    AIModelUnavailableException,
     ParkingAllocationException,
     AuthenticationException,
     CacheException
@@ -9,6 +10,7 @@ from app.exceptions.custom_exceptions import (
 __all__ = [
     "OpenSkyAPIException",
     "AIModelException",
+    "AIModelUnavailableException",
     "ParkingAllocationException",
     "AuthenticationException",
     "CacheException"
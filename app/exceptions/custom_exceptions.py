@@ -13,6 +13,11 @@ class AIModelException(AirportBackendException):
     pass
 
 
+class AIModelUnavailableException(AIModelException):
+    """Exception raised when the ML API cannot serve predictions (models not loaded, circuit open)"""
+    pass
+
+
 class ParkingAllocationException(AirportBackendException):
     """Exception raised for parking allocation errors"""
     pass
@@ -3,18 +3,25 @@ ASGI entrypoint module providing `app` at `app.main:app`.
 This mirrors the root `main.py` FastAPI application so deployments referencing
 `app.main:app` can import successfully.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import make_asgi_app
 
+from app.core.cache import close_redis
 from app.core.config import get_settings
 from app.core.logging import setup_logging
 from app.core.metrics import PrometheusMiddleware
-from app.database import init_db, close_db
+from app.core.middleware import BodySizeLimitMiddleware
+from app.core.migrations import migration_status, run_migrations_async
+from app.database import init_db, close_db, warm_db_pool
 from app.api.v1.router import api_router
 from app.services.orchestration.scheduler import FlightSyncScheduler
+from app.services.external.aviationstack_client import AviationStackClient
+from app.services.external.ml_client import close_ml_client, get_ml_client
 
 # Setup logging
 setup_logging()
@@ -24,25 +31,57 @@ settings = get_settings()
 # Global scheduler instance
 scheduler: FlightSyncScheduler = None
 
+# Background migration task (MIGRATION_MODE=async)
+migration_task: asyncio.Task = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global scheduler
-
-    logger.info("Starting UbuntuAirLab Backend (app.main)...")
-
-    # Create database tables if needed
-    logger.info("Initializing database...")
-    await init_db()
 
-    # Initialize and start scheduler
+async def _start_scheduler(app: FastAPI) -> None:
+    """Start the flight sync scheduler and expose it to the sync endpoints"""
+    global scheduler
     logger.info("Starting flight sync scheduler...")
     scheduler = FlightSyncScheduler()
     await scheduler.start()
 
-    # Inject scheduler into sync endpoints
-    from app.api.v1.endpoints import sync
-    sync.set_scheduler(scheduler)
+    # Expose scheduler to sync endpoints (see sync.get_scheduler)
+    app.state.scheduler = scheduler
+
+
+async def _migrate_then_start_scheduler(app: FastAPI) -> None:
+    """Run migrations in the background; DB jobs only start on a complete schema"""
+    await run_migrations_async()
+    if migration_status["status"] == "complete":
+        await _start_scheduler(app)
+    else:
+        logger.error("Flight sync scheduler not started: database migrations failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global scheduler, migration_task
+
+    logger.info("Starting UbuntuAirLab Backend (app.main)...")
+
+    # Bring the schema up to date: through Alembic when MIGRATION_MODE is
+    # set, otherwise create missing tables directly
+    if settings.MIGRATION_MODE == "async":
+        migration_task = asyncio.create_task(_migrate_then_start_scheduler(app))
+    elif settings.MIGRATION_MODE == "sync":
+        await run_migrations_async(raise_on_error=True)
+    else:
+        logger.info("Initializing database...")
+        await init_db()
+        migration_status["status"] = "complete"
+
+    # Warm the DB pool and the shared external API clients (independent, so concurrently)
+    await asyncio.gather(
+        warm_db_pool(),
+        AviationStackClient().start(),
+        get_ml_client()
+    )
+
+    # Start the scheduler now, unless it waits for background migrations
+    if migration_task is None:
+        await _start_scheduler(app)
 
     logger.info("Application startup complete")
 
@@ -52,6 +91,12 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     if scheduler:
         await scheduler.stop()
+    await AviationStackClient().close()
+    await close_ml_client()
+    await close_redis()
+    if migration_task and not migration_task.done():
+        logger.warning("Shutting down while migrations are still running")
+        migration_task.cancel()
     logger.info("Application shutdown complete")
 
 
@@ -61,11 +106,15 @@ app = FastAPI(
     description="API backend pour gestion aeroportuaire avec IA",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
 )
 
+# Reject oversized bodies before they are read (inside CORS so the 413 is readable)
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.MAX_REQUEST_BODY_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,6 +122,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Prometheus metrics middleware
@@ -105,3 +155,17 @@ async def health_check():
         "scheduler": hasattr(scheduler, 'scheduler') and scheduler.scheduler.running if scheduler else False,
         "next_sync": scheduler.get_next_run_time() if scheduler else None
     }
+
+
+@app.get("/health/migrations")
+async def migrations_health():
+    return {"mode": settings.MIGRATION_MODE, **migration_status}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    ready = migration_status["status"] == "complete"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "migrations": migration_status["status"]}
+    )
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Enum as SQLEnum, Index, ForeignKey
+from sqlalchemy import Column, String, Integer, SmallInteger, Float, DateTime, Enum as SQLEnum, Index, ForeignKey
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
 import enum
 from app.database import Base
 
+# ICAO24 prefixes of military aircraft (first two hex digits, lowercase)
+MILITARY_ICAO24_PREFIXES = frozenset(('ae', 'af', 'am', '43', '44'))
+
 
 class FlightStatus(str, enum.Enum):
     """Flight processing status"""
@@ -35,8 +38,8 @@ class Flight(Base):
     origin_country = Column(String(100), nullable=True, doc="Country inferred from ICAO24")
     
     # Flight details
-    flight_type = Column(String(20), nullable=False, index=True, doc="Arrival or departure")
-    status = Column(String(20), default="scheduled", index=True, doc="Processing status")
+    flight_type = Column(SQLEnum(FlightType, values_callable=lambda x: [e.value for e in x]), nullable=False, index=True, doc="Arrival or departure")
+    status = Column(SQLEnum(FlightStatus, values_callable=lambda x: [e.value for e in x]), default=FlightStatus.SCHEDULED, index=True, doc="Processing status")
     
     # Airports
     departure_airport = Column(String(4), nullable=True, index=True, doc="ICAO code of departure airport")
@@ -56,17 +59,17 @@ class Flight(Base):
     # AI predictions
     predicted_eta = Column(DateTime(timezone=True), nullable=True, doc="AI-predicted ETA")
     predicted_etd = Column(DateTime(timezone=True), nullable=True, doc="AI-predicted ETD")
-    predicted_delay_minutes = Column(Integer, nullable=True, doc="Predicted delay in minutes")
-    predicted_occupation_minutes = Column(Integer, nullable=True, doc="Predicted parking duration")
+    predicted_delay_minutes = Column(SmallInteger, nullable=True, doc="Predicted delay in minutes")
+    predicted_occupation_minutes = Column(SmallInteger, nullable=True, doc="Predicted parking duration")
     
     # Real-time tracking (OpenSky state vectors)
     longitude = Column(Float, nullable=True, doc="Current longitude (decimal degrees)")
     latitude = Column(Float, nullable=True, doc="Current latitude (decimal degrees)")
-    baro_altitude = Column(Float, nullable=True, doc="Barometric altitude (meters)")
-    geo_altitude = Column(Float, nullable=True, doc="Geometric altitude (meters)")
-    velocity = Column(Float, nullable=True, doc="Ground speed (m/s)")
-    heading = Column(Float, nullable=True, doc="True track heading (degrees)")
-    vertical_rate = Column(Float, nullable=True, doc="Vertical rate (m/s)")
+    baro_altitude = Column(Float(precision=24), nullable=True, doc="Barometric altitude (meters)")
+    geo_altitude = Column(Float(precision=24), nullable=True, doc="Geometric altitude (meters)")
+    velocity = Column(Float(precision=24), nullable=True, doc="Ground speed (m/s)")
+    heading = Column(Float(precision=24), nullable=True, doc="True track heading (degrees)")
+    vertical_rate = Column(Float(precision=24), nullable=True, doc="Vertical rate (m/s)")
     on_ground = Column(Integer, nullable=True, doc="Aircraft on ground (0/1)")
     last_position_update = Column(DateTime(timezone=True), nullable=True, doc="Last state vector update")
     
@@ -76,11 +79,20 @@ class Flight(Base):
     
     # Indexes for common queries
     __table_args__ = (
-        Index('idx_flight_status_type', 'status', 'flight_type'),
+        Index(
+            'idx_flight_status_type', 'status', 'flight_type',
+            postgresql_include=['callsign', 'departure_airport', 'arrival_airport', 'predicted_eta']
+        ),
         Index('idx_flight_airports', 'departure_airport', 'arrival_airport'),
-        Index('idx_flight_timestamps', 'first_seen', 'last_seen'),
-        Index('idx_flight_position', 'latitude', 'longitude'),
-        Index('idx_flight_last_position_update', 'last_position_update'),
+        Index(
+            'idx_flight_timestamps_brin', 'first_seen', 'last_seen',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        ),
+        Index('idx_flight_position_spgist', text('point(longitude, latitude)'), postgresql_using='spgist'),
+        Index('idx_flight_status_position_update', 'status', 'last_position_update'),
+        Index('idx_flight_eta_open', 'predicted_eta', postgresql_where=text("status <> 'completed'")),
+        Index('idx_flight_etd_open', 'predicted_etd', postgresql_where=text("status <> 'completed'")),
+        Index('idx_flight_created_at', 'created_at'),
     )
     
     # Relationships
@@ -94,5 +106,4 @@ class Flight(Base):
         """Check if aircraft is military based on ICAO24 pattern"""
         if not self.icao24:
             return False
-        military_prefixes = ['ae', 'af', 'am', '43', '44']
-        return any(self.icao24.lower().startswith(prefix) for prefix in military_prefixes)
+        return self.icao24[:2].lower() in MILITARY_ICAO24_PREFIXES
@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 import enum
-import uuid
 from app.database import Base
+from app.utils.identifiers import uuid7
 
 
 class NotificationType(str, enum.Enum):
@@ -35,9 +35,11 @@ class Notification(Base):
     notification_id = Column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
+        # Migrations switch the DB default to gen_uuidv7(); create_all keeps
+        # the built-in function since gen_uuidv7() only exists after them
         server_default=func.gen_random_uuid(),
-        doc="Unique notification ID"
+        doc="Unique notification ID (time-ordered UUIDv7)"
     )
     
     # Foreign key to flight
@@ -45,7 +47,6 @@ class Notification(Base):
         String(6),
         ForeignKey('flights.icao24', ondelete='CASCADE'),
         nullable=False,
-        index=True,
         doc="Associated flight ICAO24"
     )
     
@@ -73,7 +74,6 @@ class Notification(Base):
         Boolean,
         default=False,
         nullable=False,
-        index=True,
         doc="Whether notification has been read"
     )
     
@@ -94,5 +94,11 @@ class Notification(Base):
     # Relationship
     flight = relationship("Flight", backref="notifications")
     
+    __table_args__ = (
+        Index('idx_notifications_created_at_brin', 'created_at', postgresql_using='brin'),
+        Index('idx_notifications_unread', 'created_at', postgresql_where=text('read_status = false')),
+        Index('idx_notifications_flight_created', 'flight_icao24', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<Notification(id={self.notification_id}, type={self.notification_type}, flight={self.flight_icao24})>"
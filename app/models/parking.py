@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Boolean, Float, Enum as SQLEnum, ForeignKey, DateTime, Index
+from sqlalchemy import Column, String, Integer, SmallInteger, BigInteger, Boolean, Float, Enum as SQLEnum, ForeignKey, DateTime, Index, CheckConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 from app.database import Base
 
@@ -71,6 +71,22 @@ class ParkingSpot(Base):
         return self.status == SpotStatus.AVAILABLE
 
 
+class ParkingSpotsVersion(Base):
+    """
+    Change counter of the parking_spots table (single row).
+    Bumped at commit by a deferred trigger on every spot insert, update
+    or delete (see migration a0b7c2e5d914); used as the /spots ETag version.
+    """
+    __tablename__ = "parking_spots_version"
+    
+    id = Column(SmallInteger, primary_key=True, server_default=text("1"))
+    version = Column(BigInteger, nullable=False, server_default=text("0"), doc="Committed spot changes")
+    
+    __table_args__ = (
+        CheckConstraint('id = 1', name='ck_parking_spots_version_single_row'),
+    )
+
+
 class ParkingAllocation(Base):
     """
     Parking allocation model.
@@ -82,7 +98,8 @@ class ParkingAllocation(Base):
     allocation_id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique allocation ID")
     
     # Foreign keys
-    flight_icao24 = Column(String(6), ForeignKey("flights.icao24"), nullable=False, index=True, doc="Flight ICAO24")
+    # Lookups by flight are served by idx_allocation_flight_spot (leading column)
+    flight_icao24 = Column(String(6), ForeignKey("flights.icao24"), nullable=False, doc="Flight ICAO24")
     spot_id = Column(String(10), ForeignKey("parking_spots.spot_id"), nullable=False, index=True, doc="Parking spot ID")
     
     # Allocation timing
@@ -110,12 +127,30 @@ class ParkingAllocation(Base):
     
     # Relationships
     spot = relationship("ParkingSpot", back_populates="allocations")
+    flight = relationship("Flight")
     
     # Indexes
     __table_args__ = (
         Index('idx_allocation_flight_spot', 'flight_icao24', 'spot_id'),
         Index('idx_allocation_times', 'allocated_at', 'predicted_end_time'),
         Index('idx_allocation_overflow', 'overflow_to_military'),
+        Index(
+            'idx_allocation_active_partial', 'spot_id', 'predicted_end_time',
+            postgresql_include=['flight_icao24'],
+            postgresql_where=text('actual_end_time IS NULL')
+        ),
+        Index(
+            'idx_allocation_active_flight', 'flight_icao24',
+            postgresql_where=text('actual_end_time IS NULL')
+        ),
+        Index(
+            'idx_allocation_conflict_partial', 'allocated_at',
+            postgresql_where=text('conflict_detected = true')
+        ),
+        Index(
+            'idx_allocation_conflict_end', 'actual_end_time',
+            postgresql_where=text('conflict_detected = true')
+        ),
     )
     
     def __repr__(self):
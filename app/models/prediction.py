@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, Enum as SQLEnum, ForeignKey, JSON, Index
+from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, Enum as SQLEnum, ForeignKey, Index, LargeBinary, Computed
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 import enum
 from app.database import Base
@@ -15,6 +16,10 @@ class AIPrediction(Base):
     """
     AI prediction history model.
     Stores all AI model predictions for auditing and analysis.
+    
+    Migrations partition the table by month on created_at (primary key
+    (prediction_id, created_at)); prediction_id alone stays unique through
+    its sequence, so the ORM keeps it as identity.
     """
     __tablename__ = "ai_predictions"
     
@@ -28,9 +33,14 @@ class AIPrediction(Base):
     model_type = Column(SQLEnum(ModelType), nullable=False, index=True, doc="Type of AI model")
     model_version = Column(String(20), default="1.0.0", doc="Model version used")
     
-    # Input/Output data (stored as JSON)
-    input_data = Column(JSON, nullable=False, doc="Input parameters sent to model")
-    output_data = Column(JSON, nullable=False, doc="Prediction results from model")
+    # Input/Output data (stored as JSONB, GIN-indexed for containment lookups)
+    input_data = Column(JSONB, nullable=False, doc="Input parameters sent to model")
+    output_data = Column(JSONB, nullable=False, doc="Prediction results from model")
+    input_hash = Column(
+        LargeBinary,
+        Computed("digest(input_data::text, 'sha256')", persisted=True),
+        doc="SHA-256 of input_data (pgcrypto), used for cache lookups"
+    )
     
     # Cache information and metrics (match migration schema)
     cached = Column(Boolean, default=False, doc="Whether result came from cache")
@@ -42,7 +52,19 @@ class AIPrediction(Base):
     # Indexes
     __table_args__ = (
         Index('idx_prediction_flight_model', 'flight_icao24', 'model_type'),
-        Index('idx_prediction_created', 'created_at'),
+        Index('idx_ai_predictions_model_inputhash', 'model_type', 'input_hash'),
+        Index(
+            'idx_ai_predictions_input_gin', 'input_data',
+            postgresql_using='gin', postgresql_ops={'input_data': 'jsonb_path_ops'}
+        ),
+        Index(
+            'idx_ai_predictions_output_gin', 'output_data',
+            postgresql_using='gin', postgresql_ops={'output_data': 'jsonb_path_ops'}
+        ),
+        Index(
+            'idx_prediction_created_brin', 'created_at',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        ),
     )
     
     def __repr__(self):
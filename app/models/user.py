@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, SmallInteger, DateTime, Boolean, CheckConstraint, Enum as SQLEnum
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 import enum
 from app.database import Base
 
@@ -10,6 +11,30 @@ class UserRole(str, enum.Enum):
     USER = "user"
 
 
+# smallint codes stored in users.role
+USER_ROLE_CODES = {UserRole.USER: 0, UserRole.ADMIN: 1}
+USER_ROLES_BY_CODE = {code: role for role, code in USER_ROLE_CODES.items()}
+
+
+class UserRoleType(TypeDecorator):
+    """
+    Stores UserRole as a 2-byte smallint (0 = user, 1 = admin).
+    Accepts UserRole members or their string values; loads UserRole members.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return USER_ROLE_CODES[UserRole(value)]
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return USER_ROLES_BY_CODE[value]
+
+
 class User(Base):
     """
     User model for authentication.
@@ -27,7 +52,7 @@ class User(Base):
     
     # User information
     full_name = Column(String(100), nullable=True, doc="Full name")
-    role = Column(String(20), default="user", index=True, doc="User role (admin/user)")
+    role = Column(UserRoleType, default=UserRole.USER, index=True, doc="User role (admin/user)")
     
     # Account status
     is_active = Column(Boolean, default=True, doc="Account active status")
@@ -38,6 +63,10 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), doc="Last update timestamp")
     last_login = Column(DateTime(timezone=True), nullable=True, doc="Last login timestamp")
     
+    __table_args__ = (
+        CheckConstraint('role IN (0, 1)', name='ck_users_role'),
+    )
+    
     def __repr__(self):
         return f"<User(id={self.user_id}, username={self.username}, role={self.role})>"
     
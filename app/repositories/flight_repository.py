@@ -1,9 +1,10 @@
-from typing import Optional, List
-from sqlalchemy import select, and_, or_, func
+from typing import Optional, List, Dict
+from sqlalchemy import select, update, bindparam, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.models.flight import Flight, FlightStatus, FlightType
-from app.schemas.opensky import FlightData
+from app.schemas.opensky import FlightData, StateVectorData
 
 
 class FlightRepository:
@@ -55,22 +56,16 @@ class FlightRepository:
         status: Optional[str] = None
     ) -> tuple[List[Flight], int]:
         """List flights with pagination and filters"""
-        from sqlalchemy import func, cast, String
-        
         query = select(Flight)
-        
-        # Apply filters - cast to string to avoid enum comparison
-        if flight_type:
-            query = query.where(cast(Flight.flight_type, String) == flight_type.lower())
-        if status:
-            query = query.where(cast(Flight.status, String) == status.lower())
-        
-        # Get total count
         count_query = select(func.count()).select_from(Flight)
+        
+        # Compare enum columns directly so the status/type indexes apply
         if flight_type:
-            count_query = count_query.where(cast(Flight.flight_type, String) == flight_type.lower())
+            query = query.where(Flight.flight_type == FlightType(flight_type))
+            count_query = count_query.where(Flight.flight_type == FlightType(flight_type))
         if status:
-            count_query = count_query.where(cast(Flight.status, String) == status.lower())
+            query = query.where(Flight.status == FlightStatus(status))
+            count_query = count_query.where(Flight.status == FlightStatus(status))
         
         total_result = await self.db.execute(count_query)
         total = total_result.scalar() or 0
@@ -124,16 +119,23 @@ class FlightRepository:
     async def update_parking_assignment(
         self,
         icao24: str,
-        parking_spot_id: Optional[str]
+        parking_spot_id: Optional[str],
+        commit: bool = True
     ) -> Optional[Flight]:
-        """Update flight parking spot assignment"""
+        """
+        Update flight parking spot assignment
+        
+        Args:
+            commit: Commit immediately; False leaves it to the caller's transaction
+        """
         flight = await self.get_by_icao24(icao24)
         if not flight:
             return None
         
         flight.parking_spot_id = parking_spot_id
-        await self.db.commit()
-        await self.db.refresh(flight)
+        if commit:
+            await self.db.commit()
+            await self.db.refresh(flight)
         return flight
     
     async def get_flights_by_airport(
@@ -184,54 +186,118 @@ class FlightRepository:
     
     async def upsert(self, flight_data: FlightData) -> Flight:
         """Create or update flight"""
-        existing = await self.get_by_icao24(flight_data.icao24)
+        flights = await self.upsert_many([flight_data])
+        return flights[flight_data.icao24]
+    
+    async def upsert_many(
+        self,
+        flights_data: List[FlightData],
+        chunk: int = 500
+    ) -> Dict[str, Flight]:
+        """
+        Create or update flights with one INSERT ... ON CONFLICT DO UPDATE
+        round trip per chunk, then commit once.
+        
+        New rows get the same values as create(); existing rows only get
+        their callsign and last_seen refreshed, like the former
+        select-then-update path.
         
-        if existing:
-            # Update existing flight
-            existing.callsign = flight_data.callsign
-            existing.last_seen = flight_data.lastSeen
+        Args:
+            flights_data: FlightData from OpenSky/AviationStack
+            chunk: Maximum rows sent per INSERT statement
+        
+        Returns:
+            Persisted flights keyed by icao24
+        """
+        # One row per aircraft: ON CONFLICT cannot touch the same row twice
+        rows = list({
+            flight_data.icao24: {
+                "icao24": flight_data.icao24,
+                "callsign": flight_data.callsign,
+                "origin_country": flight_data.estDepartureAirport or flight_data.estArrivalAirport,
+                "flight_type": FlightType.ARRIVAL if flight_data.estArrivalAirport else FlightType.DEPARTURE,
+                "departure_airport": flight_data.estDepartureAirport,
+                "arrival_airport": flight_data.estArrivalAirport,
+                "first_seen": flight_data.firstSeen,
+                "last_seen": flight_data.lastSeen,
+                "status": FlightStatus.SCHEDULED
+            }
+            for flight_data in flights_data
+        }.values())
+        
+        persisted: Dict[str, Flight] = {}
+        for start in range(0, len(rows), chunk):
+            stmt = pg_insert(Flight).values(rows[start:start + chunk])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Flight.icao24],
+                set_={
+                    "callsign": stmt.excluded.callsign,
+                    "last_seen": stmt.excluded.last_seen,
+                    # onupdate defaults are not applied to ON CONFLICT updates
+                    "updated_at": func.now()
+                }
+            )
+            result = await self.db.scalars(
+                stmt.returning(Flight),
+                execution_options={"populate_existing": True}
+            )
+            persisted.update((flight.icao24, flight) for flight in result)
+        
+        if persisted:
             await self.db.commit()
-            await self.db.refresh(existing)
-            return existing
-        else:
-            # Create new flight
-            return await self.create(flight_data)
+        return persisted
     
-    async def update_realtime_position(
-        self,
-        icao24: str,
-        state_vector: "StateVectorData"
-    ) -> Optional[Flight]:
+    async def update_realtime_positions(self, state_vectors: List[StateVectorData]) -> int:
         """
-        Update flight with real-time position data from OpenSky state vector.
+        Update real-time position data of every known flight in one transaction.
+        
+        Uses Core statements on the flights table: one IN lookup for the
+        known icao24s, then a single executemany UPDATE. No Flight instances
+        are loaded, refreshed or tracked by the session.
         
         Args:
-            icao24: Aircraft ICAO24 address
-            state_vector: StateVectorData from OpenSky
+            state_vectors: StateVectorData from OpenSky
         
         Returns:
-            Updated Flight object or None if not found
+            Number of flights updated (state vectors of unknown aircraft are skipped)
         """
-        flight = await self.get_by_icao24(icao24)
+        if not state_vectors:
+            return 0
         
-        if not flight:
-            return None
+        flights = Flight.__table__
+        result = await self.db.execute(
+            select(flights.c.icao24).where(
+                flights.c.icao24.in_(list({sv.icao24 for sv in state_vectors}))
+            )
+        )
+        known = set(result.scalars())
         
-        # Update real-time tracking fields
-        flight.longitude = state_vector.longitude
-        flight.latitude = state_vector.latitude
-        flight.baro_altitude = state_vector.baro_altitude
-        flight.geo_altitude = state_vector.geo_altitude
-        flight.velocity = state_vector.velocity
-        flight.heading = state_vector.heading
-        flight.vertical_rate = state_vector.vertical_rate
-        flight.on_ground = 1 if state_vector.on_ground else 0
-        flight.last_position_update = datetime.fromtimestamp(state_vector.last_contact) if state_vector.last_contact else None
+        params = [
+            {
+                "b_icao24": sv.icao24,
+                "longitude": sv.longitude,
+                "latitude": sv.latitude,
+                "baro_altitude": sv.baro_altitude,
+                "geo_altitude": sv.geo_altitude,
+                "velocity": sv.velocity,
+                "heading": sv.heading,
+                "vertical_rate": sv.vertical_rate,
+                "on_ground": 1 if sv.on_ground else 0,
+                "last_position_update": datetime.fromtimestamp(sv.last_contact) if sv.last_contact else None
+            }
+            for sv in state_vectors
+            if sv.icao24 in known
+        ]
+        if not params:
+            return 0
         
+        await self.db.execute(
+            update(flights).where(flights.c.icao24 == bindparam("b_icao24")),
+            params
+        )
         await self.db.commit()
-        await self.db.refresh(flight)
         
-        return flight
+        return len(params)
     
     async def get_flights_needing_position_update(
         self,
@@ -254,7 +320,7 @@ class FlightRepository:
             and_(
                 Flight.status.in_(["scheduled", "active"]),
                 or_(
-                    Flight.last_position_update == None,
+                    Flight.last_position_update.is_(None),
                     Flight.last_position_update < cutoff_time
                 )
             )
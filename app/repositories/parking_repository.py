@@ -1,12 +1,24 @@
 from typing import Optional, List
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from app.core.cache import redis_get_json, redis_set_json, redis_delete
+from app.core.config import get_settings
 from app.models.parking import (
-    ParkingSpot, ParkingAllocation, 
+    ParkingSpot, ParkingAllocation, ParkingSpotsVersion,
     SpotType, SpotStatus, AircraftSizeCategory
 )
 
+settings = get_settings()
+
+# Redis key of the aggregate returned by get_availability_stats()
+AVAILABILITY_STATS_KEY = "parking:availability_stats"
+
+
+async def invalidate_availability_stats() -> None:
+    """Drop cached availability stats after a spot/allocation change"""
+    await redis_delete(AVAILABILITY_STATS_KEY)
+
 
 class ParkingSpotRepository:
     """Repository for ParkingSpot model operations"""
@@ -34,6 +46,7 @@ class ParkingSpotRepository:
         )
         self.db.add(spot)
         await self.db.commit()
+        await invalidate_availability_stats()
         await self.db.refresh(spot)
         return spot
     
@@ -54,34 +67,73 @@ class ParkingSpotRepository:
         skip: int = 0,
         limit: int = 50,
         spot_type: Optional[str] = None,
-        status: Optional[str] = None
-    ) -> tuple[List[ParkingSpot], int]:
-        """List parking spots with pagination - CIVIL ONLY"""
-        from sqlalchemy import func, cast, String
+        status: Optional[str] = None,
+        after: Optional[tuple[int, str]] = None
+    ) -> tuple[List[ParkingSpot], Optional[int]]:
+        """
+        List parking spots with pagination - CIVIL ONLY
         
-        # Base query - CIVIL only, cast to string to avoid enum comparison
-        query = select(ParkingSpot).where(cast(ParkingSpot.spot_type, String) == "civil")
+        Args:
+            after: Keyset cursor (spot_number, spot_id) of the last spot of the
+                previous page; replaces skip and the total count (None)
+        """
+        from sqlalchemy import func, cast, String, tuple_
+        
+        # Base filter - CIVIL only, cast to string to avoid enum comparison
+        filters = [cast(ParkingSpot.spot_type, String) == "civil"]
         
         # Apply additional filters with cast to string
         if status:
-            query = query.where(cast(ParkingSpot.status, String) == status.lower())
+            filters.append(cast(ParkingSpot.status, String) == status.lower())
+        
+        # Keyset pagination: seek past the cursor instead of OFFSET scanning
+        if after is not None:
+            result = await self.db.execute(
+                select(ParkingSpot)
+                .where(and_(*filters), tuple_(ParkingSpot.spot_number, ParkingSpot.spot_id) > tuple(after))
+                .order_by(ParkingSpot.spot_number.asc(), ParkingSpot.spot_id.asc())
+                .limit(limit)
+            )
+            return list(result.scalars().all()), None
+        
+        # Page and total in one round-trip: count(*) OVER () is evaluated
+        # before OFFSET/LIMIT, so every row carries the full match count
+        query = (
+            select(ParkingSpot, func.count().over().label("total"))
+            .where(and_(*filters))
+            .order_by(ParkingSpot.spot_number.asc(), ParkingSpot.spot_id.asc())
+            .offset(skip)
+            .limit(limit)
+        )
         
-        # Get total count
-        count_query = select(func.count()).select_from(ParkingSpot)
-        count_query = count_query.where(cast(ParkingSpot.spot_type, String) == "civil")
-        if status:
-            count_query = count_query.where(cast(ParkingSpot.status, String) == status.lower())
+        rows = (await self.db.execute(query)).all()
+        spots = [row[0] for row in rows]
         
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar() or 0
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Page past the end: no row to read the window count from
+            count_query = select(func.count()).select_from(ParkingSpot).where(and_(*filters))
+            total = (await self.db.execute(count_query)).scalar() or 0
+        else:
+            total = 0
         
-        # Apply pagination
-        query = query.offset(skip).limit(limit).order_by(ParkingSpot.spot_number.asc())
+        return spots, total
+    
+    async def get_version(self) -> Optional[str]:
+        """
+        Cheap change token for the spots table.
         
-        result = await self.db.execute(query)
-        spots = list(result.scalars().all())
+        Reads the parking_spots_version counter, bumped at commit for every
+        inserted, updated or deleted spot, so a change becomes visible
+        together with its version whatever order transactions commit in.
         
-        return spots, total
+        Returns:
+            Version string, or None if the counter row is missing
+        """
+        result = await self.db.execute(select(ParkingSpotsVersion.version))
+        version = result.scalar()
+        return None if version is None else str(version)
     
     async def get_available_by_type(
         self,
@@ -91,16 +143,12 @@ class ParkingSpotRepository:
         """
         Get available parking spots by type and compatible with aircraft size.
         Returns spots ordered by: jetway availability DESC, terminal distance ASC
+        
+        Read-only: allocations must take their spot with claim_available().
         """
         result = await self.db.execute(
             select(ParkingSpot)
-            .where(
-                and_(
-                    ParkingSpot.spot_type == spot_type,
-                    ParkingSpot.status == SpotStatus.AVAILABLE,
-                    ParkingSpot.aircraft_size_capacity >= aircraft_size
-                )
-            )
+            .where(self._available_criteria(spot_type, aircraft_size))
             .order_by(
                 ParkingSpot.has_jetway.desc(),
                 ParkingSpot.distance_to_terminal.asc()
@@ -108,15 +156,85 @@ class ParkingSpotRepository:
         )
         return list(result.scalars().all())
     
-    async def update_status(self, spot_id: str, status: SpotStatus) -> Optional[ParkingSpot]:
-        """Update parking spot status"""
+    async def claim_available(
+        self,
+        spot_type: SpotType,
+        aircraft_size: AircraftSizeCategory,
+        commit: bool = True
+    ) -> Optional[ParkingSpot]:
+        """
+        Mark the best available spot (same order as get_available_by_type)
+        OCCUPIED in a single conditional UPDATE.
+        
+        The candidate row is picked with FOR UPDATE SKIP LOCKED and the UPDATE
+        re-checks status = 'available', so concurrent allocations in any
+        worker never receive the same spot.
+        
+        Args:
+            spot_type: Spot type to claim
+            aircraft_size: Aircraft size the spot must accommodate
+            commit: Commit immediately; False leaves it to the caller's transaction
+        
+        Returns:
+            Claimed spot, or None when no spot is available
+        """
+        candidate = (
+            select(ParkingSpot.spot_id)
+            .where(self._available_criteria(spot_type, aircraft_size))
+            .order_by(
+                ParkingSpot.has_jetway.desc(),
+                ParkingSpot.distance_to_terminal.asc()
+            )
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.scalars(
+            update(ParkingSpot)
+            .where(
+                ParkingSpot.spot_id == candidate,
+                ParkingSpot.status == SpotStatus.AVAILABLE
+            )
+            .values(status=SpotStatus.OCCUPIED)
+            .returning(ParkingSpot),
+            execution_options={"populate_existing": True}
+        )
+        spot = result.one_or_none()
+        if spot is not None and commit:
+            await self.db.commit()
+            await invalidate_availability_stats()
+        return spot
+    
+    @staticmethod
+    def _available_criteria(spot_type: SpotType, aircraft_size: AircraftSizeCategory):
+        """WHERE clause of available spots of a type fitting an aircraft size"""
+        return and_(
+            ParkingSpot.spot_type == spot_type,
+            ParkingSpot.status == SpotStatus.AVAILABLE,
+            ParkingSpot.aircraft_size_capacity >= aircraft_size
+        )
+    
+    async def update_status(
+        self,
+        spot_id: str,
+        status: SpotStatus,
+        commit: bool = True
+    ) -> Optional[ParkingSpot]:
+        """
+        Update parking spot status
+        
+        Args:
+            commit: Commit immediately; False leaves it to the caller's transaction
+        """
         spot = await self.get_by_id(spot_id)
         if not spot:
             return None
         
         spot.status = status
-        await self.db.commit()
-        await self.db.refresh(spot)
+        if commit:
+            await self.db.commit()
+            await invalidate_availability_stats()
+            await self.db.refresh(spot)
         return spot
     
     async def get_by_type(self, spot_type: SpotType) -> List[ParkingSpot]:
@@ -159,9 +277,37 @@ class ParkingSpotRepository:
             spot.notes = notes
         
         await self.db.commit()
+        await invalidate_availability_stats()
         await self.db.refresh(spot)
         return spot
     
+    async def update_and_return(self, spot_id: str, **fields) -> Optional[ParkingSpot]:
+        """
+        Update spot columns and fetch the row in one UPDATE ... RETURNING.
+        
+        Args:
+            spot_id: Spot to update
+            **fields: Column values to set (at least one)
+        
+        Returns:
+            Updated spot, or None if it does not exist
+        """
+        from sqlalchemy import update
+        
+        result = await self.db.execute(
+            update(ParkingSpot)
+            .where(ParkingSpot.spot_id == spot_id)
+            .values(**fields)
+            .returning(ParkingSpot)
+        )
+        spot = result.scalar_one_or_none()
+        if spot is None:
+            return None
+        
+        await self.db.commit()
+        await invalidate_availability_stats()
+        return spot
+    
     async def delete(self, spot_id: str) -> bool:
         """Delete parking spot"""
         spot = await self.get_by_id(spot_id)
@@ -170,6 +316,7 @@ class ParkingSpotRepository:
         
         await self.db.delete(spot)
         await self.db.commit()
+        await invalidate_availability_stats()
         return True
 
 
@@ -188,9 +335,16 @@ class ParkingAllocationRepository:
         overflow_to_military: bool = False,
         overflow_reason: Optional[str] = None,
         conflict_detected: bool = False,
-        conflict_probability: Optional[float] = None
+        conflict_probability: Optional[float] = None,
+        commit: bool = True
     ) -> ParkingAllocation:
-        """Create new parking allocation"""
+        """
+        Create new parking allocation
+        
+        Args:
+            commit: Commit immediately; False only flushes (allocation_id is
+                set) and leaves the commit to the caller's transaction
+        """
         allocation = ParkingAllocation(
             flight_icao24=flight_icao24,
             spot_id=spot_id,
@@ -202,8 +356,12 @@ class ParkingAllocationRepository:
             conflict_probability=conflict_probability
         )
         self.db.add(allocation)
-        await self.db.commit()
-        await self.db.refresh(allocation)
+        if commit:
+            await self.db.commit()
+            await invalidate_availability_stats()
+            await self.db.refresh(allocation)
+        else:
+            await self.db.flush()
         return allocation
     
     async def get_by_id(self, allocation_id: int) -> Optional[ParkingAllocation]:
@@ -248,9 +406,15 @@ class ParkingAllocationRepository:
         allocation_id: int,
         actual_start_time: datetime,
         actual_end_time: datetime,
-        actual_duration_minutes: int
+        actual_duration_minutes: int,
+        commit: bool = True
     ) -> Optional[ParkingAllocation]:
-        """Mark allocation as complete with actual times"""
+        """
+        Mark allocation as complete with actual times
+        
+        Args:
+            commit: Commit immediately; False leaves it to the caller's transaction
+        """
         allocation = await self.get_by_id(allocation_id)
         if not allocation:
             return None
@@ -259,8 +423,10 @@ class ParkingAllocationRepository:
         allocation.actual_end_time = actual_end_time
         allocation.actual_duration_minutes = actual_duration_minutes
         
-        await self.db.commit()
-        await self.db.refresh(allocation)
+        if commit:
+            await self.db.commit()
+            await invalidate_availability_stats()
+            await self.db.refresh(allocation)
         return allocation
     
     async def get_conflicting_allocations(
@@ -297,21 +463,36 @@ class ParkingAllocationRepository:
         )
         return list(result.scalars().all())
     
+    @staticmethod
+    def _response_options() -> list:
+        """
+        Loader options for allocations returned to the API.
+        ParkingAllocationResponse only serializes allocation columns, so no
+        relationship is loaded; raiseload turns any later access into an
+        error instead of a hidden per-row SELECT.
+        """
+        from sqlalchemy.orm import raiseload
+        
+        return [raiseload("*")]
+    
     async def list_allocations(
         self,
         skip: int = 0,
         limit: int = 50,
         status_filter: Optional[str] = None,
         overflow_only: bool = False,
-        active_only: bool = False
-    ) -> tuple[List[ParkingAllocation], int]:
-        """List allocations with pagination and filters"""
+        active_only: bool = False,
+        with_total: bool = True
+    ) -> tuple[List[ParkingAllocation], Optional[int]]:
+        """
+        List allocations with pagination and filters.
+        
+        Args:
+            with_total: Also count all matching rows (None otherwise)
+        """
         from sqlalchemy import func
-        from sqlalchemy.orm import joinedload
         
-        query = select(ParkingAllocation).options(
-            joinedload(ParkingAllocation.spot)
-        )
+        query = select(ParkingAllocation).options(*self._response_options())
         count_query = select(func.count()).select_from(ParkingAllocation)
         
         # Apply filters
@@ -333,8 +514,10 @@ class ParkingAllocationRepository:
             count_query = count_query.where(and_(*filters))
         
         # Get total count
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar() or 0
+        total = None
+        if with_total:
+            total_result = await self.db.execute(count_query)
+            total = total_result.scalar() or 0
         
         # Apply pagination
         query = query.order_by(ParkingAllocation.allocated_at.desc()).offset(skip).limit(limit)
@@ -345,20 +528,28 @@ class ParkingAllocationRepository:
         return allocations, total
     
     async def get_allocation(self, allocation_id: int) -> Optional[ParkingAllocation]:
-        """Get allocation with eager loaded relationships"""
-        from sqlalchemy.orm import joinedload
-        
+        """Get allocation by ID for API responses (relationships not loaded)"""
         result = await self.db.execute(
             select(ParkingAllocation)
-            .options(
-                joinedload(ParkingAllocation.spot)
-            )
+            .options(*self._response_options())
             .where(ParkingAllocation.allocation_id == allocation_id)
         )
         return result.scalar_one_or_none()
     
     async def get_availability_stats(self) -> dict:
-        """Get parking availability statistics"""
+        """
+        Get parking availability statistics.
+        Cached in Redis (shared by all workers) for PARKING_STATS_CACHE_TTL
+        seconds and dropped on every spot/allocation write.
+        """
+        stats = await redis_get_json(AVAILABILITY_STATS_KEY)
+        if stats is None:
+            stats = await self._compute_availability_stats()
+            await redis_set_json(AVAILABILITY_STATS_KEY, stats, settings.PARKING_STATS_CACHE_TTL)
+        return stats
+    
+    async def _compute_availability_stats(self) -> dict:
+        """Aggregate parking availability statistics from the database"""
         from sqlalchemy import func, case
         from app.models.parking import ParkingSpot, SpotType, SpotStatus
         
@@ -1,5 +1,6 @@
 from typing import Optional, List
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, type_coerce, func, cast, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.models.prediction import AIPrediction, ModelType
@@ -78,6 +79,52 @@ class PredictionRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_latest_by_input(
+        self,
+        model_type: ModelType,
+        input_subset: dict
+    ) -> Optional[AIPrediction]:
+        """
+        Get most recent prediction whose input_data contains input_subset.
+        Uses JSONB containment (@>) so idx_ai_predictions_input_gin is used.
+        """
+        result = await self.db.execute(
+            select(AIPrediction)
+            .where(
+                and_(
+                    AIPrediction.model_type == model_type.value,
+                    type_coerce(AIPrediction.input_data, JSONB).contains(input_subset)
+                )
+            )
+            .order_by(AIPrediction.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_latest_by_input_hash(
+        self,
+        model_type: ModelType,
+        input_data: dict
+    ) -> Optional[AIPrediction]:
+        """
+        Get most recent prediction made with exactly this input_data.
+        The hash is computed server-side (same expression as the generated
+        input_hash column) so the lookup uses idx_ai_predictions_model_inputhash.
+        """
+        input_hash = func.digest(cast(cast(input_data, JSONB), Text), 'sha256')
+        result = await self.db.execute(
+            select(AIPrediction)
+            .where(
+                and_(
+                    AIPrediction.model_type == model_type.value,
+                    AIPrediction.input_hash == input_hash
+                )
+            )
+            .order_by(AIPrediction.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
     async def get_by_model_type(
         self,
         model_type: ModelType,
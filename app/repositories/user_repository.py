@@ -2,6 +2,7 @@ from typing import Optional, List
 from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from app.core.cache import invalidate_auth_cache
 from app.models.user import User, UserRole
 
 
@@ -91,6 +92,7 @@ class UserRepository:
         
         user.hashed_password = hashed_password
         await self.db.commit()
+        invalidate_auth_cache()
         await self.db.refresh(user)
         return user
     
@@ -102,6 +104,7 @@ class UserRepository:
         
         user.role = role
         await self.db.commit()
+        invalidate_auth_cache()
         await self.db.refresh(user)
         return user
     
@@ -113,6 +116,7 @@ class UserRepository:
         
         user.is_active = False
         await self.db.commit()
+        invalidate_auth_cache()
         await self.db.refresh(user)
         return user
     
@@ -124,6 +128,7 @@ class UserRepository:
         
         user.is_active = True
         await self.db.commit()
+        invalidate_auth_cache()
         await self.db.refresh(user)
         return user
     
@@ -146,6 +151,7 @@ class UserRepository:
         
         await self.db.delete(user)
         await self.db.commit()
+        invalidate_auth_cache()
         return True
     
     async def exists(self, username: str, email: str) -> bool:
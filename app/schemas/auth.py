@@ -1,7 +1,7 @@
 """
 Authentication schemas.
 """
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 
 
@@ -35,8 +35,4 @@ class UserResponse(UserBase):
     role: str
     created_at: Optional[str] = None
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            'datetime': lambda v: v.isoformat() if v else None
-        }
+    model_config = ConfigDict(from_attributes=True)
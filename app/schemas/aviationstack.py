@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -20,8 +20,7 @@ class AirlineInfo(BaseModel):
     iata: Optional[str] = Field(None, alias="iataCode")
     icao: Optional[str] = Field(None, alias="icaoCode")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class FlightNumber(BaseModel):
@@ -30,8 +29,7 @@ class FlightNumber(BaseModel):
     iata: Optional[str] = Field(None, alias="iataNumber")
     icao: Optional[str] = Field(None, alias="icaoNumber")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class AircraftInfo(BaseModel):
@@ -43,8 +41,7 @@ class AircraftInfo(BaseModel):
     model_code: Optional[str] = Field(None, alias="modelCode")
     model_text: Optional[str] = Field(None, alias="modelText")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class LocationInfo(BaseModel):
@@ -63,8 +60,7 @@ class LocationInfo(BaseModel):
     estimated_runway: Optional[str] = Field(None, alias="estimatedRunway")
     actual_runway: Optional[str] = Field(None, alias="actualRunway")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
     
     def get_best_time(self) -> Optional[datetime]:
         """Get the most accurate time available (actual > estimated > scheduled)"""
@@ -88,8 +84,7 @@ class LiveInfo(BaseModel):
     speed_vertical: Optional[float] = None
     is_ground: Optional[bool] = None
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class AviationStackFlight(BaseModel):
@@ -135,9 +130,9 @@ class AviationStackFlight(BaseModel):
             return self.arrival.get_best_time()
         return None
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "flight_date": "2025-12-12",
                 "flight_status": "scheduled",
@@ -168,6 +163,7 @@ class AviationStackFlight(BaseModel):
                 }
             }
         }
+    )
 
 
 class FutureFlightSchedule(BaseModel):
@@ -193,8 +189,7 @@ class FutureFlightSchedule(BaseModel):
             weekday=self.weekday
         )
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class AviationStackPagination(BaseModel):
@@ -210,8 +205,7 @@ class AviationStackResponse(BaseModel):
     pagination: AviationStackPagination
     data: List[AviationStackFlight]
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class AviationStackFutureResponse(BaseModel):
@@ -219,5 +213,4 @@ class AviationStackFutureResponse(BaseModel):
     pagination: AviationStackPagination
     data: List[FutureFlightSchedule]
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
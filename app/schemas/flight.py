@@ -1,7 +1,7 @@
 """
 Flight response schemas.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -36,8 +36,7 @@ class FlightResponse(BaseModel):
     est_departure_time: Optional[str] = None  # For future flights
     est_arrival_time: Optional[str] = None    # For future flights
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FlightListResponse(BaseModel):
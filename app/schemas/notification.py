@@ -0,0 +1,52 @@
+"""
+Notification schemas.
+"""
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.models.notification import NotificationType, NotificationSeverity
+
+
+class NotificationItem(BaseModel):
+    """Notification list item schema"""
+    notification_id: UUID
+    flight_icao24: str
+    notification_type: NotificationType
+    severity: NotificationSeverity
+    message: str
+    read_status: bool
+    created_at: datetime
+    acknowledged_at: Optional[datetime]
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NotificationListResponse(BaseModel):
+    """Paginated notification list response"""
+    items: List[NotificationItem]
+    total: int
+    skip: int
+    limit: int
+
+
+class CriticalNotificationItem(BaseModel):
+    """Critical notification alert schema"""
+    notification_id: UUID
+    flight_icao24: str
+    notification_type: NotificationType
+    message: str
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NotificationAckResponse(BaseModel):
+    """Notification acknowledgement response"""
+    success: bool = True
+    notification_id: UUID
+    read_status: bool
+    acknowledged_at: Optional[datetime]
+    
+    model_config = ConfigDict(from_attributes=True)
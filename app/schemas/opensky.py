@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from app.models.flight import MILITARY_ICAO24_PREFIXES
+
 
 class FlightType(str, Enum):
     """Type of flight operation"""
@@ -31,22 +33,24 @@ class StateVectorData(BaseModel):
     squawk: Optional[str] = Field(None, description="Transponder code")
     category: Optional[int] = Field(None, description="Aircraft category (if extended=1)")
     
-    @validator('icao24')
+    @field_validator('icao24')
+    @classmethod
     def validate_icao24(cls, v):
         """Ensure ICAO24 is lowercase hex string"""
         if v:
             return v.lower().strip()
         return v
     
-    @validator('callsign')
+    @field_validator('callsign')
+    @classmethod
     def validate_callsign(cls, v):
         """Clean up callsign"""
         if v:
             return v.strip()
         return v
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "icao24": "3c6444",
                 "callsign": "AFR123",
@@ -65,6 +69,7 @@ class StateVectorData(BaseModel):
                 "category": 3
             }
         }
+    )
 
 
 class FlightData(BaseModel):
@@ -85,14 +90,16 @@ class FlightData(BaseModel):
     departure_airport_candidates_count: Optional[int] = Field(None, description="Number of other possible departure airports")
     arrival_airport_candidates_count: Optional[int] = Field(None, description="Number of other possible arrival airports")
     
-    @validator('icao24')
+    @field_validator('icao24')
+    @classmethod
     def validate_icao24(cls, v):
         """Ensure ICAO24 is lowercase hex string"""
         if v:
             return v.lower().strip()
         return v
     
-    @validator('callsign')
+    @field_validator('callsign')
+    @classmethod
     def validate_callsign(cls, v):
         """Clean up callsign"""
         if v:
@@ -107,9 +114,8 @@ class FlightData(BaseModel):
         if not self.icao24:
             return False
         
-        # Common military prefixes (extend as needed)
-        military_prefixes = ['ae', 'af', 'am', '43', '44']
-        return any(self.icao24.startswith(prefix) for prefix in military_prefixes)
+        # icao24 is lowercased by validate_icao24
+        return self.icao24[:2] in MILITARY_ICAO24_PREFIXES
     
     def get_flight_type(self, target_airport_icao: str) -> Optional[FlightType]:
         """
@@ -127,8 +133,8 @@ class FlightData(BaseModel):
             return FlightType.DEPARTURE
         return None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "icao24": "3c6444",
                 "callsign": "AFR123",
@@ -144,6 +150,7 @@ class FlightData(BaseModel):
                 "arrival_airport_candidates_count": 0
             }
         }
+    )
 
 
 class OpenSkyResponse(BaseModel):
@@ -152,14 +159,15 @@ class OpenSkyResponse(BaseModel):
     total_count: int
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "flights": [],
                 "total_count": 0,
                 "timestamp": "2025-12-10T10:30:00Z"
             }
         }
+    )
 
 
 class StateVectorResponse(BaseModel):
@@ -168,11 +176,12 @@ class StateVectorResponse(BaseModel):
     total_count: int
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "states": [],
                 "total_count": 0,
                 "timestamp": "2025-12-15T10:30:00Z"
             }
         }
+    )
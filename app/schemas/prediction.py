@@ -1,7 +1,7 @@
 """
 Pydantic schemas for ML predictions (Hugging Face API)
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 
@@ -56,8 +56,8 @@ class FlightPredictionRequest(BaseModel):
     # Timestamp (optional)
     timestamp: Optional[str] = Field(None, description="ISO 8601 timestamp")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "callsign": "AF1234",
                 "icao24": "3944ef",
@@ -85,6 +85,7 @@ class FlightPredictionRequest(BaseModel):
                 "emplacements_futurs_libres": 3
             }
         }
+    )
 
 
 # ============================================================================
@@ -135,8 +136,8 @@ class FlightPredictionResponse(BaseModel):
     model_3_conflict: Model3ConflictResponse
     metadata: PredictionMetadata
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "model_1_eta": {
                     "eta_ajuste": 36.37,
@@ -167,6 +168,7 @@ class FlightPredictionResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 # ============================================================================
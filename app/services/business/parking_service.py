@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from typing import Optional, List
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,6 +12,36 @@ from app.models.flight import Flight
 
 logger = logging.getLogger(__name__)
 
+# Flights carry no aircraft type yet, so allocation assumes a narrow-body
+DEFAULT_AIRCRAFT_TYPE = "A320"
+
+_LARGE_AIRCRAFT = ('B747', 'B777', 'B787', 'A330', 'A340', 'A350', 'A380')
+_SMALL_AIRCRAFT = ('ATR', 'DHC', 'CRJ', 'E190', 'E170')
+
+
+@lru_cache(maxsize=64)
+def get_aircraft_size(aircraft_type: str) -> AircraftSizeCategory:
+    """
+    Determine aircraft size category from type.
+    
+    Args:
+        aircraft_type: Aircraft type code (e.g., A320, B737, B777)
+    
+    Returns:
+        Size category enum
+    """
+    aircraft_upper = aircraft_type.upper()
+    
+    if any(large in aircraft_upper for large in _LARGE_AIRCRAFT):
+        return AircraftSizeCategory.LARGE
+    elif any(small in aircraft_upper for small in _SMALL_AIRCRAFT):
+        return AircraftSizeCategory.SMALL
+    else:
+        return AircraftSizeCategory.MEDIUM
+
+
+DEFAULT_AIRCRAFT_SIZE = get_aircraft_size(DEFAULT_AIRCRAFT_TYPE)
+
 
 class ParkingAllocationResult:
     """Result of parking allocation attempt"""
@@ -70,7 +101,7 @@ class ParkingService:
         )
         
         # Determine aircraft size
-        aircraft_size = self._get_aircraft_size("A320")  # Default, extract from flight if available
+        aircraft_size = DEFAULT_AIRCRAFT_SIZE
         
         # Check conflict probability
         conflict_detected = False
@@ -85,16 +116,17 @@ class ParkingService:
                     f"High conflict probability ({conflict_probability:.2%}) detected for flight {flight.icao24}"
                 )
         
-        # Try civil spots first
-        civil_spots = await self.spot_repo.get_available_by_type(
-            spot_type=SpotType.CIVIL,
-            aircraft_size=aircraft_size
-        )
+        # Try civil spots first: claim the best one (marked OCCUPIED atomically,
+        # committed together with the allocation)
+        best_spot = None
+        if not conflict_detected:
+            best_spot = await self.spot_repo.claim_available(
+                spot_type=SpotType.CIVIL,
+                aircraft_size=aircraft_size,
+                commit=False
+            )
         
-        if civil_spots and not conflict_detected:
-            # Allocate to civil spot
-            best_spot = civil_spots[0]  # Already sorted by priority
-            
+        if best_spot:
             predicted_end_time = datetime.utcnow() + timedelta(minutes=predicted_occupation_minutes)
             
             allocation = await self.allocation_repo.create(
@@ -106,9 +138,6 @@ class ParkingService:
                 conflict_probability=conflict_probability
             )
             
-            # Update spot status
-            await self.spot_repo.update_status(best_spot.spot_id, SpotStatus.OCCUPIED)
-            
             # Update flight parking assignment
             await self.flight_repo.update_parking_assignment(flight.icao24, best_spot.spot_id)
             
@@ -138,13 +167,13 @@ class ParkingService:
         
         if transferred:
             # A civil spot was freed, allocate it to the new flight
-            civil_spots = await self.spot_repo.get_available_by_type(
+            best_spot = await self.spot_repo.claim_available(
                 spot_type=SpotType.CIVIL,
-                aircraft_size=aircraft_size
+                aircraft_size=aircraft_size,
+                commit=False
             )
             
-            if civil_spots:
-                best_spot = civil_spots[0]
+            if best_spot:
                 predicted_end_time = datetime.utcnow() + timedelta(minutes=predicted_occupation_minutes)
                 
                 allocation = await self.allocation_repo.create(
@@ -156,7 +185,6 @@ class ParkingService:
                     conflict_probability=conflict_probability
                 )
                 
-                await self.spot_repo.update_status(best_spot.spot_id, SpotStatus.OCCUPIED)
                 await self.flight_repo.update_parking_assignment(flight.icao24, best_spot.spot_id)
                 
                 logger.info(f"Allocated civil spot {best_spot.spot_id} after military transfer")
@@ -176,16 +204,16 @@ class ParkingService:
 "
         )
         
-        # Get available military spots
-        military_spots = await self.spot_repo.get_available_by_type(
+        # Claim an available military spot
+        military_spot = await self.spot_repo.claim_available(
             spot_type=SpotType.MILITARY,
-            aircraft_size=aircraft_size
+            aircraft_size=aircraft_size,
+            commit=False
         )
         
-        if military_spots:
-            military_spot = military_spots[0]
-            
+        if military_spot:
             # Allocate to military
+            predicted_end_time = datetime.utcnow() + timedelta(minutes=predicted_occupation_minutes)
             allocation = await self.allocation_repo.create(
                 flight_icao24=flight.icao24,
                 spot_id=military_spot.spot_id,
@@ -197,7 +225,6 @@ class ParkingService:
                 conflict_probability=conflict_probability
             )
             
-            await self.spot_repo.update_status(military_spot.spot_id, SpotStatus.OCCUPIED)
             await self.flight_repo.update_parking_assignment(flight.icao24, military_spot.spot_id)
             
             # Create overflow notification
@@ -253,16 +280,6 @@ class ParkingService:
         Returns:
             True if a flight was successfully transferred
         """
-        # Check if military spots are available
-        military_spots = await self.spot_repo.get_available_by_type(
-            spot_type=SpotType.MILITARY,
-            aircraft_size=aircraft_size
-        )
-        
-        if not military_spots:
-            logger.info("No military spots available for transfer")
-            return False
-        
         # Get all active civil allocations
         active_allocations = await self.allocation_repo.get_active_allocations()
         
@@ -294,6 +311,16 @@ class ParkingService:
             logger.warning(f"Could not find spot {latest_allocation.spot_id}")
             return False
         
+        # Claim a military spot (committed together with the transfer)
+        military_spot = await self.spot_repo.claim_available(
+            spot_type=SpotType.MILITARY,
+            aircraft_size=aircraft_size,
+            commit=False
+        )
+        if not military_spot:
+            logger.info("No military spots available for transfer")
+            return False
+        
         logger.info(
             f"Transferring flight {late_flight.icao24} from civil spot {current_spot.spot_id} "
             f"to military (departs at {latest_allocation.predicted_end_time})"
@@ -313,7 +340,6 @@ class ParkingService:
         await self.spot_repo.update_status(current_spot.spot_id, SpotStatus.AVAILABLE)
         
         # Allocate to military spot
-        military_spot = military_spots[0]
         remaining_minutes = int((latest_allocation.predicted_end_time - now).total_seconds() / 60)
         
         new_allocation = await self.allocation_repo.create(
@@ -325,9 +351,6 @@ class ParkingService:
             overflow_reason="Transferred to free civil spot for earlier departure"
         )
         
-        # Update military spot status
-        await self.spot_repo.update_status(military_spot.spot_id, SpotStatus.OCCUPIED)
-        
         # Update flight parking assignment
         await self.flight_repo.update_parking_assignment(late_flight.icao24, military_spot.spot_id)
         
@@ -345,28 +368,38 @@ class ParkingService:
         
         return True
     
-    async def recall_from_military(
-        self,
-        flight: Flight,
-        civil_spot: ParkingSpot
-    ) -> bool:
+    async def recall_from_military(self, flight: Flight) -> ParkingAllocationResult:
         """
-        Recall flight from military to civil parking when spot becomes available.
+        Recall flight from military to civil parking when a spot becomes available.
         
         Args:
             flight: Flight object
-            civil_spot: Available civil spot
         
         Returns:
-            True if recall successful
+            ParkingAllocationResult with the claimed civil spot on success
         """
-        logger.info(f"Recalling flight {flight.icao24} from military to civil spot {civil_spot.spot_id}")
-        
         # Get current allocation
         current_allocation = await self.allocation_repo.get_by_flight(flight.icao24)
         if not current_allocation or not current_allocation.overflow_to_military:
             logger.warning(f"Flight {flight.icao24} not in military overflow")
-            return False
+            return ParkingAllocationResult(
+                success=False,
+                reason="Recall failed - flight not in military overflow"
+            )
+        
+        # Claim a civil spot (committed together with the completed allocation)
+        civil_spot = await self.spot_repo.claim_available(
+            spot_type=SpotType.CIVIL,
+            aircraft_size=DEFAULT_AIRCRAFT_SIZE,
+            commit=False
+        )
+        if not civil_spot:
+            return ParkingAllocationResult(
+                success=False,
+                reason="No civil spots available for recall"
+            )
+        
+        logger.info(f"Recalling flight {flight.icao24} from military to civil spot {civil_spot.spot_id}")
         
         # Complete old allocation
         now = datetime.now(timezone.utc)
@@ -391,9 +424,6 @@ class ParkingService:
             overflow_to_military=False
         )
         
-        # Update spot status
-        await self.spot_repo.update_status(civil_spot.spot_id, SpotStatus.OCCUPIED)
-        
         # Update flight parking assignment
         await self.flight_repo.update_parking_assignment(flight.icao24, civil_spot.spot_id)
         
@@ -401,29 +431,17 @@ class ParkingService:
         await self.notification_service.create_recall_notification(flight, civil_spot)
         
         logger.info(f"Successfully recalled flight {flight.icao24} to civil spot {civil_spot.spot_id}")
-        return True
+        return ParkingAllocationResult(
+            success=True,
+            allocation=new_allocation,
+            spot=civil_spot,
+            overflow_to_military=False,
+            reason="Recalled to civil spot"
+        )
     
     def _get_aircraft_size(self, aircraft_type: str) -> AircraftSizeCategory:
-        """
-        Determine aircraft size category from type.
-        
-        Args:
-            aircraft_type: Aircraft type code (e.g., A320, B737, B777)
-        
-        Returns:
-            Size category enum
-        """
-        large_aircraft = ['B747', 'B777', 'B787', 'A330', 'A340', 'A350', 'A380']
-        small_aircraft = ['ATR', 'DHC', 'CRJ', 'E190', 'E170']
-        
-        aircraft_upper = aircraft_type.upper()
-        
-        if any(large in aircraft_upper for large in large_aircraft):
-            return AircraftSizeCategory.LARGE
-        elif any(small in aircraft_upper for small in small_aircraft):
-            return AircraftSizeCategory.SMALL
-        else:
-            return AircraftSizeCategory.MEDIUM
+        """Determine aircraft size category from type (see get_aircraft_size)"""
+        return get_aircraft_size(aircraft_type)
     
     async def check_saturation(self) -> dict:
         """Check parking saturation and create alerts if needed"""
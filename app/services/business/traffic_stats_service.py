@@ -3,18 +3,45 @@ Service pour calculer les statistiques de trafic en temps réel.
 Utilisé pour enrichir les prédictions ML avec des données réelles.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, true
 from typing import Dict
 from app.models.parking import ParkingAllocation, ParkingSpot, SpotStatus
 from app.models.flight import Flight, FlightStatus, FlightType
+from app.core.cache import redis_get_or_compute
+from app.core.config import get_settings
+from app.database import AsyncSessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Clé Redis des statistiques de trafic (voir get_traffic_statistics_cached)
+TRAFFIC_STATS_KEY = "traffic_stats:v1"
+
+# Valeurs par défaut au cas où les requêtes échouent
+DEFAULT_TRAFFIC_STATS = {
+    "approaching": 0,
+    "tarmac_occupation": 0.0,
+    "available_spots": 16,  # Based on seeded civil spots
+    "current_occupation": 0.0,
+    "incoming": 0,
+    "outgoing": 0,
+    "future_free_spots": 16
+}
+
+DEFAULT_HISTORICAL_DATA = {
+    "avg_delay": 5.0,
+    "aircraft_type": "A320",
+    "passengers": 180,
+    "avg_occupation_time": 45.0,
+    "airline": "Unknown"
+}
 
 
 async def get_traffic_statistics(db: AsyncSession) -> Dict:
     """
-    Calcule les statistiques de trafic en temps réel depuis la DB.
+    Calcule les statistiques de trafic en temps réel depuis la DB
+    (valeurs par défaut si les requêtes échouent).
     
     Returns:
         Dict contenant:
@@ -26,104 +53,135 @@ async def get_traffic_statistics(db: AsyncSession) -> Dict:
         - outgoing: Vols sortants actifs
         - future_free_spots: Estimation de spots libres dans 1h
     """
-    # Valeurs par défaut au cas où les requêtes échouent
-    default_stats = {
-        "approaching": 0,
-        "tarmac_occupation": 0.0,
-        "available_spots": 16,  # Based on seeded civil spots
-        "current_occupation": 0.0,
-        "incoming": 0,
-        "outgoing": 0,
-        "future_free_spots": 16
-    }
-    
     try:
-        # Compter les vols actifs en approche (ARRIVAL + ACTIVE)
-        result = await db.execute(
-            select(func.count(Flight.icao24))
-            .where(
-                Flight.status == "active",
-                Flight.flight_type == "arrival"
-            )
-        )
-        approaching = result.scalar() or 0
-        
-        # Compter les spots disponibles
-        result = await db.execute(
-            select(func.count(ParkingSpot.spot_id))
-            .where(ParkingSpot.status == SpotStatus.AVAILABLE)
-        )
-        available_spots = result.scalar() or 0
-        
-        # Compter le total de spots (civil uniquement pour occupation normale)
-        result = await db.execute(
-            select(func.count(ParkingSpot.spot_id))
-            .where(ParkingSpot.spot_type == "civil")
-        )
-        total_civil_spots = result.scalar() or 1  # Éviter division par zéro
-        
-        # Compter les spots occupés
-        result = await db.execute(
-            select(func.count(ParkingSpot.spot_id))
-            .where(ParkingSpot.status == SpotStatus.OCCUPIED)
-        )
-        occupied_spots = result.scalar() or 0
-        
-        # Calculer le taux d'occupation
-        current_occupation = occupied_spots / total_civil_spots if total_civil_spots > 0 else 0.0
-        tarmac_occupation = current_occupation  # Même métrique pour le tarmac
-        
-        # Compter vols entrants (ACTIVE + ARRIVAL)
-        result = await db.execute(
-            select(func.count(Flight.icao24))
-            .where(
-                Flight.status == "active",
-                Flight.flight_type == "arrival"
-            )
+        return await _compute_traffic_statistics(db)
+    except Exception as e:
+        logger.error(f"Error calculating traffic stats: {str(e)}", exc_info=True)
+        # Retourner les valeurs par défaut en cas d'erreur
+        return dict(DEFAULT_TRAFFIC_STATS)
+
+
+async def _compute_traffic_statistics(db: AsyncSession) -> Dict:
+    """Requête des statistiques de trafic (les erreurs sont propagées)"""
+    # Toutes les métriques en une seule requête : un agrégat filtré par
+    # table (index idx_flight_status_type, idx_spot_type_status et
+    # idx_allocation_active_partial), réunis en une ligne
+    from datetime import datetime, timedelta, timezone
+    one_hour_later = datetime.now(timezone.utc) + timedelta(hours=1)
+    
+    # Vols actifs entrants (ARRIVAL, aussi comptés comme "en approche") et sortants
+    flights = (
+        select(
+            func.count().filter(Flight.flight_type == "arrival").label("incoming"),
+            func.count().filter(Flight.flight_type == "departure").label("outgoing")
         )
-        incoming = result.scalar() or 0
-        
-        # Compter vols sortants (ACTIVE + DEPARTURE)
-        result = await db.execute(
-            select(func.count(Flight.icao24))
-            .where(
-                Flight.status == "active",
-                Flight.flight_type == "departure"
-            )
+        .where(Flight.status == "active")
+        .subquery()
+    )
+    # Spots disponibles, occupés, et total civil (occupation normale)
+    spots = select(
+        func.count().filter(ParkingSpot.status == SpotStatus.AVAILABLE).label("available"),
+        func.count().filter(ParkingSpot.status == SpotStatus.OCCUPIED).label("occupied"),
+        func.count().filter(ParkingSpot.spot_type == "civil").label("total_civil")
+    ).subquery()
+    # Allocations actives qui se terminent dans l'heure
+    ending = (
+        select(func.count().label("ending_soon"))
+        .where(
+            ParkingAllocation.actual_end_time.is_(None),  # Active allocations
+            ParkingAllocation.predicted_end_time <= one_hour_later
         )
-        outgoing = result.scalar() or 0
-        
-        # Estimation des spots futurs libres
-        # Basé sur les allocations qui se terminent bientôt (prochaine heure)
-        from datetime import datetime, timedelta, timezone
-        one_hour_later = datetime.now(timezone.utc) + timedelta(hours=1)
-        
-        result = await db.execute(
-            select(func.count(ParkingAllocation.allocation_id))
-            .where(
-                ParkingAllocation.actual_end_time.is_(None),  # Active allocations
-                ParkingAllocation.predicted_end_time <= one_hour_later
-            )
+        .subquery()
+    )
+    
+    result = await db.execute(
+        select(flights, spots, ending)
+        .select_from(flights.join(spots, true()).join(ending, true()))
+    )
+    row = result.one()
+    
+    approaching = incoming = row.incoming
+    outgoing = row.outgoing
+    available_spots = row.available
+    total_civil_spots = row.total_civil or 1  # Éviter division par zéro
+    
+    # Calculer le taux d'occupation
+    current_occupation = row.occupied / total_civil_spots
+    tarmac_occupation = current_occupation  # Même métrique pour le tarmac
+    
+    # Estimation des spots futurs libres (allocations qui se terminent bientôt)
+    future_free_spots = row.ending_soon
+    
+    stats = {
+        "approaching": approaching,
+        "tarmac_occupation": round(tarmac_occupation, 2),
+        "available_spots": available_spots,
+        "current_occupation": round(current_occupation, 2),
+        "incoming": incoming,
+        "outgoing": outgoing,
+        "future_free_spots": future_free_spots + available_spots  # Spots actuels + futurs
+    }
+    
+    logger.info(f"Traffic stats calculated: {stats}")
+    return stats
+
+
+async def get_traffic_statistics_cached() -> Dict:
+    """
+    Statistiques de trafic partagées par tous les workers via Redis.
+    
+    Recalculées au plus une fois toutes les TRAFFIC_STATS_CACHE_TTL
+    secondes (sur une session dédiée, indépendante de la requête) ;
+    les requêtes concurrentes d'un même worker partagent le calcul.
+    
+    Les valeurs par défaut retournées après une erreur ne sont pas mises
+    en cache, pour que les vraies statistiques reviennent dès le rétablissement.
+    
+    Returns:
+        Même dict que get_traffic_statistics()
+    """
+    async def _compute() -> Dict:
+        async with AsyncSessionLocal() as db:
+            return await _compute_traffic_statistics(db)
+    
+    try:
+        return await redis_get_or_compute(
+            TRAFFIC_STATS_KEY, settings.TRAFFIC_STATS_CACHE_TTL, _compute
         )
-        future_free_spots = result.scalar() or 0
-        
-        stats = {
-            "approaching": approaching,
-            "tarmac_occupation": round(tarmac_occupation, 2),
-            "available_spots": available_spots,
-            "current_occupation": round(current_occupation, 2),
-            "incoming": incoming,
-            "outgoing": outgoing,
-            "future_free_spots": future_free_spots + available_spots  # Spots actuels + futurs
-        }
-        
-        logger.info(f"Traffic stats calculated: {stats}")
-        return stats
-        
     except Exception as e:
         logger.error(f"Error calculating traffic stats: {str(e)}", exc_info=True)
-        # Retourner les valeurs par défaut en cas d'erreur
-        return default_stats
+        return dict(DEFAULT_TRAFFIC_STATS)
+
+
+# Instantané des statistiques de trafic de ce worker (voir refresh_traffic_snapshot)
+_traffic_snapshot: Dict = {}
+
+
+async def refresh_traffic_snapshot() -> None:
+    """
+    Rafraîchit l'instantané en mémoire des statistiques de trafic.
+    
+    Appelé toutes les TRAFFIC_STATS_SNAPSHOT_INTERVAL secondes par le
+    scheduler ; la lecture passe par le cache Redis, donc la DB n'est
+    interrogée qu'une fois par TTL pour l'ensemble des workers.
+    """
+    global _traffic_snapshot
+    _traffic_snapshot = await get_traffic_statistics_cached()
+
+
+async def get_traffic_snapshot() -> Dict:
+    """
+    Statistiques de trafic pour l'enrichissement des prédictions.
+    
+    Lit l'instantané en mémoire ; tant que le premier rafraîchissement
+    n'a pas eu lieu, retombe sur get_traffic_statistics_cached().
+    
+    Returns:
+        Copie du dict de get_traffic_statistics()
+    """
+    if _traffic_snapshot:
+        return dict(_traffic_snapshot)
+    return await get_traffic_statistics_cached()
 
 
 async def get_weather_data() -> Dict:
@@ -149,7 +207,8 @@ async def get_weather_data() -> Dict:
 
 async def get_historical_data(db: AsyncSession, flight: Flight) -> Dict:
     """
-    Récupère les données historiques pour un vol depuis la DB.
+    Récupère les données historiques pour un vol depuis la DB
+    (valeurs par défaut si les requêtes échouent).
     
     Args:
         db: Session de base de données
@@ -159,96 +218,121 @@ async def get_historical_data(db: AsyncSession, flight: Flight) -> Dict:
         Dict avec retard moyen, temps d'occupation, passagers, type d'avion, airline
     """
     try:
-        # Extraire la compagnie depuis le callsign ou origin_country
-        airline = "Unknown"
-        if flight.callsign and len(flight.callsign) >= 3:
-            # Les 3 premiers caractères sont souvent le code ICAO de la compagnie
-            airline_code = flight.callsign[:3].upper()
-            # Mapping basique des codes ICAO vers noms de compagnies
-            airline_mapping = {
-                "AFR": "Air France",
-                "KLM": "KLM",
-                "BAW": "British Airways",
-                "DLH": "Lufthansa",
-                "UAE": "Emirates",
-                "QFA": "Qantas",
-                "AAL": "American Airlines",
-                "DAL": "Delta",
-                "UAL": "United",
-                "RYR": "Ryanair",
-                "EZY": "EasyJet",
-                "IBE": "Iberia",
-                "TAP": "TAP Portugal",
-            }
-            airline = airline_mapping.get(airline_code, flight.origin_country or "Unknown")
-        elif flight.origin_country:
-            airline = flight.origin_country
-        
-        # Calculer le retard moyen de cette compagnie depuis l'historique des vols complétés
-        avg_delay = 5.0  # Default
-        try:
-            from app.models.flight import FlightStatus
-            result = await db.execute(
-                select(func.avg(Flight.predicted_delay_minutes))
-                .where(
-                    Flight.origin_country == flight.origin_country,
-                    Flight.status == "completed",
-                    Flight.predicted_delay_minutes.isnot(None)
-                )
-            )
-            historical_avg_delay = result.scalar()
-            if historical_avg_delay is not None:
-                avg_delay = float(historical_avg_delay)
-                logger.info(f"Historical avg delay for {airline}: {avg_delay:.1f}min")
-        except Exception as e:
-            logger.warning(f"Could not calculate historical delay: {str(e)}")
-        
-        # Extraire le type d'avion du callsign ou de prédictions précédentes
-        aircraft_type = "A320"  # Default
-        # TODO: Ajouter une table aircraft_registry pour mapper icao24 -> aircraft_type
-        
-        # Calculer le temps d'occupation moyen pour ce type d'avion depuis les allocations
-        avg_occupation_time = 45.0  # Default
-        try:
-            result = await db.execute(
-                select(func.avg(ParkingAllocation.actual_duration_minutes))
-                .where(
-                    ParkingAllocation.actual_end_time.isnot(None),  # Completed allocations
-                    ParkingAllocation.actual_duration_minutes.isnot(None)
-                )
-            )
-            historical_occupation = result.scalar()
-            if historical_occupation is not None:
-                avg_occupation_time = float(historical_occupation)
-                logger.info(f"Historical avg occupation: {avg_occupation_time:.1f}min")
-        except Exception as e:
-            logger.warning(f"Could not calculate historical occupation: {str(e)}")
-        
-        # Estimer les passagers selon le type d'avion
-        passengers_by_type = {
-            "A320": 180,
-            "A321": 220,
-            "B737": 189,
-            "A319": 156,
-            "B777": 396,
-            "A380": 525,
-        }
-        passengers = passengers_by_type.get(aircraft_type, 180)
-        
-        return {
-            "avg_delay": avg_delay,
-            "aircraft_type": aircraft_type,
-            "passengers": passengers,
-            "avg_occupation_time": avg_occupation_time,
-            "airline": airline
-        }
-        
+        return await _compute_historical_data(db, flight)
     except Exception as e:
         logger.error(f"Error getting historical data: {str(e)}")
-        return {
-            "avg_delay": 5.0,
-            "aircraft_type": "A320",
-            "passengers": 180,
-            "avg_occupation_time": 45.0,
-            "airline": "Unknown"
+        return dict(DEFAULT_HISTORICAL_DATA)
+
+
+async def _compute_historical_data(db: AsyncSession, flight: Flight) -> Dict:
+    """Requête des données historiques d'un vol (les erreurs sont propagées)"""
+    # Extraire la compagnie depuis le callsign ou origin_country
+    airline = "Unknown"
+    if flight.callsign and len(flight.callsign) >= 3:
+        # Les 3 premiers caractères sont souvent le code ICAO de la compagnie
+        airline_code = flight.callsign[:3].upper()
+        # Mapping basique des codes ICAO vers noms de compagnies
+        airline_mapping = {
+            "AFR": "Air France",
+            "KLM": "KLM",
+            "BAW": "British Airways",
+            "DLH": "Lufthansa",
+            "UAE": "Emirates",
+            "QFA": "Qantas",
+            "AAL": "American Airlines",
+            "DAL": "Delta",
+            "UAL": "United",
+            "RYR": "Ryanair",
+            "EZY": "EasyJet",
+            "IBE": "Iberia",
+            "TAP": "TAP Portugal",
         }
+        airline = airline_mapping.get(airline_code, flight.origin_country or "Unknown")
+    elif flight.origin_country:
+        airline = flight.origin_country
+    
+    # Calculer le retard moyen de cette compagnie depuis l'historique des vols complétés
+    avg_delay = 5.0  # Default
+    result = await db.execute(
+        select(func.avg(Flight.predicted_delay_minutes))
+        .where(
+            Flight.origin_country == flight.origin_country,
+            Flight.status == "completed",
+            Flight.predicted_delay_minutes.isnot(None)
+        )
+    )
+    historical_avg_delay = result.scalar()
+    if historical_avg_delay is not None:
+        avg_delay = float(historical_avg_delay)
+        logger.info(f"Historical avg delay for {airline}: {avg_delay:.1f}min")
+    
+    # Extraire le type d'avion du callsign ou de prédictions précédentes
+    aircraft_type = "A320"  # Default
+    # TODO: Ajouter une table aircraft_registry pour mapper icao24 -> aircraft_type
+    
+    # Calculer le temps d'occupation moyen pour ce type d'avion depuis les allocations
+    avg_occupation_time = 45.0  # Default
+    result = await db.execute(
+        select(func.avg(ParkingAllocation.actual_duration_minutes))
+        .where(
+            ParkingAllocation.actual_end_time.isnot(None),  # Completed allocations
+            ParkingAllocation.actual_duration_minutes.isnot(None)
+        )
+    )
+    historical_occupation = result.scalar()
+    if historical_occupation is not None:
+        avg_occupation_time = float(historical_occupation)
+        logger.info(f"Historical avg occupation: {avg_occupation_time:.1f}min")
+    
+    # Estimer les passagers selon le type d'avion
+    passengers_by_type = {
+        "A320": 180,
+        "A321": 220,
+        "B737": 189,
+        "A319": 156,
+        "B777": 396,
+        "A380": 525,
+    }
+    passengers = passengers_by_type.get(aircraft_type, 180)
+    
+    return {
+        "avg_delay": avg_delay,
+        "aircraft_type": aircraft_type,
+        "passengers": passengers,
+        "avg_occupation_time": avg_occupation_time,
+        "airline": airline
+    }
+
+
+async def get_historical_data_cached(icao24: str) -> Dict:
+    """
+    Données historiques d'un vol, partagées via Redis pendant
+    HISTORICAL_DATA_CACHE_TTL secondes (agrégats stables à l'échelle de l'heure).
+    Un vol encore inconnu ({}) n'est mis en cache que
+    HISTORICAL_DATA_EMPTY_CACHE_TTL secondes, pour que ses premières
+    données soient prises en compte rapidement.
+    
+    Les valeurs par défaut retournées après une erreur ne sont pas mises
+    en cache, comme pour get_traffic_statistics_cached().
+    
+    Args:
+        icao24: Adresse ICAO24 du vol
+    
+    Returns:
+        Même dict que get_historical_data(), ou {} si le vol est inconnu
+    """
+    async def _compute() -> Dict:
+        async with AsyncSessionLocal() as db:
+            flight = await db.get(Flight, icao24)
+            return await _compute_historical_data(db, flight) if flight else {}
+    
+    try:
+        return await redis_get_or_compute(
+            f"hist:v1:{icao24}",
+            settings.HISTORICAL_DATA_CACHE_TTL,
+            _compute,
+            empty_ttl=settings.HISTORICAL_DATA_EMPTY_CACHE_TTL
+        )
+    except Exception as e:
+        logger.error(f"Error getting historical data: {str(e)}")
+        return dict(DEFAULT_HISTORICAL_DATA)
@@ -37,15 +37,37 @@ class AviationStackClient:
         self.api_base_url = settings.AVIATIONSTACK_API_BASE_URL
         self._http_client: Optional[httpx.AsyncClient] = None
         self._rate_limit_remaining: Optional[int] = None
+        self._persistent = False
+    
+    async def start(self):
+        """
+        Open a long-lived HTTP client shared by every caller until close().
+        While it is open, `async with` blocks reuse it instead of opening
+        and tearing down their own connection pool.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        self._persistent = True
+    
+    async def close(self):
+        """Close the long-lived HTTP client"""
+        self._persistent = False
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
     
     async def __aenter__(self):
         """Initialize HTTP client on context enter"""
-        self._http_client = httpx.AsyncClient(timeout=30.0)
+        if not self._persistent:
+            self._http_client = httpx.AsyncClient(timeout=30.0)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Close HTTP client on context exit"""
-        if self._http_client:
+        if self._http_client and not self._persistent:
             await self._http_client.aclose()
     
     @retry_with_backoff(max_retries=2, initial_delay=1.0)
@@ -358,3 +380,15 @@ class AviationStackClient:
         
         logger.info(f"Retrieved {len(all_flights)} total flights")
         return all_flights
+
+
+async def get_aviation_client() -> AviationStackClient:
+    """
+    Dependency returning the shared AviationStack client.
+    
+    Returns:
+        AviationStackClient with its long-lived HTTP client open
+    """
+    client = AviationStackClient()
+    await client.start()
+    return client
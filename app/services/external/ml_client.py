@@ -3,14 +3,25 @@ Client for Air Traffic ML API (Hugging Face Space)
 Space: TAGBA/ubuntuairlab
 URL: https://tagba-ubuntuairlab.hf.space
 """
+import asyncio
+import hashlib
+import random
+import time
 import httpx
-from typing import Dict, Optional, Any
+import orjson
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
 import logging
+from app.core.cache import AsyncTTLCache, redis_get_json, redis_set_json
 from app.core.config import settings
+from app.exceptions import AIModelUnavailableException
 
 logger = logging.getLogger(__name__)
 
+# Champs propres à chaque appel, sans effet sur la prédiction : exclus de la
+# clé de cache pour que deux appels identiques partagent le même résultat
+_VOLATILE_FIELDS = frozenset({"timestamp"})
+
 
 class MLAPIClient:
     """
@@ -30,25 +41,93 @@ class MLAPIClient:
         self.base_url = (base_url or settings.ML_API_BASE_URL).rstrip('/')
         self.timeout = timeout
         self._client: Optional[httpx.AsyncClient] = None
+        self._persistent = False
+        # Predictions in progress, keyed by input digest (see predict())
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        # Admission queue in front of the ML API (see _predict())
+        self._slots = asyncio.Semaphore(settings.ML_MAX_CONCURRENCY)
+        # Quasi-static GET responses (see _get_cached())
+        self._health_cache = AsyncTTLCache(maxsize=1, ttl=settings.ML_HEALTH_CACHE_TTL)
+        self._models_info_cache = AsyncTTLCache(maxsize=1, ttl=settings.ML_MODELS_INFO_CACHE_TTL)
+        self._get_locks: Dict[str, asyncio.Lock] = {}
+        # Circuit breaker state (see _record_failure())
+        self._failures = 0
+        self._open_until = 0.0
+    
+    async def start(self):
+        """
+        Ouvre un client HTTP longue durée, partagé jusqu'à close().
+        Les blocs `async with` le réutilisent au lieu d'ouvrir et fermer
+        leur propre pool de connexions.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._new_client()
+        self._persistent = True
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        """
+        Client HTTP dont le pool keep-alive couvre tous les appels /predict
+        admis simultanément (ML_MAX_CONCURRENCY) sans rouvrir de connexion.
+        
+        En HTTP/2 (ML_API_HTTP2), les appels concurrents partagent une seule
+        connexion multiplexée ; les limites ne servent alors qu'en cas de
+        repli HTTP/1.1 si le serveur ne négocie pas h2.
+        """
+        keepalive = max(settings.ML_MAX_CONCURRENCY, settings.ML_BATCH_CONCURRENCY)
+        return httpx.AsyncClient(
+            http2=settings.ML_API_HTTP2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=keepalive + 4,
+                max_keepalive_connections=keepalive
+            )
+        )
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        if not self._persistent:
+            self._client = self._new_client()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self._client:
+        if self._client and not self._persistent:
             await self._client.aclose()
     
     async def _ensure_client(self):
         """Ensure HTTP client is initialized"""
         if not self._client:
-            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client = self._new_client()
+    
+    async def _get_cached(self, path: str, cache: AsyncTTLCache) -> Dict[str, Any]:
+        """
+        GET sur l'API ML avec cache en mémoire.
+        Un seul appel HTTP par chemin à la fois : les appels concurrents
+        attendent puis lisent le résultat mis en cache.
+        
+        Args:
+            path: Chemin de l'endpoint (ex: /health)
+            cache: Cache TTL dédié à ce chemin
+        
+        Returns:
+            Réponse JSON décodée
+        """
+        result = await cache.get(path)
+        if result is not None:
+            return result
+        
+        async with self._get_locks.setdefault(path, asyncio.Lock()):
+            result = await cache.get(path)
+            if result is None:
+                response = await self._client.get(f"{self.base_url}{path}")
+                response.raise_for_status()
+                result = orjson.loads(response.content)
+                await cache.set(path, result)
+        return result
     
     async def health_check(self) -> Dict[str, Any]:
         """
-        Vérifie l'état de l'API ML.
+        Vérifie l'état de l'API ML (mis en cache ML_HEALTH_CACHE_TTL secondes).
         
         Returns:
             Dict avec status, timestamp, models_loaded
@@ -56,9 +135,7 @@ class MLAPIClient:
         await self._ensure_client()
         
         try:
-            response = await self._client.get(f"{self.base_url}/health")
-            response.raise_for_status()
-            result = response.json()
+            result = await self._get_cached("/health", self._health_cache)
             
             logger.info(f"ML API health check: {result['status']}")
             return result
@@ -70,7 +147,8 @@ class MLAPIClient:
     async def predict(
         self,
         flight_data: Dict[str, Any],
-        retry_count: int = 3
+        retry_count: int = 3,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Effectue une prédiction complète pour un vol.
@@ -78,6 +156,7 @@ class MLAPIClient:
         Args:
             flight_data: Données du vol (26 paramètres requis)
             retry_count: Nombre de tentatives en cas d'échec
+            use_cache: Lire le cache Redis avant d'appeler l'API
         
         Returns:
             Dict contenant:
@@ -86,48 +165,148 @@ class MLAPIClient:
             - model_3_conflict: Détection de conflits
             - metadata: timestamp, version
         """
+        result, _ = await self.predict_cached(flight_data, retry_count, use_cache)
+        return result
+    
+    async def predict_cached(
+        self,
+        flight_data: Dict[str, Any],
+        retry_count: int = 3,
+        use_cache: bool = True
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Prédiction avec cache Redis partagé, indexé par le hash des données.
+        
+        Les résultats restent CACHE_TTL_SECONDS en cache (si
+        ENABLE_PREDICTION_CACHE). Les appels concurrents avec les mêmes
+        données partagent une seule requête HTTP (l'API n'expose pas
+        d'endpoint batch).
+        
+        Args:
+            flight_data: Données du vol (26 paramètres requis)
+            retry_count: Nombre de tentatives en cas d'échec
+            use_cache: False force un nouvel appel (le résultat est tout de même mis en cache)
+        
+        Returns:
+            (prédiction, True si servie depuis le cache)
+        
+        Raises:
+            AIModelUnavailableException: Modèles non chargés ou circuit ouvert
+        """
+        # Le même corps sérialisé sert de payload HTTP et, sans champs
+        # volatils, de clé de cache
+        payload = orjson.dumps(flight_data, option=orjson.OPT_SORT_KEYS)
+        key_source = payload
+        if not _VOLATILE_FIELDS.isdisjoint(flight_data):
+            key_source = orjson.dumps(
+                {k: v for k, v in flight_data.items() if k not in _VOLATILE_FIELDS},
+                option=orjson.OPT_SORT_KEYS
+            )
+        key = hashlib.blake2b(key_source, digest_size=16).digest()
+        cache_key = f"ml:predict:{key.hex()}"
+        
+        if use_cache and settings.ENABLE_PREDICTION_CACHE:
+            cached = await redis_get_json(cache_key)
+            if cached is not None:
+                return cached, True
+        
+        if time.monotonic() < self._open_until:
+            raise AIModelUnavailableException("ML API unavailable (circuit open)")
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._predict(flight_data, payload, retry_count, cache_key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+    
+    async def _predict(
+        self,
+        flight_data: Dict[str, Any],
+        payload: bytes,
+        retry_count: int,
+        cache_key: str
+    ) -> Dict[str, Any]:
+        """
+        Appel HTTP /predict avec tentatives, puis mise en cache du résultat.
+        Au plus ML_MAX_CONCURRENCY appels sont en vol à la fois ; les autres
+        attendent un créneau au lieu d'ouvrir de nouvelles connexions.
+        Les tentatives sont espacées d'un backoff exponentiel avec jitter.
+        """
         await self._ensure_client()
         
         for attempt in range(retry_count):
             try:
-                response = await self._client.post(
-                    f"{self.base_url}/predict",
-                    json=flight_data
-                )
+                async with self._slots:
+                    response = await self._client.post(
+                        f"{self.base_url}/predict",
+                        content=payload,
+                        headers={"Content-Type": "application/json"}
+                    )
                 response.raise_for_status()
-                result = response.json()
+                result = orjson.loads(response.content)
                 
                 logger.info(
-                    f"ML prediction successful for flight {flight_data.get('callsign', 'unknown')} "
-                    f"- ETA: {result['model_1_eta']['eta_ajuste']:.1f}min"
+                    "ML API prediction for flight %s - ETA: %.1fmin",
+                    flight_data.get("callsign", "unknown"),
+                    result["model_1_eta"]["eta_ajuste"]
                 )
                 
+                self._failures = 0
+                if settings.ENABLE_PREDICTION_CACHE:
+                    await redis_set_json(cache_key, result, settings.CACHE_TTL_SECONDS)
+                
                 return result
             
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 422:
-                    logger.error(f"Invalid flight data: {e.response.json()}")
-                    raise ValueError(f"Invalid flight data: {e.response.json()}")
+                    detail = orjson.loads(e.response.content)
+                    logger.error(f"Invalid flight data: {detail}")
+                    raise ValueError(f"Invalid flight data: {detail}")
                 elif e.response.status_code == 503:
                     logger.warning("ML models not loaded")
-                    raise RuntimeError("ML models not available")
+                    self._record_failure()
+                    raise AIModelUnavailableException("ML models not available")
                 else:
                     if attempt == retry_count - 1:
                         logger.error(f"ML prediction failed after {retry_count} attempts: {str(e)}")
+                        self._record_failure()
                         raise
                     logger.warning(f"ML prediction attempt {attempt + 1} failed, retrying...")
             
             except httpx.RequestError as e:
                 if attempt == retry_count - 1:
                     logger.error(f"Network error calling ML API: {str(e)}")
+                    self._record_failure()
                     raise
                 logger.warning(f"Network error, attempt {attempt + 1}, retrying...")
+            
+            await asyncio.sleep(
+                min(settings.ML_RETRY_BACKOFF_MAX, settings.ML_RETRY_BACKOFF_BASE * 2 ** attempt)
+                * random.uniform(0.5, 1.0)
+            )
         
         raise RuntimeError("ML prediction failed after all retries")
     
+    def _record_failure(self):
+        """
+        Compte une prédiction en échec. Après ML_CIRCUIT_FAIL_MAX échecs
+        consécutifs, le circuit s'ouvre : les appels échouent immédiatement
+        pendant ML_CIRCUIT_RESET_SECONDS, puis un nouvel essai est permis
+        (un nouvel échec rouvre aussitôt le circuit).
+        """
+        self._failures += 1
+        if self._failures >= settings.ML_CIRCUIT_FAIL_MAX:
+            self._open_until = time.monotonic() + settings.ML_CIRCUIT_RESET_SECONDS
+            logger.warning(
+                f"ML API circuit open for {settings.ML_CIRCUIT_RESET_SECONDS}s "
+                f"after {self._failures} consecutive failures"
+            )
+    
     async def get_models_info(self) -> Dict[str, Any]:
         """
-        Récupère les informations sur les modèles ML.
+        Récupère les informations sur les modèles ML
+        (mises en cache ML_MODELS_INFO_CACHE_TTL secondes).
         
         Returns:
             Dict avec détails techniques des 3 modèles
@@ -135,9 +314,7 @@ class MLAPIClient:
         await self._ensure_client()
         
         try:
-            response = await self._client.get(f"{self.base_url}/models/info")
-            response.raise_for_status()
-            return response.json()
+            return await self._get_cached("/models/info", self._models_info_cache)
         
         except httpx.HTTPError as e:
             logger.error(f"Failed to get models info: {str(e)}")
@@ -145,11 +322,39 @@ class MLAPIClient:
     
     async def close(self):
         """Ferme le client HTTP"""
+        self._persistent = False
         if self._client:
             await self._client.aclose()
             self._client = None
 
 
+
+# Client partagé par l'application (ouvert au démarrage, fermé à l'arrêt)
+_shared_client: Optional[MLAPIClient] = None
+
+
+async def get_ml_client() -> MLAPIClient:
+    """
+    Dependency returning the shared ML API client.
+    
+    Returns:
+        MLAPIClient with its long-lived HTTP client open
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = MLAPIClient(timeout=settings.ML_API_TIMEOUT)
+    await _shared_client.start()
+    return _shared_client
+
+
+async def close_ml_client():
+    """Close the shared ML API client"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
+
+
 def map_flight_to_ml_format(
     flight: Any,
     weather: Optional[Dict] = None,
@@ -260,21 +465,22 @@ async def get_flight_prediction_with_ml(
     Returns:
         Résultat complet de la prédiction ML
     """
-    async with MLAPIClient() as client:
-        # Vérifier que l'API est disponible
-        health = await client.health_check()
-        if health['status'] != 'healthy':
-            raise RuntimeError(f"ML API not healthy: {health['status']}")
-        
-        # Préparer les données
-        ml_data = map_flight_to_ml_format(
-            flight,
-            weather=weather,
-            traffic_stats=traffic_stats,
-            historical_data=historical_data
-        )
-        
-        # Obtenir la prédiction
-        prediction = await client.predict(ml_data)
-        
-        return prediction
+    client = await get_ml_client()
+    
+    # Vérifier que l'API est disponible
+    health = await client.health_check()
+    if health['status'] != 'healthy':
+        raise RuntimeError(f"ML API not healthy: {health['status']}")
+    
+    # Préparer les données
+    ml_data = map_flight_to_ml_format(
+        flight,
+        weather=weather,
+        traffic_stats=traffic_stats,
+        historical_data=historical_data
+    )
+    
+    # Obtenir la prédiction
+    prediction = await client.predict(ml_data)
+    
+    return prediction
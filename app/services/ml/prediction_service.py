@@ -7,13 +7,13 @@ from typing import Dict, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.external.ml_client import MLAPIClient
+from app.services.external.ml_client import get_ml_client
 from app.repositories.flight_repository import FlightRepository
 from app.repositories.prediction_repository import PredictionRepository
 from app.repositories.turnaround_repository import TurnaroundRepository
 from app.models.prediction import ModelType
 from app.models.flight import Flight
-from app.services.business.traffic_stats_service import get_traffic_statistics, get_weather_data, get_historical_data
+from app.services.business.traffic_stats_service import get_traffic_snapshot, get_weather_data, get_historical_data_cached
 
 logger = logging.getLogger(__name__)
 
@@ -51,17 +51,21 @@ class MLPredictionService:
         flight_data = await self._build_ml_input(flight)
         
         # Call ML API
-        async with MLAPIClient() as ml_client:
-            start_time = datetime.now()
-            prediction_result = await ml_client.predict(flight_data)
-            execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
+        ml_client = await get_ml_client()
+        start_time = datetime.now()
+        prediction_result, cached = await ml_client.predict_cached(
+            flight_data,
+            use_cache=not force_refresh
+        )
+        execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
         
         # Store predictions in database
         await self._store_predictions(
             flight.icao24,
             flight_data,
             prediction_result,
-            execution_time
+            execution_time,
+            cached
         )
         
         # Update flight record with predictions
@@ -84,11 +88,11 @@ class MLPredictionService:
         # Get REAL weather data
         weather = await get_weather_data()
         
-        # Get REAL traffic statistics
-        traffic = await get_traffic_statistics(self.db)
+        # Get REAL traffic statistics (in-memory snapshot)
+        traffic = await get_traffic_snapshot()
         
         # Get REAL historical data for this flight
-        historical = await get_historical_data(self.db, flight)
+        historical = await get_historical_data_cached(flight.icao24)
         
         # Extract airline from callsign
         airline = historical.get("airline", "UNKNOWN")
@@ -157,7 +161,8 @@ class MLPredictionService:
         icao24: str,
         input_data: Dict,
         prediction_result: Dict,
-        execution_time_ms: int
+        execution_time_ms: int,
+        cached: bool = False
     ):
         """Store all 3 model predictions in database"""
         
@@ -169,7 +174,7 @@ class MLPredictionService:
                 input_data=input_data,
                 output_data=prediction_result["model_1_eta"],
                 execution_time_ms=execution_time_ms,
-                cached=False
+                cached=cached
             )
         
         # Model 2: Occupation
@@ -180,7 +185,7 @@ class MLPredictionService:
                 input_data=input_data,
                 output_data=prediction_result["model_2_occupation"],
                 execution_time_ms=execution_time_ms,
-                cached=False
+                cached=cached
             )
         
         # Model 3: Conflict
@@ -191,7 +196,7 @@ class MLPredictionService:
                 input_data=input_data,
                 output_data=prediction_result["model_3_conflict"],
                 execution_time_ms=execution_time_ms,
-                cached=False
+                cached=cached
             )
     
     async def _update_flight_predictions(
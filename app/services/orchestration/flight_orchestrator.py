@@ -12,7 +12,7 @@ from app.services.business.parking_service import ParkingService
 from app.services.converters.aviationstack_converter import AviationStackConverter
 from app.repositories.flight_repository import FlightRepository
 from app.schemas.opensky import FlightData, FlightType
-from app.models.flight import FlightStatus, FlightType as FlightTypeEnum
+from app.models.flight import Flight, FlightStatus, FlightType as FlightTypeEnum
 from app.exceptions import OpenSkyAPIException
 
 logger = logging.getLogger(__name__)
@@ -167,12 +167,28 @@ class FlightOrchestrator:
         failed = 0
         errors = []
         
+        # Persist every relevant flight up front with bulk upserts instead
+        # of one SELECT + INSERT/UPDATE per flight in the pipeline
+        relevant = [
+            flight for flight in flights
+            if flight.get_flight_type(self.airport_icao) is not None
+        ]
+        try:
+            db_flights = await self.flight_repo.upsert_many(relevant)
+        except Exception as e:
+            logger.error(f"Bulk flight upsert failed, falling back to per-flight upserts: {str(e)}")
+            await self.db.rollback()
+            db_flights = {}
+        
         for i in range(0, len(flights), batch_size):
             batch = flights[i:i + batch_size]
             
             # Process batch in parallel
             results = await asyncio.gather(
-                *[self.process_single_flight(flight) for flight in batch],
+                *[
+                    self.process_single_flight(flight, db_flights.get(flight.icao24))
+                    for flight in batch
+                ],
                 return_exceptions=True
             )
             
@@ -192,7 +208,11 @@ class FlightOrchestrator:
             "errors": errors[:10]  # Limit error list
         }
     
-    async def process_single_flight(self, flight: FlightData) -> bool:
+    async def process_single_flight(
+        self,
+        flight: FlightData,
+        db_flight: Optional[Flight] = None
+    ) -> bool:
         """
         Process a single flight through complete pipeline.
         
@@ -204,6 +224,7 @@ class FlightOrchestrator:
         
         Args:
             flight: Flight data from OpenSky Network
+            db_flight: Flight already persisted by a bulk upsert, if any
         
         Returns:
             True if processing succeeded, False otherwise
@@ -221,7 +242,8 @@ class FlightOrchestrator:
                 return False
             
             # Step 2: Upsert flight to database (create or update)
-            db_flight = await self.flight_repo.upsert(flight)
+            if db_flight is None:
+                db_flight = await self.flight_repo.upsert(flight)
             logger.info(
                 f"Flight {db_flight.icao24} persisted to DB (type: {flight_type.value})"
             )
@@ -352,7 +374,8 @@ class FlightOrchestrator:
         - Aircraft in holding patterns
         
         Returns:
-            dict: Summary of sync operation (updated_count, total_states, errors)
+            dict: Summary of sync operation (updated_count, total_states,
+                errors: 1 if the position batch failed, else 0)
         """
         from app.utils.geo_calculator import get_bounding_box, AIRPORT_COORDS
         
@@ -395,47 +418,24 @@ class FlightOrchestrator:
             
             logger.info(f"Parsed {len(state_vectors)} state vectors")
             
-            # Update positions for known flights only (filter by active status)
-            updated_count = 0
-            error_count = 0
-            
-            for state_vector in state_vectors:
-                try:
-                    # Only update if flight exists in our DB (active tracking)
-                    flight = await self.flight_repo.update_realtime_position(
-                        icao24=state_vector.icao24,
-                        state_vector=state_vector
-                    )
-                    
-                    if flight:
-                        updated_count += 1
-                        logger.debug(
-                            f"✅ Updated position for {state_vector.icao24} "
-                            f"({state_vector.callsign}) - "
-                            f"Pos: ({state_vector.latitude:.4f}, {state_vector.longitude:.4f}), "
-                            f"Alt: {state_vector.baro_altitude}m, "
-                            f"Speed: {state_vector.velocity}m/s"
-                        )
-                    
-                except Exception as e:
-                    error_count += 1
-                    logger.warning(
-                        f"Failed to update position for {state_vector.icao24}: {str(e)}"
-                    )
+            # Update positions for known flights only (active tracking),
+            # in one batched UPDATE without loading Flight instances.
+            # The batch succeeds or fails as a whole: a failure is reported
+            # below as a single error and no position of this sync is kept.
+            updated_count = await self.flight_repo.update_realtime_positions(state_vectors)
             
             # Summary
             logger.info(
                 f"✅ Real-time position sync completed: "
                 f"{updated_count} flights updated, "
-                f"{len(state_vectors)} total states, "
-                f"{error_count} errors"
+                f"{len(state_vectors)} total states"
             )
             
             return {
                 "success": True,
                 "updated_count": updated_count,
                 "total_states": len(state_vectors),
-                "errors": error_count,
+                "errors": 0,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -1,7 +1,9 @@
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
@@ -9,6 +11,7 @@ from app.services.orchestration.flight_orchestrator import FlightOrchestrator
 from app.services.business.parking_service import ParkingService
 from app.repositories.parking_repository import ParkingAllocationRepository
 from app.repositories.parking_repository import ParkingSpotRepository
+from app.services.business.traffic_stats_service import refresh_traffic_snapshot
 from app.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
@@ -80,6 +83,29 @@ class FlightSyncScheduler:
             misfire_grace_time=300
         )
         
+        # Refresh the traffic stats snapshot read by predictions (first run immediately)
+        self._snapshot_job = self.scheduler.add_job(
+            self._traffic_snapshot_job,
+            trigger=IntervalTrigger(seconds=settings.TRAFFIC_STATS_SNAPSHOT_INTERVAL),
+            id="traffic_snapshot_job",
+            name="Traffic Stats Snapshot",
+            replace_existing=True,
+            max_instances=1,
+            next_run_time=datetime.now(),
+            misfire_grace_time=settings.TRAFFIC_STATS_SNAPSHOT_INTERVAL
+        )
+        
+        # Precreate monthly ai_predictions partitions (daily)
+        self._partition_job = self.scheduler.add_job(
+            self._partition_maintenance_job,
+            trigger=CronTrigger(hour=3, minute=0),
+            id="partition_maintenance_job",
+            name="Partition Maintenance",
+            replace_existing=True,
+            max_instances=1,
+            misfire_grace_time=3600
+        )
+        
         self.scheduler.start()
         self._is_running = True
         
@@ -125,7 +151,6 @@ class FlightSyncScheduler:
                 
                 parking_service = ParkingService(db)
                 allocation_repo = ParkingAllocationRepository(db)
-                spot_repo = ParkingSpotRepository(db)
                 
                 # Get active military overflows
                 from app.models.parking import ParkingAllocation, SpotType
@@ -153,30 +178,18 @@ class FlightSyncScheduler:
                     if not flight:
                         continue
                     
-                    # Check for available civil spot matching aircraft size
-                    aircraft_size = parking_service._get_aircraft_size(
-                        flight.aircraft_type or "A320"
-                    )
-                    
-                    from app.models.parking import SpotType
-                    available_civil = await spot_repo.get_available_by_type(
-                        spot_type=SpotType.CIVIL,
-                        aircraft_size=aircraft_size
-                    )
-                    
-                    if available_civil:
-                        civil_spot = available_civil[0]
-                        logger.info(
-                            f"Recalling flight {flight.callsign} from military to civil spot {civil_spot.spot_id}"
+                    # Recall claims an available civil spot atomically
+                    try:
+                        result = await parking_service.recall_from_military(flight)
+                    except Exception as e:
+                        await db.rollback()
+                        logger.error(
+                            f"Failed to recall flight {flight.callsign}: {str(e)}"
                         )
-                        
-                        try:
-                            await parking_service.recall_from_military(flight, civil_spot)
-                            recalled_count += 1
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to recall flight {flight.callsign}: {str(e)}"
-                            )
+                        continue
+                    
+                    if result.success:
+                        recalled_count += 1
                 
                 if recalled_count > 0:
                     logger.info(f"Civil recall completed: {recalled_count} flights recalled")
@@ -340,6 +353,42 @@ class FlightSyncScheduler:
             finally:
                 await db.close()
     
+    async def _traffic_snapshot_job(self):
+        """Internal job method refreshing the in-memory traffic stats snapshot"""
+        try:
+            await refresh_traffic_snapshot()
+        except Exception as e:
+            logger.error(f"Error refreshing traffic stats snapshot: {str(e)}", exc_info=True)
+    
+    async def _partition_maintenance_job(self):
+        """
+        Internal job method called daily.
+        Creates upcoming monthly partitions of ai_predictions ahead of time
+        so inserts never fall into the DEFAULT partition.
+        
+        Skipped when the maintenance function is missing (schema created by
+        create_all with MIGRATION_MODE=off, so the table is not partitioned).
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                installed = await db.scalar(text(
+                    "SELECT to_regprocedure('ensure_monthly_partitions(text, timestamptz, integer)') IS NOT NULL"
+                ))
+                if not installed:
+                    logger.debug("Partition maintenance skipped: ensure_monthly_partitions() not installed")
+                    return
+                
+                result = await db.execute(
+                    text("SELECT ensure_monthly_partitions('ai_predictions', now(), 3)")
+                )
+                created = result.scalar()
+                await db.commit()
+                logger.info(f"Partition maintenance completed: {created} partitions created")
+            except Exception as e:
+                logger.error(f"Error in partition maintenance job: {str(e)}", exc_info=True)
+            finally:
+                await db.close()
+    
     def get_next_run_time(self) -> str:
         """
         Get the next scheduled run time.
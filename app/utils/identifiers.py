@@ -0,0 +1,24 @@
+"""
+Identifier generation helpers.
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562).
+    
+    The first 48 bits hold the Unix timestamp in milliseconds, so values
+    generated later sort after earlier ones and B-tree inserts land on the
+    rightmost index page. Mirrors the gen_uuidv7() SQL function.
+    
+    Returns:
+        UUID version 7
+    """
+    unix_ts_ms = time.time_ns() // 1_000_000
+    value = bytearray(unix_ts_ms.to_bytes(6, "big") + os.urandom(10))
+    value[6] = (value[6] & 0x0F) | 0x70  # version 7
+    value[8] = (value[8] & 0x3F) | 0x80  # RFC 4122 variant
+    return uuid.UUID(bytes=bytes(value))
@@ -0,0 +1,308 @@
+"""
+Helpers shared by Alembic migrations.
+"""
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Any, Optional, Set
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.dialects import postgresql
+
+_CONCURRENTLY = re.compile(r"\s+CONCURRENTLY\b", re.IGNORECASE)
+
+# Upper bounds applied to each migration transaction (see set_guards)
+LOCK_TIMEOUT = "5s"
+STATEMENT_TIMEOUT = "10min"
+IDLE_IN_TRANSACTION_TIMEOUT = "1min"
+
+# Set by env.py when the whole chain is applied to an empty database
+# in a single transaction (see concurrent_block)
+_fresh_install = False
+
+# Catalog snapshot shared by all revisions of one migration run:
+# {table_name: {column_name, ...}}. Built lazily with a single query.
+_schema_cache: Optional[Dict[str, Set[str]]] = None
+
+
+def reset_schema_cache() -> None:
+    """Forget the catalog snapshot (called by env.py at the start of each run)."""
+    global _schema_cache
+    _schema_cache = None
+
+
+def set_guards() -> None:
+    """
+    Bound how long the current migration transaction may wait for locks,
+    run a statement or sit idle, so a blocked ALTER TABLE fails (and rolls
+    back) instead of queueing every writer behind it.
+    
+    SET LOCAL ends with the transaction; concurrent_block() re-applies the
+    guards after its autocommit section.
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'")
+    op.execute(f"SET LOCAL idle_in_transaction_session_timeout = '{IDLE_IN_TRANSACTION_TIMEOUT}'")
+
+
+def set_fresh_install(fresh: bool) -> None:
+    """Mark the current run as provisioning an empty database."""
+    global _fresh_install
+    _fresh_install = fresh
+
+
+def is_fresh_install() -> bool:
+    """Whether the current run is provisioning an empty database."""
+    return _fresh_install
+
+
+@contextmanager
+def concurrent_block() -> Iterator[Callable[[str], Any]]:
+    """
+    Run non-blocking DDL (CREATE/DROP INDEX CONCURRENTLY, batched
+    backfills) outside the migration transaction, where the timeouts of
+    set_guards() do not apply.
+    
+    On a fresh install there is nothing to lock or backfill, so the
+    statements run inline, without CONCURRENTLY, inside the single
+    provisioning transaction.
+    
+    Yields:
+        Function executing one SQL statement
+    """
+    if _fresh_install:
+        yield lambda statement: op.execute(_CONCURRENTLY.sub("", statement, count=1))
+        return
+    with op.get_context().autocommit_block():
+        yield op.execute
+    set_guards()
+
+
+def _get_schema_cache() -> Dict[str, Set[str]]:
+    """Load every table/column of the current schema in one round trip."""
+    global _schema_cache
+    if _schema_cache is None:
+        result = op.get_bind().execute(sa.text("""
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+        """))
+        _schema_cache = {}
+        for table_name, column_name in result:
+            _schema_cache.setdefault(table_name, set()).add(column_name)
+    return _schema_cache
+
+
+def has_table(table: str) -> bool:
+    """Check whether a table exists (from the cached catalog snapshot)."""
+    return table in _get_schema_cache()
+
+
+def has_column(table: str, column: str) -> bool:
+    """Check whether a column exists (from the cached catalog snapshot)."""
+    return column in _get_schema_cache().get(table, set())
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> bool:
+    """
+    Add a column unless it already exists, keeping the snapshot in sync.
+
+    Returns:
+        True if the column was added
+    """
+    if has_column(table, column.name):
+        return False
+    op.add_column(table, column)
+    _get_schema_cache().setdefault(table, set()).add(column.name)
+    return True
+
+
+def create_table_if_missing(table: str, *elements: Any) -> bool:
+    """
+    Create a table unless it already exists, keeping the snapshot in sync.
+
+    Returns:
+        True if the table was created
+    """
+    if has_table(table):
+        return False
+    op.create_table(table, *elements)
+    _get_schema_cache()[table] = {
+        element.name for element in elements if isinstance(element, sa.Column)
+    }
+    return True
+
+
+def bulk_upsert(
+    table: str,
+    rows: List[Dict[str, Any]],
+    conflict_column: str,
+    chunk: int = 1000
+) -> None:
+    """
+    Insert seed/data-migration rows with one multi-row INSERT per chunk.
+    Existing rows (same conflict_column value) are left untouched.
+    
+    Statements go through op.execute, so `alembic upgrade --sql` renders
+    them too. Online, columns are untyped: binds carry no cast (asyncpg
+    would otherwise send $1::VARCHAR) and the server types each value
+    from its target column, enums included. Offline, types are inferred
+    from the values only to render them as literals, which Postgres also
+    coerces to the column type.
+    
+    Args:
+        table: Target table name
+        rows: Rows to insert, all with the same keys
+        conflict_column: Unique column used for ON CONFLICT DO NOTHING
+        chunk: Maximum rows sent per INSERT statement
+    """
+    if not rows:
+        return
+    
+    offline = context.is_offline_mode()
+    
+    def column(name: str) -> sa.ColumnClause:
+        if not offline:
+            return sa.column(name)
+        value = next((row[name] for row in rows if row[name] is not None), None)
+        return sa.column(name, sa.literal(value).type if value is not None else None)
+    
+    target = sa.table(table, *(column(name) for name in rows[0]))
+    for start in range(0, len(rows), chunk):
+        op.execute(
+            postgresql.insert(target)
+            .values(rows[start:start + chunk])
+            .on_conflict_do_nothing(index_elements=[conflict_column])
+        )
+
+
+def swap_column_types(
+    table: str,
+    key_column: str,
+    columns: Dict[str, str],
+    defaults: Optional[Dict[str, str]] = None,
+    using: Optional[Dict[str, str]] = None,
+    batch_size: int = 1000
+) -> None:
+    """
+    Change column types with add -> backfill -> swap instead of
+    ALTER COLUMN ... TYPE, which rewrites the table under an
+    ACCESS EXCLUSIVE lock.
+    
+    A trigger keeps the shadow columns in sync with concurrent writes
+    while they are backfilled in committed batches. NOT NULL is restored
+    through a validated CHECK constraint so SET NOT NULL skips the scan.
+    Columns that already have the target type are skipped.
+    
+    Steps 1-2 commit before the swap, so every statement is idempotent:
+    a revision retried after a lock timeout in the swap (see env.py)
+    resumes from the shadow columns, trigger and constraints left behind.
+    
+    Args:
+        table: Table name
+        key_column: Unique column used to select backfill batches
+        columns: {column: new SQL type}; values are converted with a plain cast
+        defaults: {column: default SQL expression} to set after the swap
+        using: {column: conversion expression} replacing the plain cast,
+            with "{value}" standing for the old value
+        batch_size: Rows updated per committed batch
+    """
+    connection = op.get_bind()
+    defaults = defaults or {}
+    using = using or {}
+    
+    # Current type, nullability and comment of each column
+    current = {
+        name: (type_name, not_null, comment)
+        for name, type_name, not_null, comment in connection.execute(sa.text("""
+            SELECT attname, format_type(atttypid, atttypmod), attnotnull,
+                   col_description(attrelid, attnum)
+            FROM pg_attribute
+            WHERE attrelid = CAST(:table AS regclass) AND attnum > 0 AND NOT attisdropped
+        """), {"table": table})
+    }
+    pending = {
+        column: new_type for column, new_type in columns.items()
+        if column in current and current[column][0] != new_type
+    }
+    if not pending:
+        return
+    
+    def convert(column: str, value: str) -> str:
+        template = using.get(column, "{value}::" + pending[column])
+        return "(" + template.format(value=value) + ")"
+    
+    sync_function = f"{table}_type_swap_sync"
+    
+    # 1. Shadow columns (metadata-only) and a trigger covering concurrent writes
+    op.execute(
+        f"ALTER TABLE {table} "
+        + ", ".join(
+            f"ADD COLUMN IF NOT EXISTS {column}_new {new_type}"
+            for column, new_type in pending.items()
+        )
+    )
+    assignments = "\n".join(
+        f"NEW.{column}_new := {convert(column, f'NEW.{column}')};" for column in pending
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {sync_function}() RETURNS trigger AS $$
+        BEGIN
+            {assignments}
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {sync_function} ON {table}")
+    op.execute(f"""
+        CREATE TRIGGER {sync_function} BEFORE INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {sync_function}()
+    """)
+    
+    # 2. Backfill existing rows in committed batches
+    with concurrent_block():
+        for column in pending:
+            while True:
+                result = connection.execute(sa.text(f"""
+                    UPDATE {table}
+                    SET {column}_new = {convert(column, column)}
+                    WHERE {key_column} IN (
+                        SELECT {key_column} FROM {table}
+                        WHERE {column}_new IS NULL AND {column} IS NOT NULL
+                        LIMIT {batch_size}
+                    )
+                """))
+                if result.rowcount < batch_size:
+                    break
+        
+        # Prove NOT NULL without holding ACCESS EXCLUSIVE during the scan
+        # (constraints added by an earlier attempt are only re-validated)
+        existing_constraints = set(connection.execute(sa.text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass)"
+        ), {"table": table}).scalars())
+        for column in pending:
+            if current[column][1]:
+                if f"{column}_new_not_null" not in existing_constraints:
+                    op.execute(
+                        f"ALTER TABLE {table} ADD CONSTRAINT {column}_new_not_null "
+                        f"CHECK ({column}_new IS NOT NULL) NOT VALID"
+                    )
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {column}_new_not_null")
+    
+    # 3. Swap in one short transaction
+    op.execute(f"DROP TRIGGER IF EXISTS {sync_function} ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {sync_function}()")
+    op.execute(
+        f"ALTER TABLE {table} "
+        + ", ".join(f"DROP COLUMN {column}" for column in pending)
+    )
+    for column in pending:
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_new TO {column}")
+        if current[column][1]:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {column}_new_not_null")
+        if column in defaults:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {defaults[column]}")
+        if current[column][2]:
+            comment = current[column][2].replace("'", "''")
+            op.execute(f"COMMENT ON COLUMN {table}.{column} IS '{comment}'")
@@ -0,0 +1,39 @@
+"""
+Keyset pagination helpers.
+Cursors are opaque URL-safe tokens wrapping the sort key of the last row,
+so any worker can resume a listing without server-side state.
+"""
+import base64
+from typing import Any, List, Optional
+
+import orjson
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """
+    Encode the sort key of the last returned row.
+    
+    Args:
+        key: Sort key values (JSON serializable)
+    
+    Returns:
+        Opaque cursor token
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor token
+    
+    Returns:
+        Sort key values, or None if the token is malformed
+    """
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, orjson.JSONDecodeError):
+        return None
+    return key if isinstance(key, list) else None
@@ -11,12 +11,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from app.database import AsyncSessionLocal
 from app.repositories.user_repository import UserRepository
-import bcrypt
-
-# Use bcrypt directly to avoid passlib compatibility issues
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+from app.api.v1.endpoints.auth import get_password_hash
 
 
 async def init_db():
@@ -24,7 +19,7 @@ async def init_db():
     async with AsyncSessionLocal() as session:
         user_repo = UserRepository(session)
         
-        # Check if admin exists - if yes, delete and recreate with new bcrypt hash
+        # Check if admin exists - if yes, delete and recreate with a fresh hash
         admin = await user_repo.get_by_username("admin")
         
         if admin:
@@ -33,7 +28,7 @@ async def init_db():
             await session.commit()
         
         print("Creating default admin user...")
-        hashed_password = hash_password("admin123")
+        hashed_password = await get_password_hash("admin123")
         
         await user_repo.create(
             username="admin",
@@ -0,0 +1,8 @@
+"""
+Shared test setup.
+Settings are read at import time, so required values are provided
+before any app module is imported.
+"""
+import os
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
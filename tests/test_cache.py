@@ -0,0 +1,95 @@
+"""
+Tests for the shared Redis cache helper (Redis replaced by a dict).
+"""
+import asyncio
+
+import pytest
+
+from app.core import cache
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """In-memory stand-in for Redis: {key: (value, ttl)}"""
+    data = {}
+    
+    async def get_json(key):
+        entry = data.get(key)
+        return entry[0] if entry else None
+    
+    async def set_json(key, value, ttl):
+        data[key] = (value, ttl)
+    
+    monkeypatch.setattr(cache, "redis_get_json", get_json)
+    monkeypatch.setattr(cache, "redis_set_json", set_json)
+    return data
+
+
+async def test_concurrent_misses_share_one_computation(store):
+    calls = 0
+    release = asyncio.Event()
+    
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"approaching": 3}
+    
+    callers = [
+        asyncio.create_task(cache.redis_get_or_compute("stats", 30, compute))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await asyncio.gather(*callers) == [{"approaching": 3}] * 5
+    assert calls == 1
+    assert store["stats"] == ({"approaching": 3}, 30)
+
+
+async def test_hit_skips_computation(store):
+    store["stats"] = ({"approaching": 1}, 30)
+    
+    async def compute():
+        raise AssertionError("cached value should be used")
+    
+    assert await cache.redis_get_or_compute("stats", 30, compute) == {"approaching": 1}
+
+
+async def test_empty_value_uses_empty_ttl(store):
+    async def compute():
+        return {}
+    
+    await cache.redis_get_or_compute("hist", 3600, compute, empty_ttl=60)
+    
+    assert store["hist"] == ({}, 60)
+
+
+async def test_non_empty_value_ignores_empty_ttl(store):
+    async def compute():
+        return {"avg_delay": 5.0}
+    
+    await cache.redis_get_or_compute("hist", 3600, compute, empty_ttl=60)
+    
+    assert store["hist"] == ({"avg_delay": 5.0}, 3600)
+
+
+async def test_empty_value_uses_ttl_without_empty_ttl(store):
+    async def compute():
+        return []
+    
+    await cache.redis_get_or_compute("list", 300, compute)
+    
+    assert store["list"] == ([], 300)
+
+
+async def test_failed_computation_is_not_stored(store):
+    async def compute():
+        raise RuntimeError("database down")
+    
+    with pytest.raises(RuntimeError):
+        await cache.redis_get_or_compute("stats", 30, compute)
+    await asyncio.sleep(0)
+    
+    assert "stats" not in store
+    assert "stats" not in cache._inflight_fills
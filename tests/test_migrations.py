@@ -0,0 +1,142 @@
+"""
+Tests for the SQL emitted by swap_column_types (no database: Alembic's op
+and the connection are replaced by recorders).
+"""
+import pytest
+
+from app.utils import migrations
+
+
+class FakeResult:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+    
+    def __iter__(self):
+        return iter(self._rows)
+    
+    def scalars(self):
+        return iter(self._rows)
+
+
+class FakeConnection:
+    """Answers the catalog queries and records backfill batches"""
+    
+    def __init__(self, catalog, constraints=(), batches=(0,)):
+        self.catalog = catalog
+        self.constraints = constraints
+        self.batches = list(batches)
+        self.statements = []
+    
+    def execute(self, clause, params=None):
+        sql = " ".join(str(clause).split())
+        if "FROM pg_attribute" in sql:
+            return FakeResult(self.catalog)
+        if "FROM pg_constraint" in sql:
+            return FakeResult(self.constraints)
+        self.statements.append(sql)
+        return FakeResult(rowcount=self.batches.pop(0) if self.batches else 0)
+
+
+class FakeOp:
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = []
+    
+    def execute(self, sql):
+        self.statements.append(" ".join(str(sql).split()))
+    
+    def get_bind(self):
+        return self.connection
+
+
+PARKING_COLUMNS = [
+    ("spot_id", "character varying(10)", True, None),
+    ("status", "character varying(20)", True, "Spot status (it's an enum)"),
+    ("notes", "text", False, None),
+]
+
+
+@pytest.fixture
+def run_swap(monkeypatch):
+    """Run swap_column_types against fakes, returning (op, connection)"""
+    # Inline concurrent_block: no autocommit section to emulate
+    monkeypatch.setattr(migrations, "_fresh_install", True)
+    
+    def run(catalog=PARKING_COLUMNS, constraints=(), batches=(0,), **kwargs):
+        connection = FakeConnection(catalog, constraints, batches)
+        fake_op = FakeOp(connection)
+        monkeypatch.setattr(migrations, "op", fake_op)
+        migrations.swap_column_types("parking_spots", "spot_id", **kwargs)
+        return fake_op, connection
+    
+    return run
+
+
+def test_swap_add_backfill_swap(run_swap):
+    fake_op, connection = run_swap(
+        columns={"status": "spotstatus"},
+        defaults={"status": "'available'::spotstatus"},
+        using={"status": "LOWER({value})::spotstatus"},
+    )
+    
+    assert fake_op.statements == [
+        "ALTER TABLE parking_spots ADD COLUMN IF NOT EXISTS status_new spotstatus",
+        "CREATE OR REPLACE FUNCTION parking_spots_type_swap_sync() RETURNS trigger AS $$ "
+        "BEGIN NEW.status_new := (LOWER(NEW.status)::spotstatus); RETURN NEW; END "
+        "$$ LANGUAGE plpgsql",
+        "DROP TRIGGER IF EXISTS parking_spots_type_swap_sync ON parking_spots",
+        "CREATE TRIGGER parking_spots_type_swap_sync BEFORE INSERT OR UPDATE ON parking_spots "
+        "FOR EACH ROW EXECUTE FUNCTION parking_spots_type_swap_sync()",
+        "ALTER TABLE parking_spots ADD CONSTRAINT status_new_not_null "
+        "CHECK (status_new IS NOT NULL) NOT VALID",
+        "ALTER TABLE parking_spots VALIDATE CONSTRAINT status_new_not_null",
+        "DROP TRIGGER IF EXISTS parking_spots_type_swap_sync ON parking_spots",
+        "DROP FUNCTION IF EXISTS parking_spots_type_swap_sync()",
+        "ALTER TABLE parking_spots DROP COLUMN status",
+        "ALTER TABLE parking_spots RENAME COLUMN status_new TO status",
+        "ALTER TABLE parking_spots ALTER COLUMN status SET NOT NULL",
+        "ALTER TABLE parking_spots DROP CONSTRAINT status_new_not_null",
+        "ALTER TABLE parking_spots ALTER COLUMN status SET DEFAULT 'available'::spotstatus",
+        "COMMENT ON COLUMN parking_spots.status IS 'Spot status (it''s an enum)'",
+    ]
+    assert connection.statements == [
+        "UPDATE parking_spots SET status_new = (LOWER(status)::spotstatus) "
+        "WHERE spot_id IN ( SELECT spot_id FROM parking_spots "
+        "WHERE status_new IS NULL AND status IS NOT NULL LIMIT 1000 )"
+    ]
+
+
+def test_plain_cast_and_nullable_column(run_swap):
+    fake_op, _ = run_swap(columns={"notes": "character varying(200)"})
+    
+    assert "NEW.notes_new := (NEW.notes::character varying(200));" in fake_op.statements[1]
+    assert not any("CONSTRAINT" in sql for sql in fake_op.statements)
+    assert not any("SET NOT NULL" in sql for sql in fake_op.statements)
+
+
+def test_backfill_runs_until_a_partial_batch(run_swap):
+    _, connection = run_swap(
+        columns={"status": "spotstatus"}, batches=(2, 2, 1), batch_size=2
+    )
+    
+    assert len(connection.statements) == 3
+    assert all("LIMIT 2" in sql for sql in connection.statements)
+
+
+def test_retry_reuses_existing_not_null_constraint(run_swap):
+    fake_op, _ = run_swap(
+        columns={"status": "spotstatus"}, constraints=["status_new_not_null"]
+    )
+    
+    assert not any("ADD CONSTRAINT" in sql for sql in fake_op.statements)
+    assert "ALTER TABLE parking_spots VALIDATE CONSTRAINT status_new_not_null" in fake_op.statements
+
+
+def test_columns_already_converted_are_skipped(run_swap):
+    fake_op, connection = run_swap(
+        columns={"status": "character varying(20)", "missing": "integer"}
+    )
+    
+    assert fake_op.statements == []
+    assert connection.statements == []
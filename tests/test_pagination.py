@@ -0,0 +1,27 @@
+"""
+Tests for keyset pagination cursors.
+"""
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = ["2026-10-16T12:00:00", 42, "P1"]
+    
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(["???>>>", 1])
+    
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == ["???>>>", 1]
+
+
+def test_malformed_cursor_is_rejected():
+    assert decode_cursor("not a cursor!") is None
+    assert decode_cursor("") is None
+
+
+def test_cursor_must_wrap_a_list():
+    assert decode_cursor(encode_cursor({"spot_id": "P1"})) is None
@@ -0,0 +1,94 @@
+"""
+Tests for atomic parking spot claims (statement compiled for PostgreSQL).
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.flight import Flight  # noqa: F401  (resolves ParkingSpot relationships)
+from app.models.parking import AircraftSizeCategory, SpotType
+from app.repositories import parking_repository
+from app.repositories.parking_repository import ParkingSpotRepository
+
+
+class FakeResult:
+    def __init__(self, row):
+        self._row = row
+    
+    def one_or_none(self):
+        return self._row
+
+
+class FakeSession:
+    """Records the statement instead of running it"""
+    
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+        self.commits = 0
+    
+    async def scalars(self, statement, execution_options=None):
+        self.statements.append((statement, execution_options))
+        return FakeResult(self.row)
+    
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def invalidations(monkeypatch):
+    calls = []
+    
+    async def invalidate():
+        calls.append(True)
+    
+    monkeypatch.setattr(parking_repository, "invalidate_availability_stats", invalidate)
+    return calls
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_claim_is_one_conditional_update_with_skip_locked(invalidations):
+    session = FakeSession(row="P1")
+    
+    spot = await ParkingSpotRepository(session).claim_available(
+        SpotType.CIVIL, AircraftSizeCategory.MEDIUM
+    )
+    
+    assert spot == "P1"
+    assert len(session.statements) == 1
+    statement, options = session.statements[0]
+    sql = compile_sql(statement)
+    assert sql.startswith("UPDATE parking_spots SET status=")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "LIMIT" in sql
+    # The candidate is re-checked by the UPDATE itself
+    assert sql.count("parking_spots.status =") == 2
+    assert "RETURNING" in sql
+    assert options == {"populate_existing": True}
+    assert session.commits == 1
+    assert invalidations == [True]
+
+
+async def test_claim_without_commit_leaves_the_transaction_open(invalidations):
+    session = FakeSession(row="M1")
+    
+    await ParkingSpotRepository(session).claim_available(
+        SpotType.MILITARY, AircraftSizeCategory.LARGE, commit=False
+    )
+    
+    assert session.commits == 0
+    assert invalidations == []
+
+
+async def test_no_available_spot(invalidations):
+    session = FakeSession(row=None)
+    
+    spot = await ParkingSpotRepository(session).claim_available(
+        SpotType.CIVIL, AircraftSizeCategory.LARGE
+    )
+    
+    assert spot is None
+    assert session.commits == 0
+    assert invalidations == []